@@ -0,0 +1,239 @@
+"""
+API HTTP JSON locale exposant le calcul des plannings de rénovation.
+
+Serveur asyncio sans dépendance externe :
+
+    python api.py --port 8765
+
+Points d'entrée :
+- POST /schedule  : un projet  -> ses tâches
+- POST /portfolio : {"projets": [...]} -> les tâches de chaque projet
+
+Un projet est décrit par `etat`, `start_date` (AAAA-MM-JJ) et, optionnellement,
+`nom`, `durees` ({nom de phase: semaines}), `include_financement`,
+`recherche_financement_weeks` et `reel` (dates réelles des phases engagées,
+{nom de phase: {"debut": ..., "fin": ...}}, voir `avancement`). Les calculs sont regroupés par lots (`Batcheur`)
+et exécutés hors de la boucle d'événements.
+"""
+
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+
+from gantt import generer_taches_projet
+
+TAILLE_MAX_CORPS = 10 * 1024 * 1024
+
+
+# --------------------
+# Calcul
+def calculer_projet(projet):
+    """Calcule les tâches d'un projet et les retourne sous forme sérialisable en JSON."""
+    if not isinstance(projet, dict):
+        raise ValueError("Un projet doit être un objet JSON")
+    if not isinstance(projet.get("durees") or {}, dict):
+        raise ValueError("`durees` doit être un objet {phase: semaines}")
+    df = generer_taches_projet(projet)
+    # Dates en AAAA-MM-JJ, dates réelles inconnues en null
+    dates = {
+        colonne: df[colonne].dt.strftime("%Y-%m-%d").astype(object).where(df[colonne].notna(), None)
+        for colonne in df.select_dtypes("datetime").columns
+    }
+    taches = df.drop(columns=["hover_def"]).assign(**dates).to_dict("records")
+    return {
+        "nom": projet.get("nom", ""),
+        "fin": taches[-1]["Finish"] if taches else None,
+        "taches": taches,
+    }
+
+
+def calculer_lot(projets):
+    """Calcule un lot de projets ; une erreur sur un projet n'interrompt pas les autres."""
+    resultats = []
+    for projet in projets:
+        try:
+            resultats.append(calculer_projet(projet))
+        except Exception as exc:  # toute erreur reste propre à son projet
+            resultats.append(exc)
+    return resultats
+
+
+class Batcheur:
+    """
+    Regroupe les projets soumis en lots envoyés à l'exécuteur en un seul appel.
+
+    Un lot part dès qu'il atteint `taille_max` projets ou après `delai_max`
+    secondes d'attente, ce qui amortit le coût de passage à l'exécuteur sous charge.
+    """
+
+    def __init__(self, taille_max=64, delai_max=0.002):
+        self.taille_max = taille_max
+        self.delai_max = delai_max
+        self._file = asyncio.Queue()
+        self._tache = None
+
+    def demarrer(self):
+        self._tache = asyncio.get_running_loop().create_task(self._boucle())
+
+    async def arreter(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+
+    async def soumettre(self, projet):
+        future = asyncio.get_running_loop().create_future()
+        await self._file.put((projet, future))
+        return await future
+
+    async def _boucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lot = [await self._file.get()]
+            echeance = loop.time() + self.delai_max
+            while len(lot) < self.taille_max:
+                reste = echeance - loop.time()
+                if reste <= 0:
+                    break
+                try:
+                    lot.append(await asyncio.wait_for(self._file.get(), reste))
+                except asyncio.TimeoutError:
+                    break
+            projets = [projet for projet, _ in lot]
+            try:
+                resultats = await loop.run_in_executor(None, calculer_lot, projets)
+            except Exception as exc:  # erreur inattendue : on la propage à tout le lot
+                resultats = [exc] * len(lot)
+            for (_, future), resultat in zip(lot, resultats):
+                if future.done():
+                    continue
+                if isinstance(resultat, Exception):
+                    future.set_exception(resultat)
+                else:
+                    future.set_result(resultat)
+
+
+# --------------------
+# Serveur HTTP
+class ErreurHTTP(Exception):
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+        self.message = message
+
+
+class ServeurPlanning:
+    """Serveur HTTP/1.1 minimal (keep-alive, corps JSON) au-dessus d'asyncio."""
+
+    def __init__(self, host="127.0.0.1", port=8765, batcheur=None):
+        self.host = host
+        self.port = port
+        self.batcheur = batcheur or Batcheur()
+        self._serveur = None
+
+    async def demarrer(self):
+        self.batcheur.demarrer()
+        self._serveur = await asyncio.start_server(self._connexion, self.host, self.port)
+        self.port = self._serveur.sockets[0].getsockname()[1]
+        return self
+
+    async def arreter(self):
+        self._serveur.close()
+        await self._serveur.wait_closed()
+        await self.batcheur.arreter()
+
+    async def servir(self):
+        async with self._serveur:
+            await self._serveur.serve_forever()
+
+    async def _connexion(self, reader, writer):
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                garder = await self._requete(ligne, reader, writer)
+                if not garder:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _requete(self, ligne, reader, writer):
+        entetes = {}
+        while True:
+            entete = await reader.readline()
+            if entete in (b"\r\n", b"\n", b""):
+                break
+            cle, _, valeur = entete.decode("latin-1").partition(":")
+            entetes[cle.strip().lower()] = valeur.strip()
+        garder = entetes.get("connection", "").lower() != "close"
+
+        try:
+            methode, chemin, _ = ligne.decode("latin-1").split(" ", 2)
+            longueur = int(entetes.get("content-length", 0))
+            if longueur > TAILLE_MAX_CORPS:
+                raise ErreurHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corps de requête trop volumineux")
+            corps = await reader.readexactly(longueur) if longueur else b""
+            statut, reponse = HTTPStatus.OK, await self._router(methode, chemin, corps)
+        except ErreurHTTP as exc:
+            statut, reponse = exc.statut, {"erreur": exc.message}
+        except (ValueError, TypeError, OverflowError) as exc:  # champ absent, mal typé ou hors bornes
+            statut, reponse = HTTPStatus.BAD_REQUEST, {"erreur": str(exc)}
+        except Exception as exc:
+            statut, reponse = HTTPStatus.INTERNAL_SERVER_ERROR, {"erreur": f"Erreur interne : {exc}"}
+
+        donnees = json.dumps(reponse, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {statut.value} {statut.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(donnees)}\r\n"
+            f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n".encode("latin-1") + donnees
+        )
+        await writer.drain()
+        return garder
+
+    async def _router(self, methode, chemin, corps):
+        if chemin not in ("/schedule", "/portfolio"):
+            raise ErreurHTTP(HTTPStatus.NOT_FOUND, f"Chemin inconnu : {chemin}")
+        if methode != "POST":
+            raise ErreurHTTP(HTTPStatus.METHOD_NOT_ALLOWED, "Seule la méthode POST est acceptée")
+        try:
+            requete = json.loads(corps or b"null")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"JSON invalide : {exc}")
+
+        if chemin == "/schedule":
+            return await self.batcheur.soumettre(requete)
+
+        if not isinstance(requete, dict) or not isinstance(requete.get("projets"), list):
+            raise ValueError("Le corps doit contenir une liste 'projets'")
+        resultats = await asyncio.gather(
+            *(self.batcheur.soumettre(projet) for projet in requete["projets"]),
+            return_exceptions=True,
+        )
+        for index, resultat in enumerate(resultats):
+            if isinstance(resultat, Exception):
+                raise ValueError(f"Projet n°{index} : {resultat}")
+        return {"projets": resultats}
+
+
+async def _main(host, port):
+    serveur = await ServeurPlanning(host, port).demarrer()
+    print(f"API planning en écoute sur http://{host}:{serveur.port}")
+    await serveur.servir()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP locale de calcul des plannings")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
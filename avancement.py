@@ -0,0 +1,139 @@
+"""
+Suivi de l'avancement : dates réelles des phases et reprévision de la suite du planning.
+
+    reels = dates_reelles({"📝 DIAG - Diagnostic & Études d’Esquisse": {"debut": "2027-03-01", "fin": "2027-05-10"}})
+    taches = reprevoir(taches, reels)        # Start / Finish deviennent la prévision
+    ajouter_avancement(fig, taches)          # barres réelles, prévu initial et glissement
+
+Les phases s'enchaînent : une phase dont les dates réelles sont connues décale
+toutes les tâches suivantes de son projet de son glissement (fin réelle − fin
+prévue), jusqu'à la prochaine phase aux dates réelles connues. Une phase
+commencée mais pas terminée finit à son début réel plus sa durée prévue. Le
+calcul est vectoriel sur toutes les tâches, projets d'un portefeuille compris.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from references import ajouter_barres_reference
+
+COLONNES_REELLES = ["Début réel", "Fin réel"]
+COLONNES_PREVUES = ["Start prévu", "Finish prévu"]
+COULEUR_REEL = "#212121"
+
+_UN_JOUR = np.timedelta64(1, "D")
+
+
+def dates_reelles(reel, projet=None):
+    """
+    DataFrame des dates réelles ({phase: {"debut": ..., "fin": ...}}, dates AAAA-MM-JJ
+    facultatives), avec une colonne `Projet` si `projet` est donné.
+
+    Une date invalide, une phase sans date ou une fin avant le début lève une ValueError.
+    """
+    if not isinstance(reel, dict):
+        raise ValueError("`reel` doit être un objet {phase: {\"debut\": ..., \"fin\": ...}}")
+    lignes = []
+    for nom, dates in reel.items():
+        if not isinstance(dates, dict) or not ({"debut", "fin"} & set(dates)):
+            raise ValueError(f"Dates réelles de {nom!r} : attendu {{\"debut\": ..., \"fin\": ...}}")
+        try:
+            debut, fin = pd.to_datetime(dates.get("debut")), pd.to_datetime(dates.get("fin"))
+        except (ValueError, TypeError) as exc:
+            raise ValueError(f"Dates réelles de {nom!r} invalides : {exc}") from None
+        if pd.notna(debut) and pd.notna(fin) and fin < debut:
+            raise ValueError(f"Dates réelles de {nom!r} : la fin précède le début")
+        lignes.append((nom, debut, fin))
+    reels = pd.DataFrame(lignes, columns=["Task"] + COLONNES_REELLES).astype(
+        {colonne: "datetime64[ns]" for colonne in COLONNES_REELLES}
+    )
+    if projet is not None:
+        reels.insert(0, "Projet", projet)
+    return reels
+
+
+def reprevoir(taches, reels):
+    """
+    Reprévision des tâches à partir des dates réelles des phases (`dates_reelles`).
+
+    Les dates réelles sont appariées aux tâches de type "Phase" par nom (et par
+    projet si les deux tables ont une colonne `Projet`). Retourne une copie des
+    tâches où `Start` / `Finish` sont la prévision, avec les colonnes
+    `Start prévu` / `Finish prévu` (planning théorique), `Début réel` / `Fin réel`
+    et `Glissement (j)` (fin prévisionnelle − fin prévue). Les tâches de chaque
+    projet doivent être contiguës et dans l'ordre de leur enchaînement.
+    """
+    cles = ["Projet", "Task"] if "Projet" in taches and "Projet" in reels else ["Task"]
+    df = taches.copy()
+    debut = df["Start"].to_numpy("datetime64[ns]")
+    fin = df["Finish"].to_numpy("datetime64[ns]")
+    df["Start prévu"], df["Finish prévu"] = debut, fin
+
+    index_reels = reels.drop_duplicates(cles, keep="last").set_index(cles)[COLONNES_REELLES]
+    lignes = pd.MultiIndex.from_frame(df[cles]) if len(cles) > 1 else pd.Index(df["Task"])
+    phase = df["Type"].to_numpy() == "Phase"
+    inconnues = index_reels.index.difference(lignes[phase])
+    if len(inconnues):
+        raise ValueError(f"Dates réelles de phases inconnues : {list(inconnues)}")
+    apparies = index_reels.reindex(lignes)
+    debut_reel = np.where(phase, apparies["Début réel"].to_numpy("datetime64[ns]"), np.datetime64("NaT"))
+    fin_reelle = np.where(phase, apparies["Fin réel"].to_numpy("datetime64[ns]"), np.datetime64("NaT"))
+
+    duree = fin - debut
+    a_debut, a_fin = ~np.isnat(debut_reel), ~np.isnat(fin_reelle)
+    reel = a_debut | a_fin
+    fin_effective = np.where(a_fin, fin_reelle, debut_reel + duree)
+    debut_effectif = np.where(a_debut, debut_reel, fin_reelle - duree)
+
+    # Glissement de la dernière phase réelle qui précède chaque tâche dans son projet
+    rangs = np.arange(len(df))
+    if "Projet" in df:
+        projets = df["Projet"].to_numpy()
+        premiere = np.r_[True, projets[1:] != projets[:-1]] if len(df) else np.zeros(0, bool)
+    else:
+        premiere = rangs == 0
+    source = np.maximum.accumulate(np.where(reel | premiere, rangs, 0)) if len(df) else rangs
+    glissement = np.where(reel[source], (fin_effective - fin)[source], np.timedelta64(0, "ns"))
+
+    df["Start"] = np.where(reel, debut_effectif, debut + glissement)
+    df["Finish"] = np.where(reel, fin_effective, fin + glissement)
+    df["Début réel"], df["Fin réel"] = debut_reel, fin_reelle
+    df["Glissement (j)"] = (df["Finish"].to_numpy("datetime64[ns]") - fin) / _UN_JOUR
+    return df
+
+
+def glissement_fin(taches):
+    """Glissement (jours) de la fin de chaque projet : Series indexée par `Projet`, ou nombre pour un projet seul."""
+    if "Projet" not in taches:
+        return float((taches["Finish"].max() - taches["Finish prévu"].max()) / pd.Timedelta(days=1))
+    fins = taches.groupby("Projet", sort=False)[["Finish", "Finish prévu"]].max()
+    return (fins["Finish"] - fins["Finish prévu"]) / pd.Timedelta(days=1)
+
+
+def ajouter_avancement(fig, taches):
+    """
+    Ajoute à un Gantt (`y` = nom de la tâche) de tâches reprévues le planning
+    prévu initial en barres fantômes, les périodes réelles en barres fines et le
+    glissement de la fin du projet.
+    """
+    prevu = taches.drop(columns=["Start", "Finish"]).rename(columns=dict(zip(COLONNES_PREVUES, ["Start", "Finish"])))
+    ajouter_barres_reference(fig, prevu, libelle="Prévu initial")
+
+    reels = taches[taches["Début réel"].notna() & taches["Fin réel"].notna()]
+    if not reels.empty:
+        debuts, fins = pd.to_datetime(reels["Début réel"]), pd.to_datetime(reels["Fin réel"])
+        fig.add_trace(go.Bar(
+            base=debuts, x=(fins - debuts) / pd.Timedelta(milliseconds=1), y=reels["Task"], orientation="h",
+            name="Réel", width=0.3, marker=dict(color=COULEUR_REEL, line=dict(width=0)),
+            customdata=np.column_stack([debuts.dt.strftime("%d/%m/%Y"), fins.dt.strftime("%d/%m/%Y")]),
+            hovertemplate="%{y}<br>Réel : %{customdata[0]} → %{customdata[1]}<extra></extra>",
+        ))
+
+    jours = glissement_fin(taches)
+    fig.add_annotation(
+        xref="paper", yref="paper", x=1, y=1.15, xanchor="right", showarrow=False,
+        text=f"<b>Glissement de la fin : {jours:+.0f} j</b>",
+        font=dict(size=14, color="#c62828" if jours > 0 else "#2e7d32"),
+    )
+    return fig
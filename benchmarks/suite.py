@@ -0,0 +1,212 @@
+"""
+Suite de benchmarks du chemin de génération du Gantt.
+
+    python -m benchmarks.suite                                   # mesure et affiche
+    python -m benchmarks.suite --sauver benchmarks/reference.json  # enregistre la référence
+    python -m benchmarks.suite --comparer benchmarks/reference.json --seuil 0.25
+
+Chaque étape est mesurée pour plusieurs tailles de planning (nombre de tâches).
+Avec `--comparer`, une étape plus lente que la référence de plus de `seuil`
+(25 % par défaut) est signalée comme régression et le code de sortie vaut 1.
+Les références dépendent de la machine : les régénérer après un changement
+de poste ou d'environnement.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+
+from config import ETAT_AUDIT_NON_EFFECTUE
+from gantt import (
+    ajouter_bandeaux,
+    construire_dataframe_taches,
+    construire_figure_timeline,
+    enchainer_phases,
+    generer_figure_gantt,
+    generer_glossaire_html,
+    generer_phases,
+)
+
+TAILLES = [1, 100, 10_000, 100_000]
+REFERENCE = Path(__file__).parent / "reference.json"
+SEUIL_REGRESSION = 0.25
+# En dessous de cet écart absolu, une différence relève du bruit de mesure
+ECART_MINIMAL_S = 0.001
+BUDGET_PAR_MESURE_S = 1.0
+REPETITIONS_MAX = 20
+DATE_DEBUT = "2026-01-05"
+
+
+def projets_synthetiques(nb_taches):
+    """
+    Listes de phases (une par projet) produisant exactement `nb_taches` tâches au total.
+
+    Chaque projet suit le parcours complet ; un seul projet enchaîné sur des
+    milliers de tâches dépasserait les dates représentables par pandas.
+    """
+    modele = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+    projets = []
+    nb = 0
+    while nb < nb_taches:
+        phases = []
+        for phase in modele:
+            if nb >= nb_taches:
+                break
+            if not phase["gantt"]:
+                continue
+            phase = dict(phase, nom=f"{phase['nom']} #{len(projets)}")
+            if nb + 1 + (phase["delai_mo"] > 0) > nb_taches:
+                phase["delai_mo"] = 0
+            nb += 1 + (phase["delai_mo"] > 0)
+            phases.append(phase)
+        projets.append(phases)
+    return projets
+
+
+def _enchainer(projets):
+    taches = []
+    for phases in projets:
+        taches += enchainer_phases(phases, DATE_DEBUT, include_financement=False)
+    return taches
+
+
+# --------------------
+# Étapes mesurées : chacune retourne (préparation non mesurée, fonction mesurée)
+def _etape_enchainement(n):
+    projets = projets_synthetiques(n)
+    return lambda: None, lambda _: _enchainer(projets)
+
+
+def _etape_dataframe(n):
+    taches = _enchainer(projets_synthetiques(n))
+    return lambda: None, lambda _: construire_dataframe_taches(taches)
+
+
+def _etape_timeline(n):
+    df = construire_dataframe_taches(_enchainer(projets_synthetiques(n)))
+    return lambda: None, lambda _: construire_figure_timeline(df)
+
+
+def _etape_bandeaux(n):
+    df = construire_dataframe_taches(_enchainer(projets_synthetiques(n)))
+    fig = construire_figure_timeline(df)
+    # `ajouter_bandeaux` modifie la figure : une copie fraîche par répétition
+    return lambda: go.Figure(fig), lambda copie: ajouter_bandeaux(copie, df)
+
+
+def _etape_glossaire(n):
+    return lambda: None, lambda _: generer_glossaire_html()
+
+
+def _etape_rerun(n):
+    projets = projets_synthetiques(n)
+
+    def rerun(_):
+        # Ce que fait l'application à chaque exécution du script, sérialisation
+        # de la figure envoyée au navigateur comprise
+        df = construire_dataframe_taches(_enchainer(projets))
+        generer_figure_gantt(df).to_json()
+        generer_glossaire_html()
+
+    return lambda: None, rerun
+
+
+# Étapes dont le coût ne dépend pas de la taille du planning : mesurées une seule fois
+ETAPES_SANS_TAILLE = {"glossaire"}
+
+ETAPES = {
+    "enchainement": _etape_enchainement,
+    "dataframe": _etape_dataframe,
+    "timeline": _etape_timeline,
+    "bandeaux": _etape_bandeaux,
+    "glossaire": _etape_glossaire,
+    "rerun": _etape_rerun,
+}
+
+
+def mesurer(etape, taille, budget=BUDGET_PAR_MESURE_S):
+    """Mesure une étape : répète jusqu'à épuiser `budget` secondes (au moins une fois)."""
+    preparer, fonction = ETAPES[etape](taille)
+    durees = []
+    while not durees or (sum(durees) < budget and len(durees) < REPETITIONS_MAX):
+        argument = preparer()
+        debut = time.perf_counter()
+        fonction(argument)
+        durees.append(time.perf_counter() - debut)
+    return {"median_s": statistics.median(durees), "min_s": min(durees), "repetitions": len(durees)}
+
+
+def executer(etapes=None, tailles=None, budget=BUDGET_PAR_MESURE_S, afficher=print):
+    """Exécute les mesures et retourne {"etape[taille]": statistiques}."""
+    resultats = {}
+    for etape in etapes or ETAPES:
+        tailles_etape = tailles or TAILLES
+        if etape in ETAPES_SANS_TAILLE:
+            tailles_etape = tailles_etape[:1]
+        for taille in tailles_etape:
+            cle = f"{etape}[{taille}]"
+            resultats[cle] = mesurer(etape, taille, budget)
+            afficher(f"{cle:<24} médiane {resultats[cle]['median_s'] * 1000:10.2f} ms "
+                     f"({resultats[cle]['repetitions']} répétitions)")
+    return resultats
+
+
+def comparer(resultats, reference, seuil=SEUIL_REGRESSION):
+    """
+    Compare des résultats à une référence et retourne la liste des régressions.
+
+    La comparaison porte sur le meilleur temps, le moins sensible aux
+    interférences de la machine. Chaque régression est un tuple
+    (clé, temps de référence, temps actuel, ratio). Seules les clés présentes
+    des deux côtés sont comparées.
+    """
+    regressions = []
+    for cle, mesure in resultats.items():
+        if cle not in reference:
+            continue
+        avant, apres = reference[cle]["min_s"], mesure["min_s"]
+        if apres > avant * (1 + seuil) and apres - avant > ECART_MINIMAL_S:
+            regressions.append((cle, avant, apres, apres / avant))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la génération du Gantt")
+    parser.add_argument("--etapes", nargs="+", choices=list(ETAPES), default=list(ETAPES))
+    parser.add_argument("--tailles", nargs="+", type=int, default=TAILLES)
+    parser.add_argument("--budget", type=float, default=BUDGET_PAR_MESURE_S,
+                        help="Temps de mesure par étape et par taille (secondes)")
+    parser.add_argument("--sauver", type=Path, help="Enregistre les résultats comme référence")
+    parser.add_argument("--comparer", type=Path, nargs="?", const=REFERENCE,
+                        help="Compare à une référence (défaut : benchmarks/reference.json)")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION)
+    args = parser.parse_args(arguments)
+
+    resultats = executer(args.etapes, args.tailles, args.budget)
+
+    if args.sauver:
+        args.sauver.write_text(json.dumps({
+            "machine": {"python": platform.python_version(), "plateforme": platform.platform()},
+            "resultats": resultats,
+        }, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Référence enregistrée dans {args.sauver}")
+
+    if args.comparer:
+        reference = json.loads(args.comparer.read_text(encoding="utf-8"))["resultats"]
+        regressions = comparer(resultats, reference, args.seuil)
+        for cle, avant, apres, ratio in regressions:
+            print(f"RÉGRESSION {cle} : {avant * 1000:.2f} ms -> {apres * 1000:.2f} ms (x{ratio:.2f})")
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de {args.seuil:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
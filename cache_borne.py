@@ -0,0 +1,131 @@
+"""
+Cache borné des plannings et des figures calculés pour les sessions.
+
+    figures = CacheBorne("figures", max_entrees=64, ttl_s=1800, budget_octets=64 * 1024**2)
+    fig = figures.obtenir(cle, lambda: generer_figure_gantt(df))
+
+Le cache est partagé par toutes les sessions d'un processus : deux sessions
+aux paramètres identiques reçoivent le même objet, qui ne doit donc pas être
+modifié (copier une figure avant d'y ajouter des traces). Sa mémoire est
+bornée par trois limites, appliquées à chaque insertion :
+- `max_entrees` : au-delà, les entrées les moins récemment lues sont évincées ;
+- `ttl_s` : une entrée plus ancienne est recalculée à la lecture suivante ;
+- `budget_octets` : la taille estimée (`estimer_taille`) de toutes les entrées
+  reste sous ce budget, par éviction des moins récemment lues.
+
+Les lectures (succès, échecs) et les évictions (par cause) sont comptées dans
+`metriques`, avec la taille et le nombre d'entrées de chaque cache.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+import metriques
+
+_ABSENTE = object()  # entrée absente, à distinguer d'une valeur None gardée
+
+
+def estimer_taille(valeur):
+    """Taille estimée d'une valeur en octets : mémoire d'un DataFrame, JSON d'une figure Plotly."""
+    if isinstance(valeur, pd.DataFrame):
+        return int(valeur.memory_usage(index=True, deep=True).sum())
+    if isinstance(valeur, BaseFigure):
+        return len(valeur.to_json())
+    if isinstance(valeur, (bytes, bytearray, str)):
+        return len(valeur)
+    return sys.getsizeof(valeur)
+
+
+class CacheBorne:
+    """Cache LRU borné en nombre d'entrées, en âge et en octets, sûr entre threads."""
+
+    def __init__(self, nom, max_entrees=128, ttl_s=None, budget_octets=None, taille=estimer_taille,
+                 horloge=time.monotonic):
+        self.nom = nom
+        self.max_entrees = max_entrees
+        self.ttl_s = ttl_s
+        self.budget_octets = budget_octets
+        self._taille = taille
+        self._horloge = horloge
+        self._entrees = OrderedDict()  # cle -> (valeur, octets, date d'insertion), la plus récente en fin
+        self.octets = 0
+        self.statistiques = {"succes": 0, "echecs": 0, "evictions": 0}
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def _expiree(self, insertion, maintenant):
+        return self.ttl_s is not None and maintenant - insertion > self.ttl_s
+
+    def _evincer(self, cle, cause):
+        _, octets, _ = self._entrees.pop(cle)
+        self.octets -= octets
+        self.statistiques["evictions"] += 1
+        metriques.CACHE_EVICTIONS.inc(cache=self.nom, cause=cause)
+
+    def _publier(self):
+        metriques.CACHE_OCTETS.set(self.octets, cache=self.nom)
+        metriques.CACHE_ENTREES.set(len(self._entrees), cache=self.nom)
+
+    def lire(self, cle, defaut=None):
+        """Valeur de `cle` (qui devient la plus récente), ou `defaut` si elle est absente ou expirée."""
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and self._expiree(entree[2], self._horloge()):
+                self._evincer(cle, "ttl")
+                self._publier()
+                entree = None
+            if entree is not None:
+                self._entrees.move_to_end(cle)
+            self.statistiques["succes" if entree is not None else "echecs"] += 1
+            metriques.CACHE_LECTURES.inc(cache=self.nom, resultat="succes" if entree is not None else "echec")
+        return defaut if entree is None else entree[0]
+
+    def ecrire(self, cle, valeur):
+        """
+        Ajoute `valeur` sous `cle`, puis évince les entrées expirées et les moins
+        récemment lues jusqu'à respecter les limites. Une valeur plus grande que
+        le budget à elle seule n'est pas gardée.
+        """
+        octets = self._taille(valeur)
+        with self._verrou:
+            maintenant = self._horloge()
+            if cle in self._entrees:
+                self.octets -= self._entrees.pop(cle)[1]
+            if self.budget_octets is not None and octets > self.budget_octets:
+                self.statistiques["evictions"] += 1
+                metriques.CACHE_EVICTIONS.inc(cache=self.nom, cause="octets")
+                self._publier()
+                return
+            for ancienne, (_, _, insertion) in list(self._entrees.items()):
+                if self._expiree(insertion, maintenant):
+                    self._evincer(ancienne, "ttl")
+            while self._entrees and len(self._entrees) >= self.max_entrees:
+                self._evincer(next(iter(self._entrees)), "lru")
+            while self._entrees and self.budget_octets is not None and self.octets + octets > self.budget_octets:
+                self._evincer(next(iter(self._entrees)), "octets")
+            self._entrees[cle] = (valeur, octets, maintenant)
+            self.octets += octets
+            self._publier()
+
+    def obtenir(self, cle, calculer):
+        """Valeur de `cle`, calculée par `calculer()` et gardée en cache si elle est absente (None n'est pas gardé)."""
+        valeur = self.lire(cle, _ABSENTE)
+        if valeur is _ABSENTE:
+            valeur = calculer()
+            if valeur is not None:
+                self.ecrire(cle, valeur)
+        return valeur
+
+    def vider(self):
+        """Retire toutes les entrées (sans les compter comme évictions)."""
+        with self._verrou:
+            self._entrees.clear()
+            self.octets = 0
+            self._publier()
@@ -0,0 +1,42 @@
+/*
+ * Application des opérations de `differentiel.difference` à une figure JSON :
+ * [chemin, valeur] affecte, [chemin] supprime ; un chemin vide remplace tout.
+ *
+ * Chargé par index.html, et par Node pour vérifier que Python et le
+ * navigateur reconstruisent la même figure (tests/test_differentiel.py).
+ */
+(function (racine) {
+  "use strict";
+
+  function appliquer(document, operations) {
+    operations.forEach(function (operation) {
+      var chemin = operation[0];
+      if (chemin.length === 0) {
+        document = operation[1];
+        return;
+      }
+      var parent = document;
+      for (var i = 0; i < chemin.length - 1; i++) {
+        parent = parent[chemin[i]];
+      }
+      var cle = chemin[chemin.length - 1];
+      if (operation.length === 1) {
+        if (Array.isArray(parent)) {
+          parent.splice(cle, 1);
+        } else {
+          delete parent[cle];
+        }
+      } else {
+        parent[cle] = operation[1];
+      }
+    });
+    return document;
+  }
+
+  var api = {appliquer: appliquer};
+  if (typeof module !== "undefined" && module.exports) {
+    module.exports = api;
+  } else {
+    racine.Differentiel = api;
+  }
+})(this);
@@ -0,0 +1,49 @@
+/*
+ * Enchaînement des phases dans le navigateur, à l'identique de
+ * `gantt.enchainer_phases` : financement éventuel, puis chaque phase affichée
+ * sur le Gantt suivie de son délai MO. Dates en millisecondes UTC.
+ *
+ * Chargé par index.html, et par Node pour vérifier que les deux calculs
+ * donnent les mêmes dates (tests/test_planning_navigateur.py).
+ */
+(function (racine) {
+  "use strict";
+
+  var SEMAINE = 7 * 24 * 3600 * 1000;
+
+  function enchainer(gabarit, durees) {
+    var taches = [];
+    var courant = gabarit.debut;
+
+    if (gabarit.financement) {
+      var finFinancement = courant + gabarit.financement.semaines * SEMAINE;
+      taches.push({tache: gabarit.financement.nom, debut: courant, fin: finFinancement,
+                   type: "Financement", groupe: "Financement"});
+      courant = finFinancement;
+    }
+
+    gabarit.phases.forEach(function (phase) {
+      if (!phase.gantt) {
+        return; // n'apparait pas sur le Gantt (ESQ)
+      }
+      var duree = durees[phase.nom] !== undefined ? durees[phase.nom] : phase.duree;
+      var finPhase = courant + duree * SEMAINE;
+      taches.push({tache: phase.nom, debut: courant, fin: finPhase, type: "Phase", groupe: phase.groupe});
+      if (phase.delai_mo > 0) {
+        var finDelai = finPhase + phase.delai_mo * SEMAINE;
+        taches.push({tache: phase.nom, debut: finPhase, fin: finDelai, type: "Délai MO", groupe: phase.groupe});
+        courant = finDelai;
+      } else {
+        courant = finPhase;
+      }
+    });
+    return taches;
+  }
+
+  var api = {SEMAINE: SEMAINE, enchainer: enchainer};
+  if (typeof module !== "undefined" && module.exports) {
+    module.exports = api;
+  } else {
+    racine.Planning = api;
+  }
+})(this);
@@ -0,0 +1,102 @@
+"""
+Configuration et constantes de l'application Gantt de rénovation.
+"""
+
+import base64
+from pathlib import Path
+
+# --------------------
+# Logo
+LOGO_PATH = Path(__file__).parent / "images" / "Logo_ACTEE_CMYN-HD.png"
+LOGO_BASE64 = base64.b64encode(LOGO_PATH.read_bytes()).decode("ascii")
+
+# --------------------
+# Glossaire simplifié pour affichage dans les inputs (tooltips)
+GLOSSAIRE = {
+    "DIAG": "Analyse fonctionnelle, urbanistique et technique du bâti existant, estimation financière et faisabilité.",
+    "ESQ": "Proposer des solutions d'ensemble, vérifier faisabilité et compatibilité financière (n’apparaît pas sur le GANTT).",
+    "APS": "Proposer solutions traduisant le programme fonctionnel, dispositions techniques générales et estimation coût (min 3 semaines).",
+    "APD": "Déterminer surfaces détaillées, plans, façades, principes constructifs et cohérence technique et économique (min 6 semaines).",
+    "Autorisations Administratives": "Rédaction des documents nécessaires aux autorisations (Permis de Construire / Déclaration Préalable).",
+    "PRO": "Préciser les éléments conceptuels, établir coût prévisionnel et délai global de réalisation (min 4 semaines).",
+    "ACT / AMT": "Assistance pour la passation des marchés : préparer la consultation, analyser les offres, vérifier conformité.",
+    "DCE": "Dossier de Consultation des Entreprises fourni par la maîtrise d’œuvre pour consultation des entreprises.",
+    "EXE": "Études d'exécution : documents et suivi technique pour réaliser l'ouvrage, mise à jour du calendrier.",
+    "AOR": "Assistance aux opérations de réception : suivi des réserves, validation des DOE et gestion des désordres en GPA."
+}
+
+# Glossaire complet pour affichage sous le Gantt
+GLOSSAIRE_COMPLET = {
+    "DIAG": "Phase DIAG : Cette étape de la mission conception a pour objet d'établir “un état des lieux, de fournir une analyse fonctionnelle, urbanistique, architecturale et technique du bâti existant et ainsi de permettre d'établir un programme fonctionnel d'utilisation du bâtiment ainsi qu'une estimation financière et d'en déduire la faisabilité de l'opération.",
+    "ESQ": "Phase ESQ : cette étape de la mission conception a pour objet de “proposer une ou plusieurs solutions d'ensemble, traduisant les éléments majeurs du programme, d'en indiquer les délais de réalisation, d'examiner leur compatibilité avec la partie de l'enveloppe financière prévisionnelle retenue par le maître d'ouvrage et affectée aux travaux, ainsi que de vérifier la faisabilité de l'opération au regard des différentes contraintes du programme et du site. (la mission n’apparaît pas sur le GANTT d’ailleurs)",
+    "APS": "Phase APS : cette étape de la mission conception a pour objet de proposer des solutions traduisant le programme fonctionnel, d'en présenter les dispositions générales techniques, d'indiquer des durées prévisionnelles et d'établir une estimation provisoire du coût prévisionnel des travaux.",
+    "APD": "Phase APD : déterminer les surfaces détaillées de tous les éléments du programme, arrêter plans, coupes et façades, définir principes constructifs, matériaux et installations et vérifier cohérence technique et économique.",
+    "Autorisations Administratives": "Lorsque l’APD est validé, rédiger les documents nécessaires à l’obtention des autorisations administratives et suivre l’instruction auprès des services administratifs.",
+    "PRO": "Phase PRO : préciser, déterminer, décrire les éléments de conception des phases précédentes, établir un coût prévisionnel et un délai global de réalisation.",
+    "ACT / AMT": "Assistance pour préparer la consultation des entreprises, analyser les offres et vérifier leur conformité technique et financière.",
+    "DCE": "Fournir le dossier de consultation des entreprises comportant les pièces nécessaires à la consultation et les choix du maître d’ouvrage.",
+    "EXE": "Réaliser l’ouvrage en suivant les plans et études préalables, actualiser le calendrier et suivre les lots.",
+    "AOR": "Assurer le suivi des réserves jusqu’à levée, valider les DOE et examiner les désordres pendant la période de GPA."
+}
+
+# --------------------
+# États du projet proposés à l'utilisateur
+ETAT_AUDIT_NON_EFFECTUE = "Nous n'avons pas encore effectué d'audit énergétique"
+ETAT_AUDIT_EFFECTUE = "Nous venons de recevoir les comptes rendus des études préalables (dont l'audit énergétique)"
+ETAT_AMO_PROGRAMMISTE = "Nous souhaitons faire intervenir un AMO Programmiste"
+ETAT_SELECTION_MOE = "Nous voulons lancer notre marché de recrutement de maîtrise d'oeuvre"
+ETAT_EQUIPE_SELECTIONNEE = "Nous venons de sélectionner notre équipe de maitrise d'oeuvre"
+
+ETATS = [
+    ETAT_AUDIT_NON_EFFECTUE,
+    ETAT_AUDIT_EFFECTUE,
+    ETAT_AMO_PROGRAMMISTE,
+    ETAT_SELECTION_MOE,
+    ETAT_EQUIPE_SELECTIONNEE,
+]
+
+# Codes des états utilisés par les modèles de phases (voir modeles_phases.py)
+CODES_ETATS = {
+    "audit_non_effectue": ETAT_AUDIT_NON_EFFECTUE,
+    "audit_effectue": ETAT_AUDIT_EFFECTUE,
+    "amo_programmiste": ETAT_AMO_PROGRAMMISTE,
+    "selection_moe": ETAT_SELECTION_MOE,
+    "equipe_selectionnee": ETAT_EQUIPE_SELECTIONNEE,
+}
+
+# --------------------
+# Modèles de phases
+GROUPES_PHASES = ["Études préalables", "AMO", "Sélection MOE", "MOE"]
+MODELE_PHASES_PATH = Path(__file__).parent / "modeles" / "phases.json"
+
+# Portefeuille d'exemple de la vue Portefeuille
+PORTEFEUILLE_EXEMPLE_PATH = Path(__file__).parent / "exemples" / "portefeuille.json"
+
+# Limites des caches de plannings et de figures partagés par les sessions d'un
+# processus (voir cache_borne.py) : nombre d'entrées, âge maximal, octets
+LIMITES_CACHE_PLANNINGS = dict(max_entrees=256, ttl_s=3600, budget_octets=32 * 1024**2)
+LIMITES_CACHE_FIGURES = dict(max_entrees=64, ttl_s=1800, budget_octets=64 * 1024**2)
+
+# --------------------
+# Couleurs du Gantt
+COULEURS_TYPES = {"Phase": "#0915a6", "Délai MO": "#ff5300", "Financement": "green", "Lot": "#7986cb"}
+GROUPES_BANDEAUX = ["Études préalables", "AMO", "Sélection MOE", "MOE", "Financement"]
+COULEURS_GROUPES = {
+    "Études préalables": "#cfe3ff",
+    "AMO": "#fff2b3",
+    "Sélection MOE": "#ffe5cc",
+    "MOE": "#e6ccff",
+    "Financement": "#d6f5d6",
+}
+COULEURS_GLOSSAIRE = {
+    "DIAG": "#cfe3ff",
+    "ESQ": "#cfe3ff",
+    "APS": "#d4e6f1",
+    "APD": "#d4e6f1",
+    "Autorisations Administratives": "#ffe5cc",
+    "PRO": "#e6ccff",
+    "ACT / AMT": "#e6ccff",
+    "DCE": "#e6ccff",
+    "EXE": "#f9f2f2",
+    "AOR": "#f9f2f2"
+}
@@ -0,0 +1,107 @@
+"""
+Mise à jour différentielle des figures Plotly : seules les modifications sont envoyées au navigateur.
+
+    operations = difference(avant, apres)      # figures en JSON (dict)
+    apres == appliquer(avant, operations)
+
+    gantt_differentiel(fig, key="gantt")        # à la place de st.plotly_chart(fig)
+
+Une opération est `[chemin, valeur]` (affectation) ou `[chemin]` (suppression),
+le chemin listant les clés et indices depuis la racine de la figure : une durée
+modifiée ne renvoie que les barres déplacées et les bandeaux redimensionnés. Un
+tableau dont la plupart des éléments changent est remplacé d'un bloc.
+
+Le composant (`composants/gantt_differentiel`) garde la figure affichée et
+applique les opérations avec `Plotly.react` : avec un `uirevision` stable
+(voir `gantt.construire_figure_timeline`), le zoom de l'utilisateur est
+conservé. plotly.js est servi depuis le paquet Python `plotly`.
+"""
+
+import json
+from pathlib import Path
+
+import plotly
+import streamlit as st
+import streamlit.components.v1 as components
+
+DOSSIER_COMPOSANT = Path(__file__).parent / "composants" / "gantt_differentiel"
+# plotly.min.js du paquet installé, servi comme un composant sans interface
+DOSSIER_PLOTLY_JS = Path(plotly.__file__).parent / "package_data"
+
+_composant = components.declare_component("gantt_differentiel", path=str(DOSSIER_COMPOSANT))
+_plotly_js = components.declare_component("plotly_js", path=str(DOSSIER_PLOTLY_JS))
+# Adresse relative à celle du composant (/component/<nom>/index.html)
+URL_PLOTLY_JS = f"../{_plotly_js.name}/plotly.min.js"
+
+
+def _taille(valeur):
+    return len(json.dumps(valeur, separators=(",", ":")))
+
+
+def difference(avant, apres, chemin=()):
+    """Opérations qui transforment le document JSON `avant` en `apres` (voir `appliquer`)."""
+    if isinstance(avant, dict) and isinstance(apres, dict):
+        operations = [[[*chemin, cle]] for cle in sorted(avant.keys() - apres.keys())]
+        for cle, valeur in apres.items():
+            if cle not in avant:
+                operations.append([[*chemin, cle], valeur])
+            elif avant[cle] != valeur:
+                operations += difference(avant[cle], valeur, (*chemin, cle))
+        return operations
+    if isinstance(avant, list) and isinstance(apres, list) and len(avant) == len(apres):
+        operations = []
+        for index, (element_avant, element_apres) in enumerate(zip(avant, apres)):
+            if element_avant != element_apres:
+                operations += difference(element_avant, element_apres, (*chemin, index))
+        # Remplacer le tableau d'un bloc s'il est plus court à envoyer que ses modifications
+        if len(operations) > 1 and _taille(operations) >= _taille(apres):
+            return [[list(chemin), apres]]
+        return operations
+    return [[list(chemin), apres]]
+
+
+def appliquer(document, operations):
+    """Applique les `operations` de `difference` à `document` (modifié sur place) et le retourne."""
+    for operation in operations:
+        chemin = operation[0]
+        if not chemin:
+            document = operation[1]
+            continue
+        parent = document
+        for cle in chemin[:-1]:
+            parent = parent[cle]
+        if len(operation) == 1:
+            del parent[chemin[-1]]
+        else:
+            parent[chemin[-1]] = operation[1]
+    return document
+
+
+def message_figure(figure, envoi, demande):
+    """
+    Arguments du composant pour afficher `figure` (JSON) et nouvel état d'envoi.
+
+    `envoi` est le dernier envoi de la session ({"version", "figure", "demande"})
+    ou None ; `demande` est la dernière demande de figure complète du navigateur
+    (il n'a pas la version attendue). Retourne (arguments, envoi).
+    """
+    if envoi is None or demande != envoi["demande"]:
+        version = 1 if envoi is None else envoi["version"] + 1
+        arguments = {"version": version, "figure": figure, "plotly_js": URL_PLOTLY_JS}
+        return arguments, {"version": version, "figure": figure, "demande": demande}
+    if figure == envoi["figure"]:
+        # Rien de nouveau : le navigateur a déjà cette version et ignore le message
+        return {"version": envoi["version"], "base": envoi["version"], "operations": []}, envoi
+    version = envoi["version"] + 1
+    arguments = {"version": version, "base": envoi["version"], "operations": difference(envoi["figure"], figure)}
+    return arguments, {"version": version, "figure": figure, "demande": demande}
+
+
+def gantt_differentiel(fig, key="gantt_differentiel"):
+    """Affiche `fig` en n'envoyant au navigateur que ses différences avec la figure qu'il affiche déjà."""
+    valeur = st.session_state.get(key)
+    demande = valeur.get("demande") if valeur else None
+    arguments, st.session_state[f"{key}_envoi"] = message_figure(
+        json.loads(fig.to_json()), st.session_state.get(f"{key}_envoi"), demande)
+    _composant(**arguments, key=key, default=None)
+    return arguments
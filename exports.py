@@ -0,0 +1,327 @@
+"""
+Exports du tableau des tâches vers des formats de calendrier et de planification.
+
+Les exports sont produits en flux (générateurs de lignes) : un portefeuille
+de plusieurs centaines de milliers de tâches s'écrit en mémoire constante,
+sans jamais construire le document complet.
+"""
+
+import hashlib
+import itertools
+import zipfile
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+# Nombre de lignes converties d'un bloc : borne la mémoire des conversions vectorisées
+TAILLE_MORCEAU = 10_000
+
+
+def _iter_morceaux(taches):
+    """
+    Itère sur des morceaux d'au plus TAILLE_MORCEAU lignes.
+
+    `taches` est un DataFrame ou un itérable de DataFrames (par exemple un
+    portefeuille lu par blocs).
+    """
+    for df in ([taches] if isinstance(taches, pd.DataFrame) else taches):
+        for debut in range(0, len(df), TAILLE_MORCEAU):
+            yield df.iloc[debut:debut + TAILLE_MORCEAU]
+
+
+# --------------------
+# iCalendar (RFC 5545)
+PRODID_ICS = "-//ACTEE//Assistant Planification Renovation//FR"
+LONGUEUR_LIGNE_ICS = 75
+
+
+def _echapper_ics(texte):
+    return (str(texte).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _plier_ics(ligne):
+    """Replie une ligne de contenu à 75 octets (les suites commencent par une espace)."""
+    octets = ligne.encode("utf-8")
+    if len(octets) <= LONGUEUR_LIGNE_ICS:
+        return ligne + "\r\n"
+    morceaux = []
+    debut, limite = 0, LONGUEUR_LIGNE_ICS
+    while debut < len(octets):
+        fin = min(debut + limite, len(octets))
+        # Ne pas couper au milieu d'un caractère UTF-8 multi-octets
+        while fin < len(octets) and (octets[fin] & 0xC0) == 0x80:
+            fin -= 1
+        morceaux.append(octets[debut:fin].decode("utf-8"))
+        debut, limite = fin, LONGUEUR_LIGNE_ICS - 1
+    return "\r\n ".join(morceaux) + "\r\n"
+
+
+def _uid_ics(projet, tache, type_tache, debut):
+    empreinte = hashlib.sha1(f"{projet}|{tache}|{type_tache}|{debut}".encode("utf-8")).hexdigest()
+    return f"{empreinte}@renovation-gantt"
+
+
+def iter_ics(taches, types=("Phase", "Délai MO", "Financement"), horodatage=None):
+    """
+    Génère le fichier iCalendar des tâches, ligne par ligne (fins de ligne CRLF).
+
+    `taches` est le DataFrame produit par `generer_taches` / `generer_portefeuille`
+    ou un itérable de tels DataFrames. Chaque tâche dont le type figure dans
+    `types` devient un VEVENT journée entière ; les fenêtres 'Délai MO' sont
+    intitulées comme telles pour être distinguées des phases.
+    """
+    horodatage = (horodatage or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield f"PRODID:{PRODID_ICS}\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield "METHOD:PUBLISH\r\n"
+
+    for morceau in _iter_morceaux(taches):
+        morceau = morceau[morceau["Type"].isin(types)]
+        # Conversions vectorisées par morceau plutôt que ligne par ligne
+        debuts = pd.to_datetime(morceau["Start"]).dt.strftime("%Y%m%d")
+        fins = pd.to_datetime(morceau["Finish"]).dt.strftime("%Y%m%d")
+        projets = morceau["Projet"] if "Projet" in morceau else itertools.repeat("")
+        definitions = morceau["Definition"].fillna("")
+        for projet, tache, type_tache, groupe, description, debut, fin in zip(
+                projets, morceau["Task"], morceau["Type"], morceau["Groupe"], definitions, debuts, fins):
+            resume = f"⏳ Délai MO — {tache}" if type_tache == "Délai MO" else tache
+            if projet:
+                resume = f"[{projet}] {resume}"
+
+            yield "BEGIN:VEVENT\r\n"
+            yield f"UID:{_uid_ics(projet, tache, type_tache, debut)}\r\n"
+            yield f"DTSTAMP:{horodatage}\r\n"
+            yield f"DTSTART;VALUE=DATE:{debut}\r\n"
+            if fin > debut:  # sans DTEND, un événement à date unique dure une journée
+                yield f"DTEND;VALUE=DATE:{fin}\r\n"
+            yield _plier_ics(f"SUMMARY:{_echapper_ics(resume)}")
+            yield _plier_ics(f"CATEGORIES:{_echapper_ics(groupe)},{_echapper_ics(type_tache)}")
+            if description:
+                yield _plier_ics(f"DESCRIPTION:{_echapper_ics(description)}")
+            yield "TRANSP:TRANSPARENT\r\n"
+            yield "END:VEVENT\r\n"
+
+    yield "END:VCALENDAR\r\n"
+
+
+def ecrire_ics(taches, chemin, **kwargs):
+    """Écrit le fichier iCalendar des tâches dans `chemin`, en flux."""
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        fichier.writelines(iter_ics(taches, **kwargs))
+
+
+# --------------------
+# Enchaînement des tâches (liens de prédécesseurs)
+def _iter_enchainement(taches, preparer):
+    """
+    Itère sur (id, id du prédécesseur, projet, ligne) en suivant l'enchaînement des phases.
+
+    `preparer(morceau)` retourne le DataFrame des colonnes à écrire, calculées de
+    façon vectorisée pour tout le morceau. Dans un projet, chaque tâche commence
+    à la fin de la précédente : le prédécesseur d'une tâche est donc la ligne qui
+    la précède dans le même projet. L'état est conservé d'un morceau à l'autre,
+    un projet pouvant être coupé entre deux morceaux.
+    """
+    identifiant = 0
+    projet_precedent = None
+    for morceau in _iter_morceaux(taches):
+        prepare = preparer(morceau)
+        colonnes = list(prepare.columns)
+        projets = morceau["Projet"] if "Projet" in morceau else itertools.repeat(None)
+        for projet, valeurs in zip(projets, prepare.itertuples(index=False, name=None)):
+            identifiant += 1
+            predecesseur = identifiant - 1 if identifiant > 1 and projet == projet_precedent else None
+            projet_precedent = projet
+            yield identifiant, predecesseur, projet, dict(zip(colonnes, valeurs))
+
+
+# --------------------
+# Excel (XLSX), écrit en flux dans l'archive : chaînes en ligne, sans table partagée
+_XLSX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_XLSX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_XLSX_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Planning" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_XLSX_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Style 1 : date (format intégré n°14), style 2 : en-tête en gras
+_XLSX_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="3">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_ORIGINE_EXCEL = pd.Timestamp("1899-12-30")
+
+
+def _cellule_texte(valeur, style=""):
+    if valeur is None or valeur != valeur:  # None ou NaN : cellule vide
+        return "<c/>"
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{escape(str(valeur))}</t></is></c>'
+
+
+def _cellule_nombre(valeur, style=""):
+    if valeur is None or valeur != valeur:
+        return "<c/>"
+    return f"<c{style}><v>{valeur}</v></c>"
+
+
+def _preparer_xlsx(morceau):
+    return pd.DataFrame({
+        "Tache": morceau["Task"],
+        "Debut": (pd.to_datetime(morceau["Start"]) - _ORIGINE_EXCEL).dt.days,
+        "Fin": (pd.to_datetime(morceau["Finish"]) - _ORIGINE_EXCEL).dt.days,
+        "Type": morceau["Type"],
+        "Groupe": morceau["Groupe"],
+        "Definition": morceau["Definition"].mask(morceau["Definition"].fillna("") == ""),
+        "Duree": morceau["Duration_weeks"].astype(float).round(2),
+    })
+
+
+def iter_xlsx_feuille(taches):
+    """Génère le XML de la feuille de calcul, ligne par ligne."""
+    entetes = ["ID", "Projet", "Tâche", "Début", "Fin", "Type", "Groupe", "Définition", "Durée (semaines)", "Prédécesseur"]
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+           '<cols><col min="3" max="3" width="60" customWidth="1"/><col min="4" max="5" width="12" customWidth="1"/></cols>'
+           '<sheetData>')
+    yield "<row>" + "".join(_cellule_texte(entete, ' s="2"') for entete in entetes) + "</row>"
+    for identifiant, predecesseur, projet, ligne in _iter_enchainement(taches, _preparer_xlsx):
+        yield ("<row>"
+               + _cellule_nombre(identifiant)
+               + _cellule_texte(projet)
+               + _cellule_texte(ligne["Tache"])
+               + _cellule_nombre(ligne["Debut"], ' s="1"')
+               + _cellule_nombre(ligne["Fin"], ' s="1"')
+               + _cellule_texte(ligne["Type"])
+               + _cellule_texte(ligne["Groupe"])
+               + _cellule_texte(ligne["Definition"])
+               + _cellule_nombre(ligne["Duree"])
+               + _cellule_nombre(predecesseur)
+               + "</row>")
+    yield "</sheetData></worksheet>"
+
+
+def ecrire_xlsx(taches, fichier):
+    """
+    Écrit le classeur Excel des tâches dans `fichier` (chemin ou objet fichier binaire).
+
+    La feuille est compressée au fil de l'eau : seule la ligne courante est en mémoire.
+    """
+    with zipfile.ZipFile(fichier, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _XLSX_RELS)
+        archive.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _XLSX_STYLES)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as feuille:
+            tampon = []
+            for fragment in iter_xlsx_feuille(taches):
+                tampon.append(fragment)
+                if len(tampon) >= 1000:
+                    feuille.write("".join(tampon).encode("utf-8"))
+                    tampon.clear()
+            feuille.write("".join(tampon).encode("utf-8"))
+
+
+# --------------------
+# MS Project XML (MSPDI)
+HEURES_PAR_SEMAINE = 40  # 5 jours ouvrés de 8 heures
+
+
+def _preparer_mspdi(morceau):
+    debuts = pd.to_datetime(morceau["Start"])
+    semaines = morceau["Duration_weeks"].astype(float)
+    jalons = semaines == 0
+    # La fin du tableau des tâches est exclusive : MS Project attend le dernier jour ouvré
+    fins = (pd.to_datetime(morceau["Finish"]) - pd.offsets.BDay(1)).where(~jalons, debuts)
+    return pd.DataFrame({
+        "Nom": morceau["Task"].where(morceau["Type"] != "Délai MO", "Délai MO — " + morceau["Task"]),
+        "Debut": debuts.dt.strftime("%Y-%m-%dT08:00:00"),
+        "Fin": fins.dt.strftime("%Y-%m-%dT") + jalons.map({True: "08:00:00", False: "17:00:00"}),
+        "Heures": (semaines * HEURES_PAR_SEMAINE).round().astype(int),
+        "Jalon": jalons.astype(int),
+        "Definition": morceau["Definition"].fillna(""),
+    })
+
+
+def iter_mspdi(taches, nom_projet="Planning rénovation"):
+    """
+    Génère le fichier MS Project XML (MSPDI) des tâches, élément par élément.
+
+    Les liens fin-début entre tâches suivent l'enchaînement des phases. Dans un
+    portefeuille, chaque projet devient une tâche récapitulative (niveau 1) dont
+    les phases sont les sous-tâches ; MS Project recalcule ses dates à l'import.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    yield '<Project xmlns="http://schemas.microsoft.com/project">\n'
+    yield f"<Name>{escape(nom_projet)}</Name>\n"
+    yield "<ScheduleFromStart>1</ScheduleFromStart>\n"
+    yield "<MinutesPerDay>480</MinutesPerDay>\n<MinutesPerWeek>2400</MinutesPerWeek>\n"
+    yield "<Tasks>\n"
+
+    uid = 0
+    uid_precedent = None
+    projet_courant = None
+    for _, predecesseur, projet, ligne in _iter_enchainement(taches, _preparer_mspdi):
+        niveau = 1
+        if projet is not None:
+            niveau = 2
+            if projet != projet_courant:
+                projet_courant = projet
+                uid += 1
+                yield (f"<Task><UID>{uid}</UID><ID>{uid}</ID><Name>{escape(str(projet))}</Name>"
+                       f"<OutlineLevel>1</OutlineLevel><Summary>1</Summary></Task>\n")
+
+        uid += 1
+        element = (f"<Task><UID>{uid}</UID><ID>{uid}</ID><Name>{escape(ligne['Nom'])}</Name>"
+                   f"<OutlineLevel>{niveau}</OutlineLevel>"
+                   f"<Start>{ligne['Debut']}</Start><Finish>{ligne['Fin']}</Finish>"
+                   f"<Duration>PT{ligne['Heures']}H0M0S</Duration>"
+                   f"<DurationFormat>7</DurationFormat><Milestone>{ligne['Jalon']}</Milestone>")
+        if ligne["Definition"]:
+            element += f"<Notes>{escape(ligne['Definition'])}</Notes>"
+        if predecesseur is not None:
+            element += (f"<PredecessorLink><PredecessorUID>{uid_precedent}</PredecessorUID>"
+                        f"<Type>1</Type></PredecessorLink>")
+        uid_precedent = uid
+        yield element + "</Task>\n"
+
+    yield "</Tasks>\n</Project>\n"
+
+
+def ecrire_mspdi(taches, chemin, **kwargs):
+    """Écrit le fichier MS Project XML des tâches dans `chemin`, en flux."""
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        fichier.writelines(iter_mspdi(taches, **kwargs))
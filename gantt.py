@@ -0,0 +1,323 @@
+"""
+Logique de génération des phases, des tâches et du diagramme de Gantt.
+
+Ce module ne dépend pas de Streamlit : il est partagé par l'application
+(`outil_gantt_projet.py`) et par les outils qui calculent des plannings
+sans interface (API HTTP, exports...).
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from avancement import dates_reelles, reprevoir
+from config import (
+    COULEURS_GLOSSAIRE,
+    COULEURS_GROUPES,
+    COULEURS_TYPES,
+    GLOSSAIRE_COMPLET,
+    GROUPES_BANDEAUX,
+)
+from modeles_phases import charger_modele
+from profilage import etape
+
+TACHE_FINANCEMENT = "💶 Recherche de financement"
+COLONNES_TACHES = ["Task", "Start", "Finish", "Type", "Groupe", "Definition", "Duration_weeks", "hover_def"]
+
+
+# --------------------
+# Phases
+def generer_phases(etat, modele=None):
+    """
+    Retourne la liste des phases (dicts modifiables) applicables à un état du projet.
+
+    Les phases proviennent du modèle actif (voir `modeles_phases`), ou de `modele`,
+    dans l'ordre chronologique : Études préalables, AMO, Sélection MOE puis MOE (Loi MOP).
+    """
+    return (modele or charger_modele()).phases_etat(etat)
+
+
+def appliquer_durees(phases, durees):
+    """
+    Applique des durées personnalisées (semaines) aux phases modifiables.
+
+    `durees` associe le nom d'une phase à sa nouvelle durée. Une durée inférieure
+    au minimum de la phase ou un nom inconnu lève une ValueError.
+    """
+    par_nom = {phase["nom"]: phase for phase in phases}
+    for nom, duree in (durees or {}).items():
+        phase = par_nom.get(nom)
+        if phase is None:
+            raise ValueError(f"Phase inconnue : {nom!r}")
+        if not phase["modifiable"]:
+            raise ValueError(f"Phase non modifiable : {nom!r}")
+        if duree < phase["duree_min"]:
+            raise ValueError(f"Durée de {nom!r} inférieure au minimum ({phase['duree_min']} semaines)")
+        phase["duree"] = duree
+    return phases
+
+
+# --------------------
+# Tâches
+def enchainer_phases(phases, start_date, include_financement=True, recherche_financement_weeks=6):
+    """
+    Enchaîne les phases à partir de `start_date` et retourne la liste des tâches (dicts).
+
+    Chaque phase produit une tâche de type 'Phase', suivie d'une tâche 'Délai MO'
+    lorsque la phase comporte un délai de validation du maître d'ouvrage.
+    """
+    tasks = []
+    current_start = pd.to_datetime(start_date)
+
+    # Recherche financement
+    if include_financement:
+        fin_start = current_start
+        fin_end = fin_start + timedelta(weeks=recherche_financement_weeks)
+        tasks.append(dict(Task=TACHE_FINANCEMENT, Start=fin_start, Finish=fin_end,
+                          Type="Financement", Groupe="Financement", Definition="Recherche et montage des financements (subventions, prêts, etc.)."))
+        current_start = fin_end
+
+    for phase in phases:
+        if not phase.get("gantt", True):
+            continue  # n'apparait pas sur le Gantt (ESQ)
+        start = current_start
+        dur = phase["duree"]
+        delay = phase.get("delai_mo",0)
+        end_phase = start + timedelta(weeks=dur)
+        tasks.append(dict(Task=phase["nom"], Start=start, Finish=end_phase,
+                          Type='Phase', Groupe=phase["groupe"], Definition=phase.get("definition", "")))
+        if delay > 0:
+            end_delay = end_phase + timedelta(weeks=delay)
+            tasks.append(dict(Task=phase["nom"], Start=end_phase, Finish=end_delay,
+                              Type='Délai MO', Groupe=phase["groupe"], Definition=phase.get("definition", "")))
+            current_start = end_delay
+        else:
+            current_start = end_phase
+    return tasks
+
+
+def completer_colonnes(df):
+    """(Re)calcule les colonnes dérivées des dates : durée et texte de survol, avec le glissement s'il y en a un."""
+    df["Duration_weeks"] = (pd.to_datetime(df["Finish"]) - pd.to_datetime(df["Start"])).dt.days / 7
+    df["hover_def"] = df["Definition"].fillna("") + "<br>Durée: " + df["Duration_weeks"].round(1).astype(str) + " semaines"
+    if "Glissement (j)" in df:
+        glisse = df["Glissement (j)"] != 0
+        df.loc[glisse, "hover_def"] += "<br>Glissement: " + df.loc[glisse, "Glissement (j)"].map("{:+.0f} j".format)
+    return df
+
+
+def construire_dataframe_taches(tasks):
+    """Construit le DataFrame des tâches et ses colonnes dérivées (durée, texte de survol)."""
+    return completer_colonnes(pd.DataFrame(tasks, columns=COLONNES_TACHES[:6]))
+
+
+def appliquer_avancement(taches, reels):
+    """Tâches reprévues à partir des dates réelles `reels` (voir `avancement.reprevoir`)."""
+    return completer_colonnes(reprevoir(taches, reels))
+
+
+def generer_taches(phases, start_date, include_financement=True, recherche_financement_weeks=6):
+    """
+    Enchaîne les phases à partir de `start_date` et retourne le DataFrame des tâches.
+
+    Voir `enchainer_phases` pour l'enchaînement et `construire_dataframe_taches`
+    pour les colonnes produites.
+    """
+    with etape("enchainement"):
+        tasks = enchainer_phases(phases, start_date, include_financement, recherche_financement_weeks)
+    with etape("dataframe"):
+        return construire_dataframe_taches(tasks)
+
+
+def cle_taches(phases, start_date, include_financement=True, recherche_financement_weeks=6):
+    """
+    Clé hachable des paramètres de `generer_taches` : deux appels de même clé
+    produisent les mêmes tâches (voir `cache_borne`).
+    """
+    # Les lots ne changent pas les tâches des phases (voir `lots.developper_lots`)
+    return (
+        tuple(tuple(sorted((cle, valeur) for cle, valeur in phase.items() if cle != "lots")) for phase in phases),
+        pd.Timestamp(start_date), bool(include_financement), recherche_financement_weeks,
+    )
+
+
+def generer_taches_projet(projet, avec_reel=True):
+    """
+    Calcule les tâches d'un projet décrit par un dict.
+
+    Clés attendues : `etat` et `start_date` ; optionnelles : `durees`,
+    `include_financement`, `recherche_financement_weeks` et `reel`, les dates
+    réelles des phases déjà engagées ({phase: {"debut": ..., "fin": ...}}), à
+    partir desquelles la suite est reprévue (sauf si `avec_reel` est faux).
+    """
+    for cle in ("etat", "start_date"):
+        if cle not in projet:
+            raise ValueError(f"Champ obligatoire manquant : {cle!r}")
+    phases = appliquer_durees(generer_phases(projet["etat"]), projet.get("durees"))
+    df = generer_taches(
+        phases, projet["start_date"],
+        include_financement=projet.get("include_financement", True),
+        recherche_financement_weeks=projet.get("recherche_financement_weeks", 6),
+    )
+    if avec_reel and projet.get("reel"):
+        df = appliquer_avancement(df, dates_reelles(projet["reel"]))
+    return df
+
+
+def generer_portefeuille(projets):
+    """
+    Calcule les tâches de plusieurs projets et les concatène dans un seul DataFrame.
+
+    Chaque projet est un dict accepté par `generer_taches_projet`, avec en plus
+    une clé `nom`, ajoutée en colonne `Projet`, et les clés optionnelles `site`
+    et `equipe` (colonnes `Site` et `Equipe`, vides si absentes), qui servent à
+    détecter les conflits entre projets (voir `portefeuille.detecter_conflits`).
+    Les dates réelles (`reel`) de tous les projets sont appliquées en un seul
+    calcul vectoriel, qui ajoute les colonnes de `avancement.reprevoir`.
+    """
+    frames, reels = [], []
+    for projet in projets:
+        df = generer_taches_projet(projet, avec_reel=False)
+        df.insert(0, "Projet", projet["nom"])
+        df.insert(1, "Site", projet.get("site"))
+        df.insert(2, "Equipe", projet.get("equipe"))
+        frames.append(df)
+        if projet.get("reel"):
+            reels.append(dates_reelles(projet["reel"], projet["nom"]))
+    if not frames:
+        return pd.DataFrame(columns=["Projet", "Site", "Equipe"] + COLONNES_TACHES)
+    taches = pd.concat(frames, ignore_index=True)
+    if reels:
+        taches = appliquer_avancement(taches, pd.concat(reels, ignore_index=True))
+    return taches
+
+
+# --------------------
+# Diagramme de Gantt
+def gabarit_gantt():
+    """
+    Gabarit Plotly (mise en forme) du Gantt, à construire une fois et partager entre figures.
+
+    Il remplace le gabarit par défaut de Plotly, que chaque figure embarquerait
+    sinon en entier (la moitié du JSON envoyé au navigateur).
+    """
+    return go.layout.Template(
+        layout=dict(
+            font=dict(color="#2a3f5f"),
+            margin=dict(l=50,r=50,t=120,b=80),
+            title=dict(font=dict(size=18,color="#0915a6"), x=0.05),
+            xaxis=dict(tickfont=dict(size=14), showgrid=True, gridwidth=1, gridcolor='lightgrey',
+                       automargin=True, title=dict(standoff=15)),
+            yaxis=dict(tickfont=dict(size=12), showgrid=False, automargin=True, title=dict(standoff=15)),
+            plot_bgcolor="white",
+            hoverlabel=dict(align="left"),
+        ),
+        data=dict(bar=[go.Bar(marker=dict(line=dict(width=1, color='black')))]),
+    )
+
+
+def construire_figure_timeline(df, gabarit=None):
+    """
+    Construit la figure Plotly des barres du Gantt (par type de tâche) et sa mise en page.
+
+    `gabarit` est le gabarit de `gabarit_gantt`, construit ici s'il n'est pas fourni.
+    """
+    with etape("px.timeline"):
+        fig = px.timeline(
+            df, x_start="Start", x_end="Finish", y="Task", color="Type",
+            custom_data=["hover_def","Groupe"],
+            color_discrete_map=COULEURS_TYPES,
+            template=gabarit or gabarit_gantt(),
+        )
+    with etape("update_layout"):
+        fig.update_traces(
+            hovertemplate="%{y}<br>%{customdata[0]}<br>Catégorie: %{customdata[1]}<extra></extra>"
+        )
+        fig.update_yaxes(autorange="reversed")
+        fig.update_layout(title_text="📅 Diagramme de Gantt du projet — unités : semaines",
+                          height=max(900, 28 * df["Task"].nunique() + 250), width=1400,
+                          xaxis_title="Date", yaxis_title="Phases",
+                          # Constant d'un planning à l'autre : Plotly garde le zoom de l'utilisateur
+                          uirevision="gantt")
+    return fig
+
+
+def ajouter_bandeaux(fig, df):
+    """Ajoute à la figure les bandeaux des catégories et la ligne € entre Études préalables et Sélection MOE."""
+    # Bandeaux catégories
+    shapes = []
+    annotations = []
+    for grp in GROUPES_BANDEAUX:
+        grp_df = df[df["Groupe"]==grp]
+        if grp_df.empty: continue
+        s = grp_df["Start"].min()
+        f = grp_df["Finish"].max()
+        shapes.append(dict(type="rect", xref="x", yref="paper", x0=s, x1=f, y0=1.02, y1=1.08,
+                           fillcolor=COULEURS_GROUPES.get(grp,"#dddddd"), line=dict(width=0), opacity=0.8))
+        annotations.append(dict(x=s + (f-s)/2, y=1.095, xref="x", yref="paper",
+                                text=f"<b>{grp}</b>", showarrow=False, align="center", font=dict(size=12,color="black")))
+    fig.update_layout(shapes=shapes, annotations=annotations)
+
+    # Ligne verticale € entre Études préalables et Sélection MOE
+    if "Études préalables" in df["Groupe"].values and "Sélection MOE" in df["Groupe"].values:
+        transition_date = df[df["Groupe"]=="Études préalables"]["Finish"].max()
+        fig.add_vline(x=transition_date,line_width=2,line_dash="solid",line_color="black")
+        fig.add_annotation(x=transition_date,y=-0.5,text="💶",showarrow=False,font=dict(size=18,color="black"),yshift=-30)
+    return fig
+
+
+def generer_figure_gantt(df, gabarit=None):
+    """
+    Construit la figure Plotly du Gantt : barres par type, bandeaux des catégories
+    et ligne € entre Études préalables et Sélection MOE.
+    """
+    if df is None or df.empty:
+        raise ValueError("DataFrame vide ou None")
+
+    fig = construire_figure_timeline(df, gabarit)
+    with etape("bandeaux"):
+        return ajouter_bandeaux(fig, df)
+
+
+# --------------------
+# Glossaire
+def generer_glossaire_html():
+    """Retourne le tableau HTML du glossaire complet affiché sous le Gantt."""
+    # Début du tableau HTML
+    html_table = """
+    <table style="width:100%; border-collapse:collapse; border:1px solid #ddd; font-family:Arial; margin-top:20px;">
+        <thead>
+            <tr style="background-color:#f2f2f2;">
+                <th style="padding:12px; text-align:left; border:1px solid #ddd; width:20%;">Phase</th>
+                <th style="padding:12px; text-align:left; border:1px solid #ddd; width:80%;">Définition</th>
+            </tr>
+        </thead>
+        <tbody>
+    """
+
+    # Ajoutez les lignes du tableau
+    for phase, definition in GLOSSAIRE_COMPLET.items():
+        background_color = COULEURS_GLOSSAIRE.get(phase, "#ffffff")
+        html_table += f"""
+        <tr style="background-color:{background_color};">
+            <td style="padding:12px; text-align:left; border:1px solid #ddd; vertical-align:top; width:20%;">
+                <strong>{phase}</strong>
+            </td>
+            <td style="padding:12px; text-align:left; border:1px solid #ddd; vertical-align:top; width:80%; white-space:normal; word-wrap:break-word;">
+                {definition}
+            </td>
+        </tr>
+        """
+
+    # Fin du tableau HTML
+    html_table += """
+        </tbody>
+    </table>
+    """
+    return f"""
+    <div style="width:100%; overflow-x:auto;">
+        {html_table}
+    </div>
+    """
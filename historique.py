@@ -0,0 +1,146 @@
+"""
+Historique annuler / rétablir des durées des phases, en versions persistantes.
+
+    historique = Historique([3, 6, 8])        # durées des phases, dans l'ordre
+    historique.enregistrer([3, 7, 8])         # nouvelle version
+    historique.annuler()                      # VecteurPersistant([3, 6, 8])
+    historique.retablir()                     # VecteurPersistant([3, 7, 8])
+
+Chaque version est un `VecteurPersistant` : un arbre immuable dont une
+modification ne recopie que le chemin de la racine à la valeur modifiée
+(quelques tuples de `BRANCHES` éléments) et partage le reste avec la version
+précédente. Des centaines de versions ne coûtent donc que leurs modifications,
+pas autant de copies de la liste des phases.
+"""
+
+BITS = 4
+BRANCHES = 1 << BITS
+MASQUE = BRANCHES - 1
+MAX_VERSIONS = 500
+
+
+class VecteurPersistant:
+    """Séquence immuable de taille fixe ; `remplacer` retourne une nouvelle version qui partage ses nœuds."""
+
+    __slots__ = ("_racine", "_taille", "_decalage")
+
+    def __init__(self, racine, taille, decalage):
+        self._racine = racine
+        self._taille = taille
+        self._decalage = decalage  # BITS × profondeur des feuilles
+
+    @classmethod
+    def depuis(cls, valeurs):
+        """Vecteur des `valeurs`, dans l'ordre."""
+        noeuds = [tuple(valeurs[i:i + BRANCHES]) for i in range(0, len(valeurs), BRANCHES)] or [()]
+        decalage = 0
+        while len(noeuds) > 1:
+            noeuds = [tuple(noeuds[i:i + BRANCHES]) for i in range(0, len(noeuds), BRANCHES)]
+            decalage += BITS
+        return cls(noeuds[0], len(valeurs), decalage)
+
+    def __len__(self):
+        return self._taille
+
+    def __getitem__(self, index):
+        if not -self._taille <= index < self._taille:
+            raise IndexError("Indice hors du vecteur")
+        index %= self._taille
+        noeud = self._racine
+        for decalage in range(self._decalage, 0, -BITS):
+            noeud = noeud[(index >> decalage) & MASQUE]
+        return noeud[index & MASQUE]
+
+    def __iter__(self):
+        def parcourir(noeud, decalage):
+            if decalage == 0:
+                yield from noeud
+            else:
+                for enfant in noeud:
+                    yield from parcourir(enfant, decalage - BITS)
+        return parcourir(self._racine, self._decalage)
+
+    def __eq__(self, autre):
+        if isinstance(autre, VecteurPersistant):
+            return self._racine is autre._racine or (len(self) == len(autre) and list(self) == list(autre))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"VecteurPersistant({list(self)!r})"
+
+    def remplacer(self, index, valeur):
+        """Nouvelle version où `index` vaut `valeur` ; seul le chemin vers cette valeur est recopié."""
+        if not 0 <= index < self._taille:
+            raise IndexError("Indice hors du vecteur")
+
+        def copier_chemin(noeud, decalage):
+            position = (index >> decalage) & MASQUE
+            enfant = valeur if decalage == 0 else copier_chemin(noeud[position], decalage - BITS)
+            return noeud[:position] + (enfant,) + noeud[position + 1:]
+
+        return VecteurPersistant(copier_chemin(self._racine, self._decalage), self._taille, self._decalage)
+
+    def noeuds(self):
+        """Nœuds internes et feuilles de l'arbre (pour mesurer le partage entre versions)."""
+        pile = [(self._racine, self._decalage)]
+        while pile:
+            noeud, decalage = pile.pop()
+            yield noeud
+            if decalage:
+                pile.extend((enfant, decalage - BITS) for enfant in noeud)
+
+
+class Historique:
+    """Versions successives d'un vecteur de valeurs, avec annulation et rétablissement."""
+
+    def __init__(self, valeurs, max_versions=MAX_VERSIONS):
+        self.versions = [VecteurPersistant.depuis(list(valeurs))]
+        self.position = 0
+        self.max_versions = max_versions
+
+    @property
+    def courante(self):
+        return self.versions[self.position]
+
+    @property
+    def peut_annuler(self):
+        return self.position > 0
+
+    @property
+    def peut_retablir(self):
+        return self.position < len(self.versions) - 1
+
+    def enregistrer(self, valeurs):
+        """
+        Ajoute la version `valeurs` si elle diffère de la version courante (retourne
+        True dans ce cas). Les versions rétablissables sont abandonnées ; au-delà de
+        `max_versions`, les plus anciennes sont oubliées.
+        """
+        courante = self.courante
+        if len(valeurs) != len(courante):
+            raise ValueError(f"{len(valeurs)} valeurs pour un historique de {len(courante)}")
+        nouvelle = courante
+        for index, (avant, apres) in enumerate(zip(courante, valeurs)):
+            if avant != apres:
+                nouvelle = nouvelle.remplacer(index, apres)
+        if nouvelle is courante:
+            return False
+        del self.versions[self.position + 1:]
+        self.versions.append(nouvelle)
+        del self.versions[:-self.max_versions]
+        self.position = len(self.versions) - 1
+        return True
+
+    def annuler(self):
+        """Revient à la version précédente et la retourne."""
+        if not self.peut_annuler:
+            raise IndexError("Rien à annuler")
+        self.position -= 1
+        return self.courante
+
+    def retablir(self):
+        """Rétablit la version suivante et la retourne."""
+        if not self.peut_retablir:
+            raise IndexError("Rien à rétablir")
+        self.position += 1
+        return self.courante
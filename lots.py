@@ -0,0 +1,114 @@
+"""
+Décomposition des phases en lots (sous-tâches), développés à la demande sous leur phase.
+
+    taches_figure = developper_lots(taches, phases, developpes={"🚧 DET - Direction Exécution Travaux"})
+
+Les lots d'une phase sont décrits dans le modèle de phases (voir
+`modeles_phases`). Seules les phases et les lots dont le nom est dans
+`developpes` (et dont tous les parents le sont aussi) voient leurs
+sous-tâches calculées et ajoutées sous eux : un planning replié reste aussi
+léger à calculer et à envoyer au navigateur qu'un planning sans lots.
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+
+from gantt import completer_colonnes
+
+RETRAIT = "\u2003"  # espace cadratin : les espaces ordinaires en tête de libellé ne s'affichent pas
+
+
+def enchainer_lots(lots, debut):
+    """
+    Dates des lots d'un parent commençant à `debut` : liste de (lot, début, fin).
+
+    Un lot commence à `debut`, ou à la plus tardive des fins des lots cités dans
+    `apres`, plus son `decalage` en semaines.
+    """
+    fins, dates = {}, []
+    for lot in lots:
+        depart = max([debut] + [fins[nom] for nom in lot["apres"]]) + timedelta(weeks=lot["decalage"])
+        fins[lot["nom"]] = fin = depart + timedelta(weeks=lot["duree"])
+        dates.append((lot, depart, fin))
+    return dates
+
+
+def libelle_lot(nom, niveau):
+    """Libellé d'un lot sur l'axe des tâches, en retrait selon sa profondeur (1 sous une phase)."""
+    return RETRAIT * 2 * niveau + "↳ " + nom
+
+
+def arborescence(phases):
+    """
+    Phases et lots décomposables, en profondeur d'abord : liste de (nom, niveau,
+    nombre de sous-tâches), niveau 0 pour une phase. Pour le choix des lignes à développer.
+    """
+    noeuds = []
+
+    def parcourir(lots, niveau):
+        for lot in lots:
+            if lot["lots"]:
+                noeuds.append((lot["nom"], niveau, len(lot["lots"])))
+                parcourir(lot["lots"], niveau + 1)
+
+    for phase in phases:
+        if phase.get("lots") and phase.get("gantt", True):
+            noeuds.append((phase["nom"], 0, len(phase["lots"])))
+            parcourir(phase["lots"], 1)
+    return noeuds
+
+
+def cle_lots(phases, developpes):
+    """Clé hachable des lignes développées et des lots des phases concernées (cache des figures)."""
+    developpes = tuple(sorted(developpes))
+    return developpes, tuple(repr(phase["lots"]) for phase in phases if phase["nom"] in developpes)
+
+
+def _lignes_lots(parent, nom_parent, lots, developpes, niveau, decalage_prevu):
+    # Lignes des lots de `parent` (dict d'une ligne de tâche), et récursivement des lots développés
+    lignes = []
+    for lot, debut, fin in enchainer_lots(lots, parent["Start"]):
+        depassement = fin > parent["Finish"]
+        ligne = {
+            **parent,
+            "Task": libelle_lot(lot["nom"], niveau), "Start": debut, "Finish": fin, "Type": "Lot",
+            "Definition": f"Lot de {nom_parent}"
+                          + ("<br>⚠️ Finit après son parent" if depassement else ""),
+        }
+        if decalage_prevu is not None:
+            # Lots reprévus avec leur parent : le prévu initial est décalé d'autant
+            ligne["Start prévu"], ligne["Finish prévu"] = debut - decalage_prevu, fin - decalage_prevu
+            ligne["Début réel"] = ligne["Fin réel"] = pd.NaT
+            ligne["Glissement (j)"] = decalage_prevu / pd.Timedelta(days=1)
+        lignes.append(ligne)
+        if lot["nom"] in developpes and lot["lots"]:
+            lignes += _lignes_lots(ligne, lot["nom"], lot["lots"], developpes, niveau + 1, decalage_prevu)
+    return lignes
+
+
+def developper_lots(taches, phases, developpes):
+    """
+    Tâches où chaque phase développée (nom dans `developpes`) est suivie de ses
+    lots, de type "Lot", eux-mêmes suivis de leurs sous-lots développés.
+
+    Les lots d'une phase reprévue (voir `avancement.reprevoir`) suivent son
+    début reprévu. Retourne `taches` inchangé si rien n'est à développer.
+    """
+    lots_phases = {phase["nom"]: phase["lots"] for phase in phases if phase.get("lots")}
+    developpes = set(developpes)
+    parents = taches.index[(taches["Type"] == "Phase") & taches["Task"].isin(developpes & lots_phases.keys())]
+    if parents.empty:
+        return taches
+
+    morceaux, precedent = [], 0
+    for index in parents:
+        position = taches.index.get_loc(index) + 1
+        parent = taches.iloc[position - 1].to_dict()
+        decalage_prevu = parent["Start"] - parent["Start prévu"] if "Start prévu" in parent else None
+        lignes = _lignes_lots(parent, parent["Task"], lots_phases[parent["Task"]], developpes, 1, decalage_prevu)
+        enfants = pd.DataFrame(lignes, columns=taches.columns)
+        morceaux += [taches.iloc[precedent:position], completer_colonnes(enfants)]
+        precedent = position
+    morceaux.append(taches.iloc[precedent:])
+    return pd.concat(morceaux, ignore_index=True)
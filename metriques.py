@@ -0,0 +1,262 @@
+"""
+Métriques de l'application au format texte Prometheus, par processus.
+
+Chaque réplique Streamlit tient ses propres compteurs (exécutions, clics,
+taille des plannings, durée des étapes) et les expose :
+- sur un port local si `GANTT_METRIQUES_PORT` est défini (http://127.0.0.1:<port>/metrics) ;
+- dans un fichier si `GANTT_METRIQUES_FICHIER` est défini (réécrit à chaque
+  exécution, pour le collecteur textfile de node_exporter).
+
+    metriques.configurer_depuis_environnement()
+    ...
+    metriques.enregistrer_execution(profileur, nb_taches=len(df))
+"""
+
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SEUILS_DUREE_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SEUILS_TAILLE = (5, 10, 20, 50, 100, 250, 500, 1000, 5000)
+
+TYPE_CONTENU = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _format_etiquettes(noms, valeurs, supplementaires=()):
+    paires = [*zip(noms, valeurs), *supplementaires]
+    if not paires:
+        return ""
+    return "{" + ",".join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires) + "}"
+
+
+def _format_nombre(valeur):
+    if math.isinf(valeur):
+        return "+Inf" if valeur > 0 else "-Inf"
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+class _Metrique:
+    type_ = None
+
+    def __init__(self, nom, aide, etiquettes=()):
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+        self._series = {}
+        self._verrou = threading.Lock()
+
+    def _cle(self, etiquettes):
+        if set(etiquettes) != set(self.etiquettes):
+            raise ValueError(f"{self.nom} attend les étiquettes {list(self.etiquettes)}, reçu {sorted(etiquettes)}")
+        return tuple(str(etiquettes[nom]) for nom in self.etiquettes)
+
+    def lignes(self):
+        yield f"# HELP {self.nom} {self.aide}"
+        yield f"# TYPE {self.nom} {self.type_}"
+        with self._verrou:
+            series = sorted(self._series.items())
+        for cle, valeur in series:
+            yield from self._lignes_serie(cle, valeur)
+
+    def _lignes_serie(self, cle, valeur):
+        yield f"{self.nom}{_format_etiquettes(self.etiquettes, cle)} {_format_nombre(valeur)}"
+
+
+class Compteur(_Metrique):
+    """Valeur cumulée, uniquement croissante."""
+
+    type_ = "counter"
+
+    def inc(self, valeur=1, **etiquettes):
+        if valeur < 0:
+            raise ValueError("Un compteur ne peut pas décroître")
+        cle = self._cle(etiquettes)
+        with self._verrou:
+            self._series[cle] = self._series.get(cle, 0) + valeur
+
+    def valeur(self, **etiquettes):
+        return self._series.get(self._cle(etiquettes), 0)
+
+
+class Jauge(_Metrique):
+    """Valeur instantanée ; `fonction` la calcule au moment de l'exposition."""
+
+    type_ = "gauge"
+
+    def __init__(self, nom, aide, etiquettes=(), fonction=None):
+        super().__init__(nom, aide, etiquettes)
+        self.fonction = fonction
+
+    def set(self, valeur, **etiquettes):
+        cle = self._cle(etiquettes)
+        with self._verrou:
+            self._series[cle] = valeur
+
+    def lignes(self):
+        if self.fonction is not None:
+            valeur = self.fonction()
+            if valeur is not None:
+                self.set(valeur)
+        yield from super().lignes()
+
+
+class Histogramme(_Metrique):
+    """Répartition d'observations par seuils cumulés, avec somme et nombre."""
+
+    type_ = "histogram"
+
+    def __init__(self, nom, aide, etiquettes=(), seuils=SEUILS_DUREE_S):
+        super().__init__(nom, aide, etiquettes)
+        self.seuils = tuple(sorted(seuils)) + (math.inf,)
+
+    def observe(self, valeur, **etiquettes):
+        cle = self._cle(etiquettes)
+        with self._verrou:
+            serie = self._series.get(cle)
+            if serie is None:
+                serie = self._series[cle] = [[0] * len(self.seuils), 0.0, 0]
+            for index, seuil in enumerate(self.seuils):
+                if valeur <= seuil:
+                    serie[0][index] += 1
+                    break
+            serie[1] += valeur
+            serie[2] += 1
+
+    def _lignes_serie(self, cle, serie):
+        comptes, somme, nombre = serie
+        cumul = 0
+        for seuil, compte in zip(self.seuils, comptes):
+            cumul += compte
+            etiquettes = _format_etiquettes(self.etiquettes, cle, [("le", _format_nombre(seuil))])
+            yield f"{self.nom}_bucket{etiquettes} {cumul}"
+        etiquettes = _format_etiquettes(self.etiquettes, cle)
+        yield f"{self.nom}_sum{etiquettes} {_format_nombre(somme)}"
+        yield f"{self.nom}_count{etiquettes} {nombre}"
+
+
+class Registre:
+    """Ensemble des métriques d'un processus."""
+
+    def __init__(self):
+        self._metriques = {}
+
+    def _ajouter(self, metrique):
+        if metrique.nom in self._metriques:
+            raise ValueError(f"Métrique déjà déclarée : {metrique.nom}")
+        self._metriques[metrique.nom] = metrique
+        return metrique
+
+    def compteur(self, nom, aide, etiquettes=()):
+        return self._ajouter(Compteur(nom, aide, etiquettes))
+
+    def jauge(self, nom, aide, etiquettes=(), fonction=None):
+        return self._ajouter(Jauge(nom, aide, etiquettes, fonction))
+
+    def histogramme(self, nom, aide, etiquettes=(), seuils=SEUILS_DUREE_S):
+        return self._ajouter(Histogramme(nom, aide, etiquettes, seuils))
+
+    def exposition(self):
+        """Texte au format d'exposition Prometheus 0.0.4."""
+        return "".join(ligne + "\n" for metrique in self._metriques.values() for ligne in metrique.lignes())
+
+    def ecrire_fichier(self, chemin):
+        """Écrit l'exposition dans `chemin` par remplacement atomique (lecture jamais partielle)."""
+        temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            fichier.write(self.exposition())
+        os.replace(temporaire, chemin)
+
+    def exposer_sur_port(self, port, host="127.0.0.1"):
+        """Sert /metrics dans un thread de fond ; retourne le serveur (port effectif : server_port)."""
+        registre = self
+
+        class _Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                donnees = registre.exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", TYPE_CONTENU)
+                self.send_header("Content-Length", str(len(donnees)))
+                self.end_headers()
+                self.wfile.write(donnees)
+
+            def log_message(self, *args):
+                pass
+
+        serveur = ThreadingHTTPServer((host, port), _Gestionnaire)
+        serveur.daemon_threads = True
+        threading.Thread(target=serveur.serve_forever, name="metriques", daemon=True).start()
+        return serveur
+
+
+def _memoire_max_octets():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Ko sous Linux
+
+
+# --------------------
+# Métriques de l'application
+REGISTRE = Registre()
+
+EXECUTIONS = REGISTRE.compteur(
+    "gantt_executions_total", "Exécutions (reruns) du script Streamlit : complètes (app) ou d'un fragment", ("portee",)
+)
+CLICS = REGISTRE.compteur("gantt_clics_total", "Clics sur les boutons de l'application", ("bouton",))
+TAILLE_PLANNING = REGISTRE.histogramme(
+    "gantt_planning_taches", "Nombre de tâches des plannings générés", seuils=SEUILS_TAILLE
+)
+DUREE_EXECUTION = REGISTRE.histogramme("gantt_execution_duree_secondes", "Durée totale d'une exécution du script")
+DUREE_ETAPES = REGISTRE.histogramme(
+    "gantt_etape_duree_secondes", "Durée des étapes d'une exécution (voir profilage.py)", ("etape",)
+)
+MEMOIRE_MAX = REGISTRE.jauge(
+    "gantt_processus_memoire_max_octets", "Pic de mémoire résidente du processus", fonction=_memoire_max_octets
+)
+CACHE_LECTURES = REGISTRE.compteur(
+    "gantt_cache_lectures_total", "Lectures des caches bornés (voir cache_borne.py)", ("cache", "resultat")
+)
+CACHE_EVICTIONS = REGISTRE.compteur(
+    "gantt_cache_evictions_total", "Entrées évincées des caches bornés, par cause (lru, ttl, octets)", ("cache", "cause")
+)
+CACHE_OCTETS = REGISTRE.jauge("gantt_cache_octets", "Taille estimée des entrées d'un cache borné", ("cache",))
+CACHE_ENTREES = REGISTRE.jauge("gantt_cache_entrees", "Nombre d'entrées d'un cache borné", ("cache",))
+
+_FICHIER = None
+_serveur = None
+_verrou_configuration = threading.Lock()
+
+
+def configurer_depuis_environnement():
+    """Démarre l'exposition demandée par l'environnement, une seule fois par processus."""
+    global _FICHIER, _serveur
+    with _verrou_configuration:
+        _FICHIER = os.environ.get("GANTT_METRIQUES_FICHIER") or None
+        port = os.environ.get("GANTT_METRIQUES_PORT")
+        if port and _serveur is None:
+            _serveur = REGISTRE.exposer_sur_port(int(port), os.environ.get("GANTT_METRIQUES_HOTE", "127.0.0.1"))
+
+
+def enregistrer_execution(profileur, nb_taches=None, portee="app"):
+    """Reporte une exécution profilée : compteur, durée totale, étapes et taille du planning."""
+    EXECUTIONS.inc(portee=portee)
+    if profileur.duree_totale_s is not None:
+        DUREE_EXECUTION.observe(profileur.duree_totale_s)
+    for chemin, duree_ms in profileur.resume().items():
+        DUREE_ETAPES.observe(duree_ms / 1000, etape=chemin)
+    if nb_taches:
+        TAILLE_PLANNING.observe(nb_taches)
+    if _FICHIER:
+        REGISTRE.ecrire_fichier(_FICHIER)
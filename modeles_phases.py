@@ -0,0 +1,254 @@
+"""
+Modèles de phases déclaratifs (JSON, ou YAML si PyYAML est installé).
+
+Un modèle liste, dans l'ordre chronologique, les phases proposées et les états
+du projet auxquels chacune s'applique (codes de `config.CODES_ETATS`) :
+
+    {"version": 1, "phases": [
+        {"nom": "📝 APS - Avant-Projet Sommaire", "groupe": "MOE", "duree": 4, "duree_min": 3,
+         "modifiable": true, "delai_mo": 2, "code": "APS",
+         "etats": ["audit_non_effectue", "audit_effectue", ...]},
+        ...
+    ]}
+
+`code` (optionnel) est la clé de la phase dans le glossaire : sa définition est
+résolue à la compilation. `"gantt": false` garde une phase dans les éditeurs
+mais la retire du diagramme (ESQ).
+
+`lots` (optionnel) décompose une phase en sous-tâches, elles-mêmes
+décomposables, affichées à la demande sous la phase (voir `lots`) :
+
+    "lots": [{"nom": "Gros œuvre", "duree": 3},
+             {"nom": "Menuiseries", "duree": 2, "apres": ["Gros œuvre"], "decalage": 1,
+              "lots": [...]}]
+
+Un lot commence au début de son parent, ou à la fin des lots de son parent
+listés dans `apres` (déclarés avant lui), plus `decalage` semaines. Les noms
+des lots sont uniques dans tout le modèle.
+
+Le modèle par défaut est `modeles/phases.json` ; une organisation fournit le
+sien avec la variable d'environnement `GANTT_MODELE_PHASES`. Un modèle est
+validé et compilé une seule fois, puis resservi depuis le cache tant que le
+fichier n'est pas modifié.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+from config import CODES_ETATS, ETATS, GLOSSAIRE, GLOSSAIRE_COMPLET, GROUPES_PHASES, MODELE_PHASES_PATH
+
+VERSION_MODELE = 1
+
+# Champs d'une phase et types acceptés
+CHAMPS_PHASE = {
+    "nom": str,
+    "groupe": str,
+    "duree": int,
+    "duree_min": int,
+    "modifiable": bool,
+    "delai_mo": int,
+    "code": (str, type(None)),
+    "gantt": bool,
+    "etats": list,
+    "lots": list,
+}
+CHAMPS_OPTIONNELS = {"code": None, "gantt": True, "lots": []}
+
+# Champs d'un lot et types acceptés
+CHAMPS_LOT = {"nom": str, "duree": int, "apres": list, "decalage": int, "lots": list}
+CHAMPS_LOT_OPTIONNELS = {"apres": [], "decalage": 0, "lots": []}
+
+# Codes de phase connus du glossaire
+CODES_GLOSSAIRE = GLOSSAIRE.keys() | GLOSSAIRE_COMPLET.keys()
+
+
+class ModelePhases:
+    """Modèle compilé, en lecture seule : phases indexées par état et par nom."""
+
+    def __init__(self, phases, source=None):
+        self.source = source
+        self.phases = tuple(MappingProxyType(phase) for phase in phases)
+        self.par_nom = {phase["nom"]: phase for phase in self.phases}
+        # Gabarits des phases de chaque état, sans la liste des états, prêts à copier
+        self.par_etat = {
+            etat: tuple(
+                MappingProxyType({cle: valeur for cle, valeur in phase.items() if cle != "etats"})
+                for phase in self.phases if etat in phase["etats"]
+            )
+            for etat in ETATS
+        }
+
+    def phases_etat(self, etat):
+        """Copie modifiable (liste de dicts) des phases applicables à un état du projet."""
+        gabarits = self.par_etat.get(etat)
+        if gabarits is None:
+            raise ValueError(f"État du projet inconnu : {etat!r}")
+        return [dict(gabarit) for gabarit in gabarits]
+
+
+def _type_valide(valeur, types):
+    # bool est un int pour Python : une durée ne doit pas être un booléen
+    if types is int:
+        return type(valeur) is int
+    return isinstance(valeur, types)
+
+
+def _compiler_phase(donnees, position, source):
+    contexte = f"{source}, phase n°{position}"
+    if not isinstance(donnees, dict):
+        raise ValueError(f"{contexte} : une phase doit être un objet")
+    if isinstance(donnees.get("nom"), str):
+        contexte += f" ({donnees['nom']!r})"
+
+    inconnus = donnees.keys() - CHAMPS_PHASE.keys()
+    if inconnus:
+        raise ValueError(f"{contexte} : champs inconnus {sorted(inconnus)}")
+    manquants = CHAMPS_PHASE.keys() - CHAMPS_OPTIONNELS.keys() - donnees.keys()
+    if manquants:
+        raise ValueError(f"{contexte} : champs manquants {sorted(manquants)}")
+
+    phase = {**CHAMPS_OPTIONNELS, **donnees}
+    for champ, types in CHAMPS_PHASE.items():
+        if not _type_valide(phase[champ], types):
+            raise ValueError(f"{contexte} : type invalide pour {champ!r}")
+
+    if not phase["nom"].strip():
+        raise ValueError(f"{contexte} : nom vide")
+    if phase["groupe"] not in GROUPES_PHASES:
+        raise ValueError(f"{contexte} : groupe inconnu {phase['groupe']!r} (attendu : {GROUPES_PHASES})")
+    for champ in ("duree", "duree_min", "delai_mo"):
+        if phase[champ] < 0:
+            raise ValueError(f"{contexte} : {champ!r} doit être positif ou nul")
+    if phase["modifiable"] and phase["duree"] < phase["duree_min"]:
+        raise ValueError(f"{contexte} : durée par défaut inférieure au minimum")
+
+    if phase["code"] is not None and phase["code"] not in CODES_GLOSSAIRE:
+        raise ValueError(f"{contexte} : code {phase['code']!r} absent du glossaire")
+    phase["definition"] = GLOSSAIRE.get(phase["code"], "")
+
+    phase["lots"] = _compiler_lots(phase["lots"], contexte)
+
+    etats_inconnus = [code for code in phase["etats"] if code not in CODES_ETATS]
+    if etats_inconnus or not phase["etats"]:
+        raise ValueError(f"{contexte} : 'etats' doit lister des codes parmi {list(CODES_ETATS)}")
+    phase["etats"] = frozenset(CODES_ETATS[code] for code in phase["etats"])
+    return phase
+
+
+def _compiler_lots(lots, contexte):
+    # Tuple de lots en lecture seule, sous-lots compilés récursivement
+    compiles, noms = [], set()
+    for position, donnees in enumerate(lots, 1):
+        contexte_lot = f"{contexte}, lot n°{position}"
+        if not isinstance(donnees, dict):
+            raise ValueError(f"{contexte_lot} : un lot doit être un objet")
+        if isinstance(donnees.get("nom"), str):
+            contexte_lot += f" ({donnees['nom']!r})"
+        inconnus = donnees.keys() - CHAMPS_LOT.keys()
+        if inconnus:
+            raise ValueError(f"{contexte_lot} : champs inconnus {sorted(inconnus)}")
+        manquants = CHAMPS_LOT.keys() - CHAMPS_LOT_OPTIONNELS.keys() - donnees.keys()
+        if manquants:
+            raise ValueError(f"{contexte_lot} : champs manquants {sorted(manquants)}")
+        lot = {**CHAMPS_LOT_OPTIONNELS, **donnees}
+        for champ, types in CHAMPS_LOT.items():
+            if not _type_valide(lot[champ], types):
+                raise ValueError(f"{contexte_lot} : type invalide pour {champ!r}")
+        if not lot["nom"].strip():
+            raise ValueError(f"{contexte_lot} : nom vide")
+        if lot["duree"] < 0 or lot["decalage"] < 0:
+            raise ValueError(f"{contexte_lot} : 'duree' et 'decalage' doivent être positifs ou nuls")
+        inconnus = [nom for nom in lot["apres"] if nom not in noms]
+        if inconnus:
+            raise ValueError(f"{contexte_lot} : 'apres' doit citer des lots déclarés avant lui ({inconnus})")
+        lot["apres"] = tuple(lot["apres"])
+        lot["lots"] = _compiler_lots(lot["lots"], contexte_lot)
+        noms.add(lot["nom"])
+        compiles.append(MappingProxyType(lot))
+    return tuple(compiles)
+
+
+def noms_lots(lots):
+    """Noms de tous les lots de `lots` et de leurs sous-lots, en profondeur d'abord."""
+    for lot in lots:
+        yield lot["nom"]
+        yield from noms_lots(lot["lots"])
+
+
+def compiler_modele(donnees, source="modèle"):
+    """Valide le contenu d'un modèle et le compile ; lève une ValueError au premier défaut."""
+    if not isinstance(donnees, dict) or not isinstance(donnees.get("phases"), list) or not donnees["phases"]:
+        raise ValueError(f"{source} : le modèle doit contenir une liste 'phases' non vide")
+    if donnees.get("version", VERSION_MODELE) != VERSION_MODELE:
+        raise ValueError(f"{source} : version de modèle non prise en charge ({donnees['version']!r})")
+
+    phases = [_compiler_phase(phase, position, source) for position, phase in enumerate(donnees["phases"], 1)]
+
+    noms = [phase["nom"] for phase in phases]
+    doublons = sorted({nom for nom in noms if noms.count(nom) > 1})
+    if doublons:
+        raise ValueError(f"{source} : noms de phases en double {doublons}")
+    # Les lots s'affichent comme des lignes du Gantt : leurs noms ne doivent rien masquer
+    noms_tous = noms + [nom for phase in phases for nom in noms_lots(phase["lots"])]
+    doublons = sorted({nom for nom in noms_tous if noms_tous.count(nom) > 1})
+    if doublons:
+        raise ValueError(f"{source} : noms de lots en double {doublons}")
+    for code, etat in CODES_ETATS.items():
+        if not any(etat in phase["etats"] for phase in phases):
+            raise ValueError(f"{source} : aucune phase pour l'état {code!r}")
+    return ModelePhases(phases, source)
+
+
+def lire_modele(chemin):
+    """Lit le fichier d'un modèle (.json, .yaml ou .yml) sans le valider."""
+    chemin = Path(chemin)
+    texte = chemin.read_text(encoding="utf-8")
+    if chemin.suffix.lower() == ".json":
+        try:
+            return json.loads(texte)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{chemin} : JSON invalide : {exc}") from None
+    if chemin.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Les modèles YAML nécessitent PyYAML : pip install pyyaml") from None
+        try:
+            return yaml.safe_load(texte)
+        except yaml.YAMLError as exc:
+            raise ValueError(f"{chemin} : YAML invalide : {exc}") from None
+    raise ValueError(f"{chemin} : format de modèle non pris en charge (attendu : .json, .yaml ou .yml)")
+
+
+# --------------------
+# Cache des modèles compilés, invalidé par la date de modification du fichier
+_cache = {}
+_verrou = threading.Lock()
+
+
+def chemin_modele():
+    """Fichier du modèle actif : `GANTT_MODELE_PHASES` ou le modèle par défaut."""
+    return Path(os.environ.get("GANTT_MODELE_PHASES") or MODELE_PHASES_PATH)
+
+
+def charger_modele(chemin=None):
+    """
+    Retourne le modèle compilé de `chemin` (par défaut le modèle actif).
+
+    Le fichier n'est relu et recompilé que si sa date de modification ou sa
+    taille a changé depuis le dernier chargement.
+    """
+    chemin = os.path.abspath(chemin or chemin_modele())
+    statut = os.stat(chemin)
+    signature = (statut.st_mtime_ns, statut.st_size)
+    entree = _cache.get(chemin)
+    if entree is not None and entree[0] == signature:
+        return entree[1]
+    with _verrou:
+        entree = _cache.get(chemin)
+        if entree is None or entree[0] != signature:
+            entree = _cache[chemin] = (signature, compiler_modele(lire_modele(chemin), source=chemin))
+        return entree[1]
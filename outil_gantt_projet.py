@@ -1,83 +1,277 @@
+import io
+import os
+
+import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import timedelta
 import streamlit.components.v1 as components
 
-# URL brute du logo sur GitHub
-logo_url = "images/Logo_ACTEE_CMYN-HD.png"
+import metriques
+from config import ETATS
+from differentiel import gantt_differentiel
+from exports import ecrire_xlsx, iter_ics, iter_mspdi
+from avancement import ajouter_avancement
+from gantt import appliquer_avancement, cle_taches, generer_figure_gantt, generer_phases, generer_taches
+from historique import Historique
+from lots import cle_lots, developper_lots
+from profilage import Profileur, etape
+from references import ajouter_barres_reference, comparer_plannings, ecrire_reference
+from ui import (
+    afficher_ecarts,
+    afficher_glissement,
+    afficher_panneau_profilage,
+    appliquer_durees_en_attente,
+    barre_historique,
+    cache_figures,
+    cache_plannings,
+    choisir_lots,
+    choisir_reference,
+    cle_duree,
+    edition_navigateur,
+    formulaire_durees,
+    gabarit_partage,
+    glossaire_html,
+    logo,
+    page_portefeuille,
+    saisir_avancement,
+    section_sensibilite,
+)
+
+st.set_page_config(layout="wide")
 
-# Afficher le logo
-st.image(logo_url, width=450)
-    
 # --------------------
-# Glossaire simplifié pour affichage dans les inputs (tooltips)
-GLOSSAIRE = {
-    "DIAG": "Analyse fonctionnelle, urbanistique et technique du bâti existant, estimation financière et faisabilité.",
-    "ESQ": "Proposer des solutions d'ensemble, vérifier faisabilité et compatibilité financière (n’apparaît pas sur le GANTT).",
-    "APS": "Proposer solutions traduisant le programme fonctionnel, dispositions techniques générales et estimation coût (min 3 semaines).",
-    "APD": "Déterminer surfaces détaillées, plans, façades, principes constructifs et cohérence technique et économique (min 6 semaines).",
-    "Autorisations Administratives": "Rédaction des documents nécessaires aux autorisations (Permis de Construire / Déclaration Préalable).",
-    "PRO": "Préciser les éléments conceptuels, établir coût prévisionnel et délai global de réalisation (min 4 semaines).",
-    "ACT / AMT": "Assistance pour la passation des marchés : préparer la consultation, analyser les offres, vérifier conformité.",
-    "DCE": "Dossier de Consultation des Entreprises fourni par la maîtrise d’œuvre pour consultation des entreprises.",
-    "EXE": "Études d'exécution : documents et suivi technique pour réaliser l'ouvrage, mise à jour du calendrier.",
-    "AOR": "Assistance aux opérations de réception : suivi des réserves, validation des DOE et gestion des désordres en GPA."
-}
+# Profilage : panneau de debug avec ?debug=1 (ou GANTT_DEBUG=1), journal JSON-lines
+# de chaque exécution si GANTT_PROFILAGE_LOG indique un fichier
+DEBUG = st.query_params.get("debug") == "1" or os.environ.get("GANTT_DEBUG") == "1"
+JOURNAL_PROFILAGE = os.environ.get("GANTT_PROFILAGE_LOG")
+# Métriques Prometheus du processus (GANTT_METRIQUES_PORT / GANTT_METRIQUES_FICHIER)
+metriques.configurer_depuis_environnement()
+
+
+def terminer_execution(profileur, portee="app", **contexte):
+    """Enregistre une exécution terminée (script complet ou fragment) : métriques, journal et panneau de debug."""
+    metriques.enregistrer_execution(profileur, nb_taches=contexte.get("nb_taches"), portee=portee)
+    if JOURNAL_PROFILAGE:
+        profileur.ecrire_jsonl(JOURNAL_PROFILAGE, portee=portee, **contexte)
+    if DEBUG and portee == "app":
+        afficher_panneau_profilage(profileur)
+
 
-# Glossaire complet pour affichage sous le Gantt
-GLOSSAIRE_COMPLET = {
-    "DIAG": "Phase DIAG : Cette étape de la mission conception a pour objet d'établir “un état des lieux, de fournir une analyse fonctionnelle, urbanistique, architecturale et technique du bâti existant et ainsi de permettre d'établir un programme fonctionnel d'utilisation du bâtiment ainsi qu'une estimation financière et d'en déduire la faisabilité de l'opération.",
-    "ESQ": "Phase ESQ : cette étape de la mission conception a pour objet de “proposer une ou plusieurs solutions d'ensemble, traduisant les éléments majeurs du programme, d'en indiquer les délais de réalisation, d'examiner leur compatibilité avec la partie de l'enveloppe financière prévisionnelle retenue par le maître d'ouvrage et affectée aux travaux, ainsi que de vérifier la faisabilité de l'opération au regard des différentes contraintes du programme et du site. (la mission n’apparaît pas sur le GANTT d’ailleurs)",
-    "APS": "Phase APS : cette étape de la mission conception a pour objet de proposer des solutions traduisant le programme fonctionnel, d'en présenter les dispositions générales techniques, d'indiquer des durées prévisionnelles et d'établir une estimation provisoire du coût prévisionnel des travaux.",
-    "APD": "Phase APD : déterminer les surfaces détaillées de tous les éléments du programme, arrêter plans, coupes et façades, définir principes constructifs, matériaux et installations et vérifier cohérence technique et économique.",
-    "Autorisations Administratives": "Lorsque l’APD est validé, rédiger les documents nécessaires à l’obtention des autorisations administratives et suivre l’instruction auprès des services administratifs.",
-    "PRO": "Phase PRO : préciser, déterminer, décrire les éléments de conception des phases précédentes, établir un coût prévisionnel et un délai global de réalisation.",
-    "ACT / AMT": "Assistance pour préparer la consultation des entreprises, analyser les offres et vérifier leur conformité technique et financière.",
-    "DCE": "Fournir le dossier de consultation des entreprises comportant les pièces nécessaires à la consultation et les choix du maître d’ouvrage.",
-    "EXE": "Réaliser l’ouvrage en suivant les plans et études préalables, actualiser le calendrier et suivre les lots.",
-    "AOR": "Assurer le suivi des réserves jusqu’à levée, valider les DOE et examiner les désordres pendant la période de GPA."
+# Expanders des catégories de phases : titre et préfixe des clés de widgets
+EXPANDERS = {
+    "Études préalables": ("📋 Études préalables", "audit"),
+    "AMO": ("🏢 AMO Programmiste", "amo"),
+    "Sélection MOE": ("🧑‍💼 Sélection d'une MOE", "recrut"),
+    "MOE": ("🏗️ MOE (Loi MOP)", "mop"),
 }
 
+
 # --------------------
-# 0️⃣ Titre et introduction
-st.set_page_config(layout="wide")
-st.title("📊 Assistant Planification du Projet de Rénovation")
-st.markdown("""
-Bienvenue dans l'outil de planification de projet de rénovation.  
-Sélectionnez l'état actuel de votre projet et la **date de début**, puis ajustez les durées des phases (en **semaines**) pour générer un diagramme de Gantt interactif et clair.  
+# Zone de planification : éditeurs des durées, Gantt et exports
+def planning(etat, start_date, include_financement, recherche_financement_weeks):
+    """Éditeurs des durées par catégorie puis Gantt et exports ; retourne le nombre de tâches affichées."""
+    phases = generer_phases(etat)
 
-Les phases sont organisées par catégories : **Études préalables**, **Sélection MOE**, **MOE (Loi MOP)**.
-""")
-st.divider()
+    # --------------------
+    # Une expander par catégorie présente pour cet état
+    with etape("widgets"):
+        cles = [None] * len(phases)  # clé du widget de durée de chaque phase modifiable
+        groupes = []
+        for groupe, (titre, prefixe) in EXPANDERS.items():
+            positions = [position for position, phase in enumerate(phases) if phase["groupe"] == groupe]
+            if not positions:
+                continue
+            groupes.append((groupe, titre, prefixe, positions))
+            for idx, position in enumerate(positions):
+                if phases[position]["modifiable"]:
+                    cles[position] = cle_duree(prefixe, idx, phases[position])
+        appliquer_durees_en_attente(phases, cles)
+        for groupe, titre, prefixe, positions in groupes:
+            if formulaire_durees(groupe, titre, prefixe, [phases[position] for position in positions]):
+                metriques.CLICS.inc(bouton=f"appliquer_{prefixe}")
 
-# --------------------
-# Bandeaux catégories
-cat_col1, cat_col2, cat_col3 = st.columns([1,1,1])
-with cat_col1:
-    st.markdown("**🟦 Études préalables**")
-with cat_col2:
-    st.markdown("**🟧 Sélection MOE**")
-with cat_col3:
-    st.markdown("**🟪 MOE (Loi MOP)**")
+    # Historique des durées validées, par état du projet : une version par validation.
+    # Revenir à une version déjà affichée retrouve ses tâches et sa figure en cache.
+    historiques = st.session_state.setdefault("historiques_durees", {})
+    durees = [phase["duree"] for phase in phases]
+    historique = historiques.get(etat)
+    if historique is None or len(historique.courante) != len(durees):
+        historique = historiques[etat] = Historique(durees)
+    else:
+        historique.enregistrer(durees)
+    barre_historique(historique, cles)
+    edition_navigateur(phases, start_date, include_financement, recherche_financement_weeks)
 
-st.markdown("---")
+    st.divider()
+    st.warning("Vigilance (DET / AOR) : Les délais DET / AOR sont indicatifs et peuvent évoluer selon disponibilité des entreprises, matériaux et équipes MOE.")
 
-# --------------------
-# 1️⃣ Choix de l'état du projet
-etat = st.selectbox(
-    "Où en êtes-vous dans votre projet de rénovation énergétique ?",
-    ["-- Sélectionnez --",
-     "Nous n'avons pas encore effectué d'audit énergétique",
-     "Nous venons de recevoir les comptes rendus des études préalables (dont l'audit énergétique)",
-     "Nous voulons lancer notre marché de recrutement de maîtrise d'oeuvre",
-     "Nous venons de sélectionner notre équipe de maitrise d'oeuvre"]
-)
+    # --------------------
+    # Génération Gantt
+    # Le Gantt reste affiché une fois généré : les clics sur les boutons de
+    # téléchargement relancent le fragment sans faire disparaître le diagramme.
+    if st.button("Générer le diagramme de Gantt"):
+        metriques.CLICS.inc(bouton="generer")
+        st.session_state["gantt_genere"] = True
+
+    if not st.session_state.get("gantt_genere"):
+        return 0
+
+    # Tâches et figure en cache borné, partagées entre sessions de mêmes paramètres
+    cle = cle_taches(phases, start_date, include_financement, recherche_financement_weeks)
+    with etape("taches"):
+        df = cache_plannings().obtenir(cle, lambda: generer_taches(
+            phases, start_date, include_financement=include_financement,
+            recherche_financement_weeks=recherche_financement_weeks))
+    if df.empty:
+        st.info("Aucune phase à afficher.")
+        return 0
+
+    developpes = choisir_lots(phases)
+    reels = saisir_avancement(df, f"avancement_{ETATS.index(etat)}")
+    reference, libelle_reference = choisir_reference()
+    cle_figure = cle
+    if reels is not None:
+        with etape("reprevision"):
+            df = appliquer_avancement(df, reels)
+        cle_figure = (cle, tuple(reels.itertuples(index=False)))
+        afficher_glissement(df)
+    if developpes:
+        cle_figure = (cle_figure, cle_lots(phases, developpes))
+
+    def construire_figure():
+        # Les lots ne sont calculés que pour les lignes développées, et seulement si la figure n'est pas en cache
+        with etape("lots"):
+            taches = developper_lots(df, phases, developpes)
+        fig = generer_figure_gantt(taches, gabarit_partage())
+        return fig if reels is None else ajouter_avancement(fig, taches)
+
+    with etape("figure"):
+        fig = cache_figures().obtenir(cle_figure, construire_figure)
+        if reference is not None:
+            fig = ajouter_barres_reference(go.Figure(fig), reference, libelle=libelle_reference)
+    with etape("plotly_chart"):
+        if st.toggle("📉 Mise à jour différentielle du Gantt", key="gantt_differentiel",
+                     help="N'envoie au navigateur que les barres et bandeaux modifiés depuis la figure affichée."):
+            gantt_differentiel(fig, key="gantt_differentiel_figure")
+        else:
+            st.plotly_chart(fig, use_container_width=True, key="gantt")
+    if reference is not None:
+        with etape("ecarts"):
+            afficher_ecarts(comparer_plannings(reference, df), libelle_reference)
+    with etape("sensibilite"):
+        section_sensibilite(phases, start_date, include_financement, recherche_financement_weeks, reels, cle_figure)
+
+    # Exports
+    with etape("exports"):
+        col_ics, col_xlsx, col_mspdi, col_reference = st.columns([1,1,1,1])
+        with col_ics:
+            if st.download_button(
+                "📆 Exporter vers l'agenda (.ics)",
+                data="".join(iter_ics(df)).encode("utf-8"),
+                file_name="planning_renovation.ics",
+                mime="text/calendar",
+            ):
+                metriques.CLICS.inc(bouton="export_ics")
+        with col_xlsx:
+            classeur = io.BytesIO()
+            ecrire_xlsx(df, classeur)
+            if st.download_button(
+                "📊 Exporter vers Excel (.xlsx)",
+                data=classeur.getvalue(),
+                file_name="planning_renovation.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ):
+                metriques.CLICS.inc(bouton="export_xlsx")
+        with col_mspdi:
+            if st.download_button(
+                "🗂️ Exporter vers MS Project (.xml)",
+                data="".join(iter_mspdi(df)).encode("utf-8"),
+                file_name="planning_renovation.xml",
+                mime="application/xml",
+            ):
+                metriques.CLICS.inc(bouton="export_mspdi")
+        with col_reference:
+            instantane = io.BytesIO()
+            ecrire_reference(df, instantane)
+            if st.download_button(
+                "📌 Enregistrer comme référence (.parquet)",
+                data=instantane.getvalue(),
+                file_name="planning_reference.parquet",
+                mime="application/vnd.apache.parquet",
+            ):
+                metriques.CLICS.inc(bouton="export_reference")
+    return len(df)
+
+
+@st.fragment
+def zone_planning(etat, start_date, include_financement, recherche_financement_weeks):
+    """
+    Fragment regroupant les éditeurs de durées et le Gantt.
+
+    Valider une catégorie, générer le Gantt ou télécharger un export ne relance
+    que ce fragment : logo, en-tête, choix de l'état et glossaire ne sont pas
+    reconstruits. Les formulaires et le Gantt partagent le même fragment car un
+    fragment ne peut ni écrire hors de son conteneur ni relancer un autre fragment.
+    """
+    if execution_complete:  # le profileur de l'exécution complète mesure déjà le fragment
+        return planning(etat, start_date, include_financement, recherche_financement_weeks)
+    with Profileur() as profileur_fragment:  # arrêté aussi par st.rerun(scope="fragment")
+        nb_taches = planning(etat, start_date, include_financement, recherche_financement_weeks)
+    terminer_execution(profileur_fragment, portee="fragment", etat=etat, nb_taches=nb_taches)
+
+
+
+
+def application():
+    """Exécution complète du script ; retourne son contexte pour `terminer_execution` (vue, état, nombre de tâches)."""
+    # Afficher le logo
+    with etape("en-tete"):
+        st.image(logo(), width=450)
+
+    # --------------------
+    # Vue Portefeuille : analyses sur plusieurs bâtiments
+    vue = st.sidebar.radio("Vue", ["📊 Mon projet", "🏘️ Portefeuille"], key="vue")
+    if vue == "🏘️ Portefeuille":
+        with etape("portefeuille"):
+            page_portefeuille()
+        return {"vue": "portefeuille"}
+
+    # --------------------
+    # 0️⃣ Titre et introduction
+    with etape("en-tete"):
+        st.title("📊 Assistant Planification du Projet de Rénovation")
+        st.markdown("""
+        Bienvenue dans l'outil de planification de projet de rénovation.  
+        Sélectionnez l'état actuel de votre projet et la **date de début**, puis ajustez les durées des phases (en **semaines**) pour générer un diagramme de Gantt interactif et clair.  
+
+        Les phases sont organisées par catégories : **Études préalables**, **AMO Programmiste**, **Sélection MOE**, **MOE (Loi MOP)**.
+        """)
+        st.divider()
+
+        # --------------------
+        # Bandeaux catégories
+        cat_col1, cat_col2, cat_col3, cat_col4 = st.columns([1,1,1,1])
+        with cat_col1:
+            st.markdown("**🟦 Études préalables**")
+        with cat_col2:
+            st.markdown("**🟨 AMO Programmiste**")
+        with cat_col3:
+            st.markdown("**🟧 Sélection MOE**")
+        with cat_col4:
+            st.markdown("**🟪 MOE (Loi MOP)**")
+
+        st.markdown("---")
+
+    # --------------------
+    # 1️⃣ Choix de l'état du projet
+    etat = st.selectbox(
+        "Où en êtes-vous dans votre projet de rénovation énergétique ?",
+        ["-- Sélectionnez --"] + ETATS
+    )
+
+    if etat == "-- Sélectionnez --":
+        st.info("Sélectionnez votre état du projet pour afficher les étapes.")
+        return {}
 
-if etat == "-- Sélectionnez --":
-    st.info("Sélectionnez votre état du projet pour afficher les étapes.")
-    st.stop()
-else:
     # Recherche de financement
     st.subheader("💶 Recherche de financement")
     col_f1, col_f2 = st.columns([2,1])
@@ -91,259 +285,29 @@ else:
 
     # Date de début
     start_date = st.date_input("📅 Date de début du projet", key="date_debut")
-    st.markdown("Durées exprimées en **semaines** (valeurs modifiables).")
-
-    phases = []
+    st.markdown("Durées exprimées en **semaines** (valeurs modifiables) : validez chaque catégorie avec **Appliquer les durées**.")
 
-    # --------------------
-    # Études préalables
-    if etat in ["Nous n'avons pas encore effectué d'audit énergétique", 
-                "Nous venons de recevoir les comptes rendus des études préalables (dont l'audit énergétique)"]:
-        with st.expander("📋 Études préalables", expanded=True):
-            phases_audit = []
-            if etat == "Nous n'avons pas encore effectué d'audit énergétique":
-                phases_audit += [
-                    {"nom":"📝 Rédaction du programme (si pas d'audit préalable)", "duree":3, "modifiable":True, "delai_mo":0, "groupe":"Études préalables"},
-                    {"nom":"📝 Analyse du site: faisabilité, diagnostics et audit énergétique", "duree":20, "modifiable":True, "delai_mo":0, "groupe":"Études préalables"},
-                    {"nom":"📝 Restitution de l'audit énergétique", "duree":2, "modifiable":True, "delai_mo":0, "groupe":"Études préalables"},
-                ]
-            else:
-                phases_audit += [
-                    {"nom":"📝 Analyse des comptes-rendus d'audits", "duree":2, "modifiable":True, "delai_mo":0, "groupe":"Études préalables"},
-                ]
-            phases_audit += [
-                {"nom":"📝 Prise de décision des élus", "duree":0, "modifiable":False, "delai_mo":6, "groupe":"Études préalables"},
-                {"nom":"📝 Rédaction du programme de travaux et validation", "duree":4, "modifiable":True, "delai_mo":2, "groupe":"Études préalables"},
-            ]
-            for idx, phase in enumerate(phases_audit):
-                if phase["modifiable"]:
-                    col1, col2 = st.columns([3,1])
-                    with col1:
-                        st.write(phase["nom"])
-                    with col2:
-                        phase["duree"] = st.number_input(
-                            "semaines",
-                            min_value=0 if phase["nom"].startswith("📝 Prise") else 1,
-                            value=phase["duree"],
-                            key=f"audit_{idx}_{phase['nom']}"
-                        )
-            phases += phases_audit
-
-    # --------------------
-    # Sélection MOE
-    if etat in ["Nous n'avons pas encore effectué d'audit énergétique",
-                "Nous venons de recevoir les comptes rendus des études préalables (dont l'audit énergétique)",
-                "Nous voulons lancer notre marché de recrutement de maîtrise d'oeuvre"]:
-        with st.expander("🧑‍💼 Sélection d'une MOE", expanded=True):
-            phases_recrut = [
-                {"nom":"📝 Rédaction des cahiers des charges et lancement du marché", "duree":8, "modifiable":True, "delai_mo":0, "groupe":"Sélection MOE"},
-                {"nom":"📝 Publication, analyse du marché et sélection de la MOE", "duree":8, "modifiable":True, "delai_mo":0, "groupe":"Sélection MOE"},
-                {"nom":"📝 Commission d'appel d'offres", "duree":2, "modifiable":True, "delai_mo":0, "groupe":"Sélection MOE"},
-                {"nom":"📝 Signature des marchés", "duree":1, "modifiable":True, "delai_mo":0, "groupe":"Sélection MOE"},
-            ]
-            for idx, phase in enumerate(phases_recrut):
-                if phase["modifiable"]:
-                    col1, col2 = st.columns([3,1])
-                    with col1:
-                        st.write(phase["nom"])
-                    with col2:
-                        phase["duree"] = st.number_input(
-                            "semaines",
-                            min_value=1,
-                            value=phase["duree"],
-                            key=f"recrut_{idx}_{phase['nom']}"
-                        )
-            phases += phases_recrut
+    nb_taches = zone_planning(etat, start_date, include_financement, recherche_financement_weeks)
 
-    # --------------------
-    # MOE / Loi MOP
-    if etat in ["Nous n'avons pas encore effectué d'audit énergétique",
-                "Nous venons de recevoir les comptes rendus des études préalables (dont l'audit énergétique)",
-                "Nous voulons lancer notre marché de recrutement de maîtrise d'oeuvre",
-                "Nous venons de sélectionner notre équipe de maitrise d'oeuvre"]:
-        with st.expander("🏗️ MOE (Loi MOP)", expanded=True):
-            phases_mop = [
-                {"nom":"📝 DIAG - Diagnostic & Études d’Esquisse", "duree":4, "modifiable":True, "delai_mo":2, "groupe":"MOE"},
-                {"nom":"📝 ESQ - Esquisse (non affichée sur le GANTT)", "duree":0, "modifiable":False, "delai_mo":0, "groupe":"MOE"},
-                {"nom":"📝 APS - Avant-Projet Sommaire", "duree":4, "modifiable":True, "delai_mo":2, "groupe":"MOE"},
-                {"nom":"📝 APD - Avant-Projet Définitif", "duree":8, "modifiable":True, "delai_mo":3, "groupe":"MOE"},
-                {"nom":"📝 Constitution Dossier Autorisation", "duree":2, "modifiable":True, "delai_mo":2, "groupe":"MOE"},
-                {"nom":"📝 PRO - Études de Projet", "duree":6, "modifiable":True, "delai_mo":3, "groupe":"MOE"},
-                {"nom":"📝 DCE - Études de Projet", "duree":6, "modifiable":True, "delai_mo":3, "groupe":"MOE"},
-                {"nom":"📝 ACT - Assistance passation marchés", "duree":2, "modifiable":True, "delai_mo":1, "groupe":"MOE"},
-                {"nom":"📝 VISA - Visa Etudes d’Exécution", "duree":1, "modifiable":True, "delai_mo":0, "groupe":"MOE"},
-                {"nom":"🚧 DET - Direction Exécution Travaux", "duree":8, "modifiable":True, "delai_mo":0, "groupe":"MOE"},
-                {"nom":"👷‍♂️👷‍♀️ AOR - Assistance aux opérations de réception", "duree":4, "modifiable":True, "delai_mo":0, "groupe":"MOE"},
-            ]
-            for idx, phase in enumerate(phases_mop):
-                col1, col2 = st.columns([3,1])
-                with col1:
-                    st.write(phase["nom"])
-                    brief_def = GLOSSAIRE.get(phase["nom"].split(" - ")[0].split(" ")[-1], "")
-                    if brief_def:
-                        st.caption(brief_def)
-                with col2:
-                    min_val = 1
-                    if "APS" in phase["nom"]:
-                        min_val = 3
-                    elif "APD" in phase["nom"]:
-                        min_val = 6
-                    elif "PRO" in phase["nom"]:
-                        min_val = 4
-                    if phase["modifiable"]:
-                        phase["duree"] = st.number_input(
-                            "semaines",
-                            min_value=min_val,
-                            value=phase["duree"],
-                            key=f"mop_{idx}_{phase['nom']}"
-                        )
-            phases += phases_mop
-
-    st.divider()
-    st.warning("Vigilance (DET / AOR) : Les délais DET / AOR sont indicatifs et peuvent évoluer selon disponibilité des entreprises, matériaux et équipes MOE.")
-
-    # --------------------
-    # Génération Gantt
-    if st.button("Générer le diagramme de Gantt"):
-        tasks = []
-        current_start = pd.to_datetime(start_date)
-
-        # Recherche financement
-        if include_financement:
-            fin_start = current_start
-            fin_end = fin_start + timedelta(weeks=recherche_financement_weeks)
-            tasks.append(dict(Task="💶 Recherche de financement", Start=fin_start, Finish=fin_end,
-                              Type="Financement", Groupe="Financement", Definition="Recherche et montage des financements (subventions, prêts, etc.)."))
-            current_start = fin_end
-
-        for phase in phases:
-            if phase["nom"].startswith("ESQ"):
-                continue  # n'apparait pas sur le Gantt
-            start = current_start
-            dur = phase["duree"]
-            delay = phase.get("delai_mo",0)
-            end_phase = start + timedelta(weeks=dur)
-            tasks.append(dict(Task=phase["nom"], Start=start, Finish=end_phase,
-                              Type='Phase', Groupe=phase["groupe"], Definition=GLOSSAIRE.get(phase["nom"].split(" - ")[0], "")))
-            if delay > 0:
-                end_delay = end_phase + timedelta(weeks=delay)
-                tasks.append(dict(Task=phase["nom"], Start=end_phase, Finish=end_delay,
-                                  Type='Délai MO', Groupe=phase["groupe"], Definition=GLOSSAIRE.get(phase["nom"].split(" - ")[0], "")))
-                current_start = end_delay
-            else:
-                current_start = end_phase
-
-        df = pd.DataFrame(tasks)
-        if df.empty:
-            st.info("Aucune phase à afficher.")
-            st.stop()
-
-        df["Duration_weeks"] = (pd.to_datetime(df["Finish"]) - pd.to_datetime(df["Start"])).dt.days / 7
-        df["hover_def"] = df["Definition"].fillna("") + "<br>Durée: " + df["Duration_weeks"].round(1).astype(str) + " semaines"
-
-        fig = px.timeline(
-            df, x_start="Start", x_end="Finish", y="Task", color="Type",
-            custom_data=["hover_def","Groupe"],
-            color_discrete_map={"Phase":"#0915a6","Délai MO":"#ff5300","Financement":"green"}
-        )
-        fig.update_traces(
-            hovertemplate="%{y}<br>%{customdata[0]}<br>Catégorie: %{customdata[1]}<extra></extra>",
-            marker_line_width=1, marker_line_color='black'
-        )
-        fig.update_yaxes(autorange="reversed")
-        fig.update_layout(height=900,width=1400,
-                          margin=dict(l=50,r=50,t=120,b=80),
-                          title=dict(text="📅 Diagramme de Gantt du projet — unités : semaines", font=dict(size=18,color="#0915a6")),
-                          xaxis=dict(tickfont=dict(size=14),title="Date"),
-                          yaxis=dict(tickfont=dict(size=12),title="Phases"),
-                          plot_bgcolor="white")
-        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgrey')
-
-        # Bandeaux catégories
-        groups_to_show = ["Études préalables","Sélection MOE","MOE","Financement"]
-        color_map_group = {"Études préalables":"#cfe3ff","Sélection MOE":"#ffe5cc","MOE":"#e6ccff","Financement":"#d6f5d6"}
-        shapes = []
-        annotations = []
-        for grp in groups_to_show:
-            grp_df = df[df["Groupe"]==grp]
-            if grp_df.empty: continue
-            s = grp_df["Start"].min()
-            f = grp_df["Finish"].max()
-            shapes.append(dict(type="rect", xref="x", yref="paper", x0=s, x1=f, y0=1.02, y1=1.08,
-                               fillcolor=color_map_group.get(grp,"#dddddd"), line=dict(width=0), opacity=0.8))
-            annotations.append(dict(x=s + (f-s)/2, y=1.095, xref="x", yref="paper",
-                                    text=f"<b>{grp}</b>", showarrow=False, align="center", font=dict(size=12,color="black")))
-        fig.update_layout(shapes=shapes, annotations=annotations)
-
-        # Ligne verticale € entre Études préalables et Sélection MOE
-        if "Études préalables" in df["Groupe"].values and "Sélection MOE" in df["Groupe"].values:
-            transition_date = df[df["Groupe"]=="Études préalables"]["Finish"].max()
-            fig.add_vline(x=transition_date,line_width=2,line_dash="solid",line_color="black")
-            fig.add_annotation(x=transition_date,y=-0.5,text="💶",showarrow=False,font=dict(size=18,color="black"),yshift=-30)
-
-        st.plotly_chart(fig,use_container_width=True)
-
-      
-
-        # Vos données
-        df_gloss = pd.DataFrame({
-            "Phase": list(GLOSSAIRE_COMPLET.keys()),
-            "Définition": list(GLOSSAIRE_COMPLET.values())
-        })
-        
-        color_map = {
-            "DIAG": "#cfe3ff",
-            "ESQ": "#cfe3ff",
-            "APS": "#d4e6f1",
-            "APD": "#d4e6f1",
-            "Autorisations Administratives": "#ffe5cc",
-            "PRO": "#e6ccff",
-            "ACT / AMT": "#e6ccff",
-            "DCE": "#e6ccff",
-            "EXE": "#f9f2f2",
-            "AOR": "#f9f2f2"
-        }
-        
-        # Début du tableau HTML
-        html_table = """
-        <table style="width:100%; border-collapse:collapse; border:1px solid #ddd; font-family:Arial; margin-top:20px;">
-            <thead>
-                <tr style="background-color:#f2f2f2;">
-                    <th style="padding:12px; text-align:left; border:1px solid #ddd; width:20%;">Phase</th>
-                    <th style="padding:12px; text-align:left; border:1px solid #ddd; width:80%;">Définition</th>
-                </tr>
-            </thead>
-            <tbody>
-        """
-        
-        # Ajoutez les lignes du tableau
-        for index, row in df_gloss.iterrows():
-            phase = row["Phase"]
-            background_color = color_map.get(phase, "#ffffff")
-            html_table += f"""
-            <tr style="background-color:{background_color};">
-                <td style="padding:12px; text-align:left; border:1px solid #ddd; vertical-align:top; width:20%;">
-                    <strong>{phase}</strong>
-                </td>
-                <td style="padding:12px; text-align:left; border:1px solid #ddd; vertical-align:top; width:80%; white-space:normal; word-wrap:break-word;">
-                    {row['Définition']}
-                </td>
-            </tr>
-            """
-        
-        # Fin du tableau HTML
-        html_table += """
-            </tbody>
-        </table>
-        """
-        
-        # Affichez le tableau avec `components.html`
+    # Affichez le glossaire avec `components.html`
+    with etape("glossaire"):
         st.markdown("### 📚 Glossaire des phases")
         components.html(
-            f"""
-            <div style="width:100%; overflow-x:auto;">
-                {html_table}
-            </div>
-            """,
+            glossaire_html(),
             height=800,  # Ajustez la hauteur selon vos besoins
         )
+
+    return {"etat": etat, "nb_taches": nb_taches}
+
+
+# --------------------
+# Exécution : le profileur est arrêté même si elle est interrompue (st.rerun, st.stop,
+# erreur), car Streamlit relance le script sur le même thread et le même contexte.
+# Les métriques et le panneau de debug ne concernent que les exécutions terminées.
+execution_complete = True  # faux lors des relances du fragment seul (voir `zone_planning`)
+try:
+    with Profileur(cprofile=DEBUG and st.session_state.get("profilage_cprofile", False)) as profileur:
+        contexte = application()
+finally:
+    execution_complete = False
+terminer_execution(profileur, **contexte)
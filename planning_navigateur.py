@@ -0,0 +1,73 @@
+"""
+Composant Streamlit qui recalcule le planning dans le navigateur.
+
+    durees = planning_navigateur(phases, start_date, include_financement, recherche_financement_weeks)
+
+Le composant (`composants/planning_navigateur`, HTML et JavaScript sans
+dépendance ni étape de compilation) reçoit le gabarit des phases, refait
+l'enchaînement (durées, délais MO, financement) et redessine les barres à
+chaque saisie, sans aller-retour avec le serveur. Python ne reçoit les durées
+qu'à l'enregistrement : `planning_navigateur` retourne alors, une seule fois,
+les durées modifiées ({nom de phase: semaines}), et None le reste du temps.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from config import COULEURS_TYPES
+from gantt import TACHE_FINANCEMENT
+
+DOSSIER_COMPOSANT = Path(__file__).parent / "composants" / "planning_navigateur"
+
+_composant = components.declare_component("planning_navigateur", path=str(DOSSIER_COMPOSANT))
+
+
+def gabarit_navigateur(phases, start_date, include_financement=True, recherche_financement_weeks=6):
+    """
+    Gabarit JSON du planning pour le composant : début en millisecondes UTC,
+    financement éventuel, phases réduites aux champs de l'enchaînement et couleurs.
+    """
+    return {
+        "debut": pd.Timestamp(start_date).value // 10**6,
+        "financement": ({"nom": TACHE_FINANCEMENT, "semaines": recherche_financement_weeks}
+                        if include_financement else None),
+        "phases": [
+            {"nom": phase["nom"], "groupe": phase["groupe"], "duree": phase["duree"],
+             "duree_min": phase["duree_min"], "modifiable": phase["modifiable"],
+             "delai_mo": phase.get("delai_mo", 0), "gantt": phase.get("gantt", True)}
+            for phase in phases
+        ],
+        "couleurs": COULEURS_TYPES,
+    }
+
+
+def durees_modifiees(valeur, phases):
+    """Durées de l'enregistrement `valeur` du composant qui diffèrent de celles des `phases`."""
+    actuelles = {phase["nom"]: phase["duree"] for phase in phases}
+    return {
+        nom: duree for nom, duree in valeur["durees"].items()
+        if nom in actuelles and duree != actuelles[nom]
+    }
+
+
+def planning_navigateur(phases, start_date, include_financement=True, recherche_financement_weeks=6,
+                        key="planning_navigateur"):
+    """
+    Affiche le composant et retourne les durées modifiées lors d'un nouvel
+    enregistrement ({nom de phase: semaines}), ou None.
+    """
+    gabarit = gabarit_navigateur(phases, start_date, include_financement, recherche_financement_weeks)
+    # Le composant ne reconstruit ses lignes que si le gabarit change
+    signature = hashlib.blake2b(json.dumps(gabarit, sort_keys=True).encode(), digest_size=16).hexdigest()
+    valeur = _composant(gabarit=gabarit, signature=signature, key=key, default=None)
+
+    lu = f"{key}_enregistrement_lu"
+    if not valeur or valeur.get("enregistrement") == st.session_state.get(lu):
+        return None
+    st.session_state[lu] = valeur["enregistrement"]
+    return durees_modifiees(valeur, phases)
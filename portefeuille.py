@@ -0,0 +1,309 @@
+"""
+Analyses d'un portefeuille de projets, sur la table des tâches de `gantt.generer_portefeuille`.
+
+    occupation = occupation_hebdomadaire(taches, debut="2027-01-01", fin="2027-12-31")
+    occupation["🚧 DET - Direction Exécution Travaux"]   # bâtiments en DET chaque semaine
+
+    index = IndexIntervalles(taches)
+    index.requete("2027-03-01", "2027-06-01")           # tâches en cours entre mars et mai
+    index.requete(pd.Timestamp.today())                  # tâches en cours aujourd'hui
+
+    conflits = detecter_conflits(taches, cle="Site")    # deux bâtiments d'un même site en DET
+
+Une tâche occupe l'intervalle [Start, Finish[ : la phase suivante d'un projet
+commence le jour où la précédente finit.
+"""
+
+import heapq
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+_UN_JOUR = np.timedelta64(1, "D")
+_LUNDI_SEMAINE_1 = np.datetime64("1970-01-05")  # premier lundi après l'époque (un jeudi)
+
+# Colonnes de la table des tâches lues par les analyses (projection des plannings stockés, voir `stockage`)
+COLONNES_ANALYSES = ["Projet", "Site", "Equipe", "Task", "Type", "Start", "Finish"]
+# Phases qui ne peuvent pas se dérouler en même temps sur un même site ou pour une même équipe
+PHASES_EXCLUSIVES = ("🚧 DET - Direction Exécution Travaux",)
+COLONNES_CONFLITS = ["Projet A", "Tâche A", "Projet B", "Tâche B", "Début", "Fin", "Semaines"]
+
+
+def lire_portefeuille(contenu):
+    """Projets d'un portefeuille JSON : une liste, ou un objet {"projets": [...]} comme l'API."""
+    donnees = json.loads(contenu)
+    projets = donnees.get("projets") if isinstance(donnees, dict) else donnees
+    if not isinstance(projets, list) or not all(isinstance(projet, dict) for projet in projets):
+        raise ValueError("Le portefeuille doit être une liste de projets ou un objet {'projets': [...]}")
+    return projets
+
+
+def _jours(colonne):
+    """Dates d'une colonne en nombre de jours depuis l'époque (int64)."""
+    return pd.to_datetime(colonne).to_numpy("datetime64[D]").astype(np.int64)
+
+
+def _nanosecondes(colonne):
+    """Dates d'une colonne en nanosecondes depuis l'époque (int64)."""
+    return pd.to_datetime(colonne).to_numpy("datetime64[ns]").astype(np.int64)
+
+
+# --------------------
+# Occupation hebdomadaire
+def occupation_hebdomadaire(taches, types=("Phase",), colonne="Task", debut=None, fin=None):
+    """
+    Nombre de tâches en cours dans chaque phase, semaine par semaine.
+
+    Une tâche compte dans toutes les semaines (du lundi au dimanche) qu'elle
+    recouvre, même partiellement ; les tâches de durée nulle ne comptent pas.
+    Avec une tâche par phase et par projet, c'est le nombre de bâtiments dans
+    la phase. Retourne un DataFrame indexé par le lundi de chaque semaine, avec
+    une colonne par valeur de `colonne` (ordre de première apparition),
+    éventuellement restreint aux semaines recouvrant [debut, fin].
+
+    Calcul par tableau de différences : +1 à la semaine de début et -1 après la
+    dernière semaine de chaque tâche, puis somme cumulée, soit
+    O(tâches + semaines × phases).
+    """
+    taches = taches[taches["Type"].isin(types)]
+    jours_debut, jours_fin = _jours(taches["Start"]), _jours(taches["Finish"])
+    garder = jours_fin > jours_debut
+    codes, phases = pd.factorize(taches[colonne][garder])
+    if not len(codes):
+        return pd.DataFrame(columns=pd.Index(phases, name=colonne), index=pd.DatetimeIndex([], name="Semaine"), dtype=np.int64)
+
+    # Semaines numérotées depuis l'époque, commençant le lundi ; fin exclusive
+    semaine_debut = (jours_debut[garder] + 3) // 7
+    semaine_fin = (jours_fin[garder] - 1 + 3) // 7 + 1
+    origine = semaine_debut.min()
+    nb_semaines = semaine_fin.max() - origine
+    nb_phases = len(phases)
+
+    taille = (nb_semaines + 1) * nb_phases
+    differences = (
+        np.bincount((semaine_debut - origine) * nb_phases + codes, minlength=taille)
+        - np.bincount((semaine_fin - origine) * nb_phases + codes, minlength=taille)
+    ).reshape(nb_semaines + 1, nb_phases)
+    comptes = differences.cumsum(axis=0)[:-1]
+
+    lundis = _LUNDI_SEMAINE_1 + (origine - 1 + np.arange(nb_semaines)) * 7 * _UN_JOUR
+    occupation = pd.DataFrame(
+        comptes,
+        index=pd.DatetimeIndex(lundis, name="Semaine"),
+        columns=pd.Index(phases, name=colonne),
+    )
+    if debut is not None:
+        occupation = occupation[occupation.index > pd.Timestamp(debut) - pd.Timedelta(weeks=1)]
+    if fin is not None:
+        occupation = occupation[occupation.index <= pd.Timestamp(fin)]
+    return occupation
+
+
+def figure_occupation(occupation, titre="Bâtiments par phase et par semaine"):
+    """Graphique en aires empilées d'une occupation hebdomadaire."""
+    long = occupation.rename_axis(columns="Phase").stack().rename("Bâtiments").reset_index()
+    fig = px.area(long, x="Semaine", y="Bâtiments", color="Phase", line_shape="hv")
+    fig.update_layout(
+        height=500, title=dict(text=titre, font=dict(size=18, color="#0915a6")),
+        plot_bgcolor="white", legend=dict(title="Phase"),
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="lightgrey")
+    return fig
+
+
+# --------------------
+# Index d'intervalles
+class IndexIntervalles:
+    """
+    Index des intervalles [Start, Finish[ d'une table de tâches.
+
+    Arbre d'intervalles implicite sur les tâches triées par début (disposition
+    de cgranges, H. Li) : le nœud d'indice i a pour niveau le nombre de bits à 1
+    de poids faible de i et porte la fin maximale de son sous-arbre. Une requête
+    descend uniquement dans les sous-arbres qui peuvent la recouper, soit
+    O(log n + k) pour k tâches trouvées. Construction en O(n log n).
+    """
+
+    def __init__(self, taches):
+        self.taches = taches
+        debuts, fins = _nanosecondes(taches["Start"]), _nanosecondes(taches["Finish"])
+        ordre = np.argsort(debuts, kind="stable")
+        debuts, fins = debuts[ordre], fins[ordre]
+        fins_max = fins.copy()
+
+        # Fin maximale des nœuds internes, niveau par niveau (nœuds d'indice impair) : le
+        # sous-arbre du nœud x de niveau k couvre les positions [x - 2^k + 1, x + 2^k - 1],
+        # tronquées à n. Ces plages sont disjointes à un niveau donné : un seul reduceat.
+        n = len(debuts)
+        fins_bornees = np.append(fins, np.iinfo(np.int64).min)  # sentinelle pour la borne n
+        k = 1
+        while 1 << k <= n:
+            noeuds = np.arange((1 << k) - 1, n, 1 << (k + 1))
+            bornes = np.empty(2 * len(noeuds), dtype=np.intp)
+            bornes[0::2] = noeuds - (1 << k) + 1
+            bornes[1::2] = np.minimum(noeuds + (1 << k), n)
+            fins_max[noeuds] = np.maximum.reduceat(fins_bornees, bornes)[0::2]
+            k += 1
+        niveau_racine = k - 1 if n else 0
+
+        self._ordre = ordre
+        self._niveau_racine = niveau_racine
+        # Listes Python : l'accès élément par élément du parcours y est bien plus rapide
+        self._debuts, self._fins, self._fins_max = debuts.tolist(), fins.tolist(), fins_max.tolist()
+
+    def __len__(self):
+        return len(self._debuts)
+
+    def positions(self, debut, fin):
+        """Positions (dans la table) des tâches recoupant [debut, fin[, en nanosecondes depuis l'époque."""
+        debuts, fins, fins_max, n = self._debuts, self._fins, self._fins_max, len(self._debuts)
+        trouves = []
+        if not n:
+            return np.array(trouves, dtype=np.int64)
+        pile = [((1 << self._niveau_racine) - 1, self._niveau_racine, False)]
+        while pile:
+            x, k, gauche_vue = pile.pop()
+            if k <= 3:
+                # petit sous-arbre : parcours linéaire
+                i = x >> k << k
+                i1 = min(i + (1 << (k + 1)) - 1, n)
+                while i < i1 and debuts[i] < fin:
+                    if fins[i] > debut:
+                        trouves.append(i)
+                    i += 1
+            elif not gauche_vue:
+                pile.append((x, k, True))
+                y = x - (1 << (k - 1))
+                if y >= n or fins_max[y] > debut:
+                    pile.append((y, k - 1, False))
+            elif x < n and debuts[x] < fin:
+                if fins[x] > debut:
+                    trouves.append(x)
+                pile.append((x + (1 << (k - 1)), k - 1, False))
+        return np.sort(self._ordre[trouves])
+
+    def requete(self, debut, fin=None):
+        """
+        Tâches en cours à l'instant `debut` ou, si `fin` est donné, recoupant [debut, fin[.
+
+        Retourne les lignes correspondantes de la table, dans leur ordre d'origine.
+        """
+        debut = pd.Timestamp(debut).value
+        fin = debut + 1 if fin is None else pd.Timestamp(fin).value
+        return self.taches.iloc[self.positions(debut, fin)]
+
+
+# --------------------
+# Conflits entre projets
+def detecter_conflits(taches, cle="Site", phases=PHASES_EXCLUSIVES, types=("Phase",)):
+    """
+    Paires de tâches de projets différents qui se chevauchent avec la même valeur de `cle`.
+
+    Seules comptent les tâches des `types` donnés, dans `phases` (toutes si None),
+    dont la colonne `cle` ("Site", "Equipe"...) est renseignée. Retourne un
+    DataFrame avec la valeur de `cle`, les deux tâches (A commence la première)
+    et la période de chevauchement [Début, Fin[, trié par `cle` puis par début.
+
+    Balayage : tâches triées par (`cle`, début) ; un tas des tâches en cours,
+    ordonné par fin, est purgé de celles finies avant chaque nouveau début, et
+    toutes celles qui y restent chevauchent la nouvelle tâche. Soit
+    O(n log n + k) pour k conflits.
+    """
+    selection = taches["Type"].isin(types) & taches[cle].notna()
+    if phases is not None:
+        selection &= taches["Task"].isin(phases)
+    selection = taches[selection]
+    debuts, fins = _nanosecondes(selection["Start"]), _nanosecondes(selection["Finish"])
+    garder = fins > debuts
+    selection, debuts, fins = selection[garder], debuts[garder], fins[garder]
+    codes_cle, _ = pd.factorize(selection[cle])
+    codes_projet, _ = pd.factorize(selection["Projet"])
+
+    ordre = np.lexsort((debuts, codes_cle)).tolist()
+    debuts_l, fins_l = debuts.tolist(), fins.tolist()
+    codes_cle, codes_projet = codes_cle.tolist(), codes_projet.tolist()
+    premieres, secondes = [], []
+    en_cours, cle_courante = [], None
+    for i in ordre:
+        if codes_cle[i] != cle_courante:
+            en_cours, cle_courante = [], codes_cle[i]
+        while en_cours and en_cours[0][0] <= debuts_l[i]:
+            heapq.heappop(en_cours)
+        for _, j in en_cours:
+            if codes_projet[j] != codes_projet[i]:
+                premieres.append(j)
+                secondes.append(i)
+        heapq.heappush(en_cours, (fins_l[i], i))
+
+    if not premieres:
+        return pd.DataFrame(columns=[cle] + COLONNES_CONFLITS)
+    a, b = np.array(premieres), np.array(secondes)
+    # b commence après a (ou en même temps) : le chevauchement va du début de b à la première fin
+    debut = debuts[b].astype("datetime64[ns]")
+    fin = np.minimum(fins[a], fins[b]).astype("datetime64[ns]")
+    conflits = pd.DataFrame({
+        cle: selection[cle].to_numpy()[a],
+        "Projet A": selection["Projet"].to_numpy()[a],
+        "Tâche A": selection["Task"].to_numpy()[a],
+        "Projet B": selection["Projet"].to_numpy()[b],
+        "Tâche B": selection["Task"].to_numpy()[b],
+        "Début": debut,
+        "Fin": fin,
+        "Semaines": (fin - debut) / np.timedelta64(7, "D"),
+    })
+    return conflits.sort_values([cle, "Début", "Projet A", "Projet B"], kind="stable", ignore_index=True)
+
+
+def figure_conflits(taches, conflits, cle="Site", phases=PHASES_EXCLUSIVES, types=("Phase",)):
+    """
+    Gantt par projet des phases surveillées, chevauchements surlignés en rouge.
+
+    Une ligne par projet dont la colonne `cle` est renseignée, barres colorées
+    par valeur de `cle` ; les périodes en conflit de chaque projet sont
+    fusionnées en un seul rectangle par période, quel que soit le nombre de
+    paires concernées.
+    """
+    selection = taches["Type"].isin(types) & taches[cle].notna()
+    if phases is not None:
+        selection &= taches["Task"].isin(phases)
+    selection = taches[selection].sort_values([cle, "Start"], kind="stable")
+    projets = list(dict.fromkeys(selection["Projet"]))
+    fig = px.timeline(
+        selection, x_start="Start", x_end="Finish", y="Projet", color=cle,
+        hover_data={"Task": True, "Projet": False}, category_orders={"Projet": projets},
+    )
+    fig.update_traces(marker_line_width=1, marker_line_color="black")
+
+    # Périodes en conflit de chaque projet, fusionnées
+    periodes = pd.concat([
+        conflits[["Projet A", "Début", "Fin"]].set_axis(["Projet", "Début", "Fin"], axis=1),
+        conflits[["Projet B", "Début", "Fin"]].set_axis(["Projet", "Début", "Fin"], axis=1),
+    ]).sort_values(["Projet", "Début"], kind="stable")
+    # px.timeline inverse l'ordre des catégories pour afficher la première en haut
+    rang = {projet: position for position, projet in enumerate(fig.layout.yaxis.categoryarray)}
+    shapes = []
+    for projet, groupe in periodes.groupby("Projet", sort=False):
+        debut_courant = fin_courante = None
+        for debut, fin in zip(groupe["Début"], groupe["Fin"]):
+            if fin_courante is not None and debut <= fin_courante:
+                fin_courante = max(fin_courante, fin)
+                continue
+            if fin_courante is not None:
+                shapes.append((projet, debut_courant, fin_courante))
+            debut_courant, fin_courante = debut, fin
+        shapes.append((projet, debut_courant, fin_courante))
+    for projet, debut, fin in shapes:
+        fig.add_shape(type="rect", xref="x", yref="y", x0=debut, x1=fin,
+                      y0=rang[projet] - 0.45, y1=rang[projet] + 0.45,
+                      fillcolor="red", opacity=0.35, line=dict(color="red", width=2), layer="above")
+
+    fig.update_yaxes(title=None)
+    fig.update_layout(
+        height=max(300, 40 * len(projets) + 150),
+        title=dict(text="⚠️ Chevauchements par " + cle.lower(), font=dict(size=18, color="#0915a6")),
+        plot_bgcolor="white",
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="lightgrey")
+    return fig
@@ -0,0 +1,107 @@
+"""
+Instrumentation légère du chemin de génération : chronométrage par étape et cProfile optionnel.
+
+    profileur = Profileur(cprofile=True)
+    with profileur:
+        with etape("taches"):
+            ...
+    profileur.resume()            # {"taches": 12.3, ...} en millisecondes
+    profileur.ecrire_jsonl("profilage.jsonl", etat=...)
+
+`etape` peut être appelé n'importe où (y compris dans `gantt.py`) : sans
+profileur actif, il ne fait rien. Les étapes imbriquées sont nommées par leur
+chemin ("figure/px.timeline").
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+_profileur_actif = ContextVar("profileur_actif", default=None)
+
+
+class Profileur:
+    """Collecte les durées des étapes d'une exécution, et son profil cProfile si demandé."""
+
+    def __init__(self, cprofile=False):
+        self.mesures = []
+        self._pile = []
+        self._jeton = None
+        self._debut = None
+        self.duree_totale_s = None
+        self._cprofile = cProfile.Profile() if cprofile else None
+
+    # Activation : le profileur devient le profileur courant du contexte d'exécution
+    def demarrer(self):
+        self._jeton = _profileur_actif.set(self)
+        self._debut = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def arreter(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.duree_totale_s = time.perf_counter() - self._debut
+        _profileur_actif.reset(self._jeton)
+
+    __enter__ = demarrer
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+    @contextmanager
+    def etape(self, nom):
+        """Chronomètre le bloc et l'enregistre sous son chemin d'étapes imbriquées."""
+        self._pile.append(nom)
+        chemin = "/".join(self._pile)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mesures.append((chemin, time.perf_counter() - debut))
+            self._pile.pop()
+
+    def resume(self):
+        """Durée cumulée par étape, en millisecondes, dans l'ordre de première apparition."""
+        cumul = {}
+        for chemin, duree in self.mesures:
+            cumul[chemin] = cumul.get(chemin, 0.0) + duree * 1000
+        return cumul
+
+    def statistiques_cprofile(self, limite=25, tri="cumulative"):
+        """Rapport texte des fonctions les plus coûteuses, ou None sans cProfile."""
+        if self._cprofile is None:
+            return None
+        sortie = io.StringIO()
+        pstats.Stats(self._cprofile, stream=sortie).strip_dirs().sort_stats(tri).print_stats(limite)
+        return sortie.getvalue()
+
+    def ecrire_jsonl(self, chemin, **contexte):
+        """Ajoute l'exécution au journal JSON-lines `chemin` (une ligne par exécution)."""
+        ligne = {
+            "horodatage": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "total_ms": None if self.duree_totale_s is None else self.duree_totale_s * 1000,
+            "etapes": self.resume(),
+            **contexte,
+        }
+        with open(chemin, "a", encoding="utf-8") as fichier:
+            fichier.write(json.dumps(ligne, ensure_ascii=False, default=str) + "\n")
+
+
+def profileur_actif():
+    """Profileur du contexte courant, ou None."""
+    return _profileur_actif.get()
+
+
+def etape(nom):
+    """Chronomètre un bloc dans le profileur actif ; sans profileur, ne fait rien."""
+    profileur = _profileur_actif.get()
+    if profileur is None:
+        return nullcontext()
+    return profileur.etape(nom)
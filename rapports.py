@@ -0,0 +1,139 @@
+"""
+Génération en lot des rapports PDF / PNG du Gantt, un par bâtiment.
+
+    python rapports.py portefeuille.json --dossier rapports --formats pdf png --processus 4
+
+`portefeuille.json` contient une liste de projets (voir `gantt.generer_taches_projet`)
+ou un objet {"projets": [...]}, comme l'API. Chaque rapport reprend le Gantt de
+l'application (bandeaux des catégories, ligne €) suivi du glossaire complet.
+
+Le rendu statique utilise kaleido (`pip install kaleido==0.2.1`), qui embarque
+son propre navigateur et fonctionne hors ligne. Les projets sont répartis sur
+un pool de processus ; chaque processus garde son moteur de rendu démarré.
+"""
+
+import argparse
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from config import COULEURS_GLOSSAIRE, GLOSSAIRE_COMPLET
+from gantt import generer_figure_gantt, generer_taches_projet
+
+FORMATS_RAPPORT = ("pdf", "png", "svg")
+
+# Pictogrammes des noms de phases : rarement présents dans les polices des postes
+# qui impriment, ils sont retirés du rendu statique.
+_PICTOGRAMMES = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\u200d\u2640\u2642\ufe0f]")
+
+
+def _verifier_kaleido():
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        raise ImportError("Le rendu statique des rapports nécessite kaleido : pip install kaleido==0.2.1") from None
+
+
+def _initialiser_processus():
+    """Configure le moteur de rendu du processus : aucune ressource chargée depuis internet."""
+    _verifier_kaleido()
+    pio.kaleido.scope.mathjax = None
+
+
+def nom_fichier(nom):
+    """Nom de fichier sûr dérivé du nom d'un bâtiment."""
+    return re.sub(r"[^\w-]+", "_", nom, flags=re.UNICODE).strip("_") or "projet"
+
+
+def generer_figure_rapport(df, titre):
+    """
+    Construit la figure imprimable : le Gantt en haut de page, le glossaire complet dessous.
+    """
+    df = df.assign(Task=df["Task"].str.replace(_PICTOGRAMMES, "", regex=True).str.strip())
+    fig = generer_figure_gantt(df)
+
+    # Bandeaux et libellés des catégories ramenés à la hauteur de ceux de l'application
+    fig.update_shapes(y0=1.01, y1=1.035, selector=dict(type="rect", yref="paper"))
+    fig.update_annotations(y=1.045, selector=dict(yref="paper"))
+    fig.update_annotations(text="€", font=dict(size=22), selector=dict(text="💶"))
+
+    couleurs = [COULEURS_GLOSSAIRE.get(phase, "#ffffff") for phase in GLOSSAIRE_COMPLET]
+    fig.add_trace(go.Table(
+        domain=dict(x=[0, 1], y=[0, 0.36]),
+        columnwidth=[1, 5],
+        header=dict(values=["<b>Phase</b>", "<b>Définition</b>"], fill_color="#f2f2f2",
+                    align="left", font=dict(size=12)),
+        cells=dict(values=[list(GLOSSAIRE_COMPLET), list(GLOSSAIRE_COMPLET.values())],
+                   fill_color=[couleurs, couleurs], align="left", font=dict(size=10), height=24),
+    ))
+    fig.update_layout(
+        height=1500, width=1400,
+        margin=dict(t=140),
+        title=dict(text=f"{titre} — Diagramme de Gantt (unités : semaines)", y=0.985),
+        yaxis=dict(domain=[0.42, 1]),
+    )
+    return fig
+
+
+def generer_rapport(projet, dossier, formats=("pdf",)):
+    """Rend le rapport d'un projet dans `dossier` et retourne les chemins écrits."""
+    formats_inconnus = set(formats) - set(FORMATS_RAPPORT)
+    if formats_inconnus:
+        raise ValueError(f"Formats non pris en charge : {sorted(formats_inconnus)}")
+    _initialiser_processus()
+    nom = projet.get("nom") or "Projet"
+    fig = generer_figure_rapport(generer_taches_projet(projet), nom)
+    chemins = []
+    for format_ in formats:
+        chemin = Path(dossier) / f"{nom_fichier(nom)}.{format_}"
+        fig.write_image(chemin, format=format_)
+        chemins.append(chemin)
+    return chemins
+
+
+def generer_rapports(projets, dossier, formats=("pdf",), processus=None):
+    """
+    Génère les rapports de tous les projets en parallèle.
+
+    Retourne un dict {nom du projet: liste des chemins} ; une erreur sur un projet
+    est remontée après la fin des autres rendus, sous forme de RuntimeError.
+    """
+    noms = [projet.get("nom") or "Projet" for projet in projets]
+    if len({nom_fichier(nom) for nom in noms}) != len(noms):
+        raise ValueError("Les noms de projets doivent donner des noms de fichiers distincts")
+    _verifier_kaleido()
+    Path(dossier).mkdir(parents=True, exist_ok=True)
+
+    resultats, erreurs = {}, {}
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_processus) as pool:
+        futures = {pool.submit(generer_rapport, projet, dossier, formats): nom
+                   for projet, nom in zip(projets, noms)}
+        for future in as_completed(futures):
+            nom = futures[future]
+            try:
+                resultats[nom] = future.result()
+            except Exception as exc:
+                erreurs[nom] = exc
+    if erreurs:
+        details = "; ".join(f"{nom} : {exc}" for nom, exc in erreurs.items())
+        raise RuntimeError(f"Échec du rendu de {len(erreurs)} rapport(s) : {details}")
+    return {nom: resultats[nom] for nom in noms}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rapports PDF / PNG du Gantt pour chaque bâtiment d'un portefeuille")
+    parser.add_argument("portefeuille", help="Fichier JSON des projets")
+    parser.add_argument("--dossier", default="rapports")
+    parser.add_argument("--formats", nargs="+", default=["pdf"], choices=FORMATS_RAPPORT)
+    parser.add_argument("--processus", type=int, default=None, help="Taille du pool (défaut : nombre de CPU)")
+    args = parser.parse_args()
+
+    with open(args.portefeuille, encoding="utf-8") as fichier:
+        contenu = json.load(fichier)
+    projets = contenu["projets"] if isinstance(contenu, dict) else contenu
+    for nom, chemins in generer_rapports(projets, args.dossier, args.formats, args.processus).items():
+        print(f"{nom} : {', '.join(str(chemin) for chemin in chemins)}")
@@ -0,0 +1,163 @@
+"""
+Plannings de référence : instantanés Parquet d'un planning approuvé, écarts et barres fantômes.
+
+    ecrire_reference(df, "reference_2026-03.parquet", libelle="Délibération du 12 mars")
+    reference = lire_reference("reference_2026-03.parquet")
+    ecarts = comparer_plannings(reference, df)     # glissements en jours, écarts de durée
+    ajouter_barres_reference(fig, reference)       # planning approuvé derrière le planning actuel
+
+Un instantané ne garde que les colonnes nécessaires aux comparaisons ; les
+colonnes de texte (phases, types, catégories, projets) sont encodées par
+dictionnaire, chaque valeur n'étant stockée qu'une fois par fichier.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+VERSION_REFERENCE = 1
+CLE_METADONNEES = b"gantt_reference"
+COLONNES_REFERENCE = ["Projet", "Task", "Type", "Groupe", "Start", "Finish"]
+COLONNES_DICTIONNAIRE = ["Projet", "Task", "Type", "Groupe"]
+
+_UNE_SEMAINE = np.timedelta64(7, "D")
+_UN_JOUR = np.timedelta64(1, "D")
+
+
+def table_reference(taches, libelle=None, horodatage=None):
+    """Table Arrow de l'instantané de `taches`, avec ses métadonnées (libellé, horodatage)."""
+    colonnes = [colonne for colonne in COLONNES_REFERENCE if colonne in taches]
+    df = taches[colonnes].reset_index(drop=True)
+    tableau = pa.Table.from_pandas(df, preserve_index=False)
+    for colonne in COLONNES_DICTIONNAIRE:
+        if colonne in colonnes:
+            position = tableau.schema.get_field_index(colonne)
+            tableau = tableau.set_column(
+                position, colonne, tableau.column(colonne).cast(pa.string()).dictionary_encode()
+            )
+    for colonne in ("Start", "Finish"):
+        position = tableau.schema.get_field_index(colonne)
+        tableau = tableau.set_column(position, colonne, tableau.column(colonne).cast(pa.timestamp("ms")))
+    metadonnees = {
+        "version": VERSION_REFERENCE,
+        "libelle": libelle or "",
+        "horodatage": (horodatage or datetime.now(timezone.utc)).isoformat(timespec="seconds"),
+    }
+    return tableau.replace_schema_metadata({CLE_METADONNEES: json.dumps(metadonnees, ensure_ascii=False)})
+
+
+def ecrire_reference(taches, destination, libelle=None, horodatage=None):
+    """Écrit l'instantané de `taches` au format Parquet dans `destination` (chemin ou fichier binaire)."""
+    pq.write_table(
+        table_reference(taches, libelle, horodatage), destination,
+        use_dictionary=COLONNES_DICTIONNAIRE, compression="zstd",
+    )
+
+
+def lire_reference(source):
+    """
+    Relit un instantané (chemin ou fichier binaire) en DataFrame de tâches.
+
+    Les métadonnées sont dans `df.attrs["reference"]` ; un fichier qui n'est
+    pas un instantané lève une ValueError.
+    """
+    try:
+        tableau = pq.read_table(source)
+    except (pa.ArrowInvalid, OSError) as exc:
+        raise ValueError(f"Fichier Parquet illisible : {exc}") from None
+    brutes = (tableau.schema.metadata or {}).get(CLE_METADONNEES)
+    if brutes is None:
+        raise ValueError("Ce fichier n'est pas un planning de référence")
+    metadonnees = json.loads(brutes)
+    if metadonnees.get("version") != VERSION_REFERENCE:
+        raise ValueError(f"Version de planning de référence non prise en charge ({metadonnees.get('version')!r})")
+    df = tableau.to_pandas()
+    for colonne in COLONNES_DICTIONNAIRE:
+        if colonne in df:
+            df[colonne] = df[colonne].astype(object)
+    for colonne in ("Start", "Finish"):
+        df[colonne] = df[colonne].astype("datetime64[ns]")
+    df.attrs["reference"] = metadonnees
+    return df
+
+
+# --------------------
+# Écarts entre deux versions d'un planning
+def _avec_cles(taches):
+    """Tâches indexées par (projet,) tâche, type et rang de l'occurrence, pour l'appariement."""
+    cles = [colonne for colonne in ("Projet", "Task", "Type") if colonne in taches]
+    df = taches[cles + ["Groupe", "Start", "Finish"]].copy()
+    df["Occurrence"] = df.groupby(cles, sort=False).cumcount()
+    df["Rang"] = np.arange(len(df))
+    return df, cles + ["Occurrence"]
+
+
+def comparer_plannings(reference, actuel):
+    """
+    Écarts tâche par tâche entre un planning de référence et le planning actuel.
+
+    Les tâches sont appariées par projet (s'il y a lieu), nom et type. Retourne
+    un DataFrame dans l'ordre du planning actuel (tâches supprimées en fin),
+    avec les dates des deux versions, les glissements de début et de fin en
+    jours, les durées et leur écart en semaines, et un `Statut` : "inchangée",
+    "décalée", "durée modifiée", "ajoutée" ou "supprimée".
+    """
+    reference, cles = _avec_cles(reference)
+    actuel, _ = _avec_cles(actuel)
+    ecarts = (
+        actuel.merge(reference, on=cles, how="outer", suffixes=("", " référence"), indicator=True)
+        .sort_values(["Rang", "Rang référence"], kind="stable", ignore_index=True)
+    )
+    ecarts["Groupe"] = ecarts["Groupe"].fillna(ecarts.pop("Groupe référence"))
+
+    debut, fin = ecarts["Start"].to_numpy("datetime64[ns]"), ecarts["Finish"].to_numpy("datetime64[ns]")
+    debut_ref = ecarts["Start référence"].to_numpy("datetime64[ns]")
+    fin_ref = ecarts["Finish référence"].to_numpy("datetime64[ns]")
+    ecarts["Glissement début (j)"] = (debut - debut_ref) / _UN_JOUR
+    ecarts["Glissement fin (j)"] = (fin - fin_ref) / _UN_JOUR
+    ecarts["Durée (sem.)"] = (fin - debut) / _UNE_SEMAINE
+    ecarts["Durée référence (sem.)"] = (fin_ref - debut_ref) / _UNE_SEMAINE
+    ecarts["Écart durée (sem.)"] = ecarts["Durée (sem.)"] - ecarts["Durée référence (sem.)"]
+
+    presence = ecarts.pop("_merge").to_numpy()
+    ecarts["Statut"] = np.select(
+        [
+            presence == "left_only",
+            presence == "right_only",
+            ecarts["Écart durée (sem.)"].to_numpy() != 0,
+            ecarts["Glissement début (j)"].to_numpy() != 0,
+        ],
+        ["ajoutée", "supprimée", "durée modifiée", "décalée"],
+        default="inchangée",
+    )
+    return ecarts.drop(columns=["Occurrence", "Rang", "Rang référence"])
+
+
+def ajouter_barres_reference(fig, reference, libelle="Référence"):
+    """
+    Ajoute derrière les barres d'un Gantt (`y` = nom de la tâche) les barres du planning de référence.
+
+    Les barres fantômes, grises et semi-transparentes, débordent des barres
+    actuelles : un glissement se lit comme un décalage entre les deux.
+    """
+    reference = reference[reference["Finish"] > reference["Start"]]
+    debuts, fins = pd.to_datetime(reference["Start"]), pd.to_datetime(reference["Finish"])
+    # Ordre des lignes du planning actuel, les tâches supprimées depuis la référence en dessous
+    lignes = list(dict.fromkeys([y for trace in fig.data for y in trace.y] + reference["Task"].tolist()))
+    fig.add_trace(go.Bar(
+        base=debuts, x=(fins - debuts) / pd.Timedelta(milliseconds=1), y=reference["Task"], orientation="h",
+        name=libelle, width=0.95,
+        marker=dict(color="rgba(128,128,128,0.30)", line=dict(color="dimgray", width=1)),
+        customdata=np.column_stack([debuts.dt.strftime("%d/%m/%Y"), fins.dt.strftime("%d/%m/%Y")]),
+        hovertemplate=f"%{{y}}<br>{libelle} : %{{customdata[0]}} → %{{customdata[1]}}<extra></extra>",
+    ))
+    # Première trace dessinée : les barres actuelles passent devant
+    fig.data = (fig.data[-1],) + fig.data[:-1]
+    fig.update_layout(barmode="overlay")
+    fig.update_yaxes(categoryorder="array", categoryarray=lignes)
+    return fig
@@ -0,0 +1,58 @@
+"""
+Mesure des octets envoyés au navigateur par modification d'une durée, avec et sans mise à jour différentielle.
+
+    python scripts/bench_differentiel.py --modifications 50
+
+Chaque modification change la durée d'une phase tirée au hasard. « Complet »
+est la figure entière envoyée par `st.plotly_chart` ; « différentiel » le
+message de `differentiel.message_figure` (opérations depuis la figure
+précédente). Les tailles sont celles du JSON, avant compression.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import ETAT_AUDIT_NON_EFFECTUE  # noqa: E402
+from differentiel import message_figure  # noqa: E402
+from gantt import gabarit_gantt, generer_figure_gantt, generer_phases, generer_taches  # noqa: E402
+
+
+def resume(nom, tailles):
+    print(f"{nom:<14} médiane {statistics.median(tailles):8.0f} o  moyenne {statistics.mean(tailles):8.0f} o  "
+          f"max {max(tailles):8.0f} o")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Octets envoyés par modification d'une durée")
+    parser.add_argument("--modifications", type=int, default=50)
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    hasard = random.Random(args.graine)
+    gabarit = gabarit_gantt()
+    phases = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+    modifiables = [phase for phase in phases if phase["modifiable"]]
+
+    def figure():
+        return generer_figure_gantt(generer_taches(phases, "2026-01-05"), gabarit).to_json()
+
+    _, envoi = message_figure(json.loads(figure()), None, None)
+    complets, differentiels = [], []
+    for _ in range(args.modifications):
+        phase = hasard.choice(modifiables)
+        phase["duree"] = max(phase["duree_min"], phase["duree"] + hasard.choice([-2, -1, 1, 2]))
+        spec = figure()
+        message, envoi = message_figure(json.loads(spec), envoi, None)
+        complets.append(len(spec))
+        differentiels.append(len(json.dumps(message)))
+
+    print(f"{args.modifications} modifications d'une durée ({len(phases)} phases)")
+    resume("complet", complets)
+    resume("différentiel", differentiels)
+    print(f"Réduction médiane : {statistics.median(complets) / statistics.median(differentiels):.1f}×")
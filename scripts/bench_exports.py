@@ -0,0 +1,61 @@
+"""
+Mesure des exports (iCalendar, XLSX, MS Project XML) sur un portefeuille volumineux.
+
+    python scripts/bench_exports.py --lignes 100000
+
+Affiche pour chaque format la durée, le débit et le pic de mémoire Python
+alloué pendant l'écriture (hors portefeuille déjà chargé). Le pic est mesuré
+lors d'un second passage, tracemalloc ralentissant fortement l'écriture.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import ETATS  # noqa: E402
+from exports import ecrire_ics, ecrire_mspdi, ecrire_xlsx  # noqa: E402
+from gantt import generer_portefeuille  # noqa: E402
+
+
+def portefeuille_synthetique(nb_lignes):
+    """Portefeuille d'au moins `nb_lignes` tâches, par répétition de projets types."""
+    modeles = generer_portefeuille(
+        [{"nom": f"Type {i}", "etat": etat, "start_date": "2026-01-05"} for i, etat in enumerate(ETATS)]
+    )
+    repetitions = -(-nb_lignes // len(modeles))
+    df = pd.concat([modeles] * repetitions, ignore_index=True)
+    df["Projet"] = df["Projet"] + " #" + (df.index // len(modeles)).astype(str)
+    return df.head(nb_lignes)
+
+
+def mesurer(nom, ecrire, df, chemin):
+    debut = time.perf_counter()
+    ecrire(df, chemin)
+    duree = time.perf_counter() - debut
+    tracemalloc.start()
+    ecrire(df, chemin)
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    taille = Path(chemin).stat().st_size
+    print(f"{nom:<8} {duree:7.2f} s  {len(df) / duree:9.0f} lignes/s  "
+          f"pic mémoire {pic / 1e6:6.1f} Mo  fichier {taille / 1e6:6.1f} Mo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure des exports sur un portefeuille volumineux")
+    parser.add_argument("--lignes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = portefeuille_synthetique(args.lignes)
+    print(f"Portefeuille : {len(df)} tâches, {df['Projet'].nunique()} projets")
+    with tempfile.TemporaryDirectory() as dossier:
+        mesurer("ics", ecrire_ics, df, Path(dossier) / "planning.ics")
+        mesurer("xlsx", ecrire_xlsx, df, Path(dossier) / "planning.xlsx")
+        mesurer("mspdi", ecrire_mspdi, df, Path(dossier) / "planning.xml")
@@ -0,0 +1,107 @@
+"""
+Test de charge de l'API planning (`api.py`) : latences p50 / p99 et débit.
+
+    python scripts/charge_api.py --requetes 2000 --concurrence 50
+    python scripts/charge_api.py --url http://127.0.0.1:8765 --chemin /portfolio
+
+Sans `--url`, un serveur est démarré dans le même processus sur un port libre.
+Chaque client garde sa connexion ouverte (keep-alive) et enchaîne ses requêtes.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import ServeurPlanning  # noqa: E402
+from config import ETATS  # noqa: E402
+
+
+def _corps(chemin, index, taille_portefeuille):
+    projet = {"nom": f"Bâtiment {index}", "etat": ETATS[index % len(ETATS)], "start_date": "2026-01-05"}
+    if chemin == "/portfolio":
+        return {"projets": [dict(projet, nom=f"Bâtiment {index}-{i}") for i in range(taille_portefeuille)]}
+    return projet
+
+
+async def _client(host, port, chemin, requetes, latences, taille_portefeuille):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for index in requetes:
+            donnees = json.dumps(_corps(chemin, index, taille_portefeuille)).encode("utf-8")
+            debut = time.perf_counter()
+            writer.write(
+                f"POST {chemin} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(donnees)}\r\n\r\n".encode("latin-1") + donnees
+            )
+            await writer.drain()
+            statut = await reader.readline()
+            longueur = 0
+            while (entete := await reader.readline()) not in (b"\r\n", b""):
+                if entete.lower().startswith(b"content-length:"):
+                    longueur = int(entete.split(b":", 1)[1])
+            await reader.readexactly(longueur)
+            latences.append(time.perf_counter() - debut)
+            if b" 200 " not in statut:
+                raise RuntimeError(f"Réponse inattendue : {statut!r}")
+    finally:
+        writer.close()
+
+
+def percentile(valeurs, p):
+    """Percentile `p` (0-100) par la méthode du rang le plus proche."""
+    ordonnees = sorted(valeurs)
+    rang = max(0, min(len(ordonnees) - 1, round(p / 100 * len(ordonnees)) - 1))
+    return ordonnees[rang]
+
+
+async def charger(host, port, chemin="/schedule", requetes=1000, concurrence=20, taille_portefeuille=10):
+    """Lance la charge et retourne un dict de statistiques (latences en millisecondes)."""
+    latences = []
+    repartition = [range(i, requetes, concurrence) for i in range(concurrence)]
+    debut = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, chemin, part, latences, taille_portefeuille)
+                           for part in repartition if len(part)))
+    duree = time.perf_counter() - debut
+    return {
+        "requetes": len(latences),
+        "duree_s": duree,
+        "debit_rps": len(latences) / duree,
+        "p50_ms": percentile(latences, 50) * 1000,
+        "p99_ms": percentile(latences, 99) * 1000,
+        "max_ms": max(latences) * 1000,
+    }
+
+
+async def _main(args):
+    serveur = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        serveur = await ServeurPlanning("127.0.0.1", 0).demarrer()
+        host, port = serveur.host, serveur.port
+    try:
+        stats = await charger(host, port, args.chemin, args.requetes, args.concurrence, args.taille_portefeuille)
+    finally:
+        if serveur is not None:
+            await serveur.arreter()
+    print(f"{stats['requetes']} requêtes {args.chemin} en {stats['duree_s']:.2f} s "
+          f"({stats['debit_rps']:.0f} req/s, concurrence {args.concurrence})")
+    print(f"p50 = {stats['p50_ms']:.1f} ms   p99 = {stats['p99_ms']:.1f} ms   max = {stats['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge de l'API planning")
+    parser.add_argument("--url", help="URL d'un serveur déjà lancé (sinon serveur local embarqué)")
+    parser.add_argument("--chemin", default="/schedule", choices=["/schedule", "/portfolio"])
+    parser.add_argument("--requetes", type=int, default=1000)
+    parser.add_argument("--concurrence", type=int, default=20)
+    parser.add_argument("--taille-portefeuille", type=int, default=10,
+                        help="Nombre de projets par requête /portfolio")
+    asyncio.run(_main(parser.parse_args()))
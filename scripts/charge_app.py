@@ -0,0 +1,169 @@
+"""
+Test de charge de l'application Streamlit (`outil_gantt_projet.py`) avec AppTest.
+
+    python scripts/charge_app.py --sessions 40 --concurrence 8
+    python scripts/charge_app.py --sessions 16 --concurrence 4 --mode processus
+
+Chaque session simule un utilisateur : ouverture de la page, choix d'un état,
+clic sur « Générer le diagramme de Gantt », puis quelques modifications de
+durées validées par « Appliquer les durées ». Chaque exécution du script
+(rerun) est chronométrée ; le rapport donne les percentiles de latence par
+action et le pic de mémoire par session.
+
+- `--mode threads` (défaut) : les sessions partagent un processus et ses
+  caches, comme les sessions d'une réplique Streamlit ; la mémoire par session
+  est estimée par la hausse du pic du processus divisée par la concurrence.
+  AppTest installe pour chaque exécution un runtime global au processus : les
+  exécutions sont donc sérialisées par un verrou, ce qui correspond à une
+  réplique dont le script, limité par le calcul, est sérialisé par le GIL.
+  La latence mesurée inclut l'attente du verrou.
+- `--mode processus` : chaque session tourne dans un interpréteur neuf, ce qui
+  mesure son propre pic de mémoire (hors imports), sans cache partagé.
+
+AppTest n'exécute pas les fragments isolément : chaque clic relance tout le
+script, les latences mesurées sont donc un majorant de celles d'un navigateur.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from charge_api import percentile  # noqa: E402
+from config import ETATS  # noqa: E402
+
+APPLICATION = Path(__file__).resolve().parent.parent / "outil_gantt_projet.py"
+PREFIXES_DUREES = ("audit_", "amo_", "recrut_", "mop_")
+ACTIONS = ("ouverture", "etat", "generer", "durees")
+
+# Une seule exécution AppTest à la fois par processus (runtime global)
+_verrou_execution = threading.Lock()
+
+
+def _memoire_max_octets():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Ko sous Linux
+
+
+def _prechauffer():
+    """Ouvre une fois la page d'accueil : imports de l'application hors des mesures."""
+    AppTest.from_file(str(APPLICATION), default_timeout=60).run()
+
+
+def session(numero, modifications=3, delai_max=60):
+    """
+    Déroule une session utilisateur et retourne ses mesures.
+
+    Retourne un dict : `latences` (liste de (action, secondes)) et `memoire_octets`
+    (hausse du pic de mémoire du processus pendant la session).
+    """
+    hasard = random.Random(numero)
+    memoire_initiale = _memoire_max_octets()
+    at = AppTest.from_file(str(APPLICATION), default_timeout=delai_max)
+    latences = []
+
+    def executer(action, rerun):
+        debut = time.perf_counter()
+        with _verrou_execution:
+            rerun()
+        latences.append((action, time.perf_counter() - debut))
+        if at.exception:
+            raise RuntimeError(f"Session {numero}, {action} : {at.exception[0].message}")
+
+    executer("ouverture", at.run)
+    executer("etat", lambda: at.selectbox[0].select(ETATS[numero % len(ETATS)]).run())
+    executer("generer", lambda: next(b for b in at.button if b.label == "Générer le diagramme de Gantt").click().run())
+    for _ in range(modifications):
+        champ = hasard.choice([champ for champ in at.number_input if champ.key.startswith(PREFIXES_DUREES)])
+        champ.set_value(champ.value + hasard.randint(1, 4))
+        valider = next(b for b in at.button if b.label == "✔️ Appliquer les durées" and b.proto.form_id == champ.proto.form_id)
+        executer("durees", lambda: valider.click().run())
+    return {"latences": latences, "memoire_octets": _memoire_max_octets() - memoire_initiale}
+
+
+def charger(sessions=20, concurrence=4, mode="threads", modifications=3):
+    """
+    Lance `sessions` sessions, `concurrence` à la fois, et retourne un dict de statistiques.
+
+    `executions_serialisees` est vrai en mode threads : les latences y incluent
+    l'attente du verrou d'exécution et croissent avec la concurrence.
+    """
+    if mode == "threads":
+        _prechauffer()
+    memoire_initiale = _memoire_max_octets()
+    debut = time.perf_counter()
+    if mode == "threads":
+        with ThreadPoolExecutor(concurrence) as executeur:
+            resultats = list(executeur.map(session, range(sessions), [modifications] * sessions))
+    else:
+        # Un interpréteur neuf par session : son pic de mémoire ne mesure qu'elle.
+        # AppTest exécute l'application comme module __main__ : les fonctions
+        # envoyées aux processus sont désignées par ce module-ci, pas par __main__.
+        import charge_app
+
+        contexte = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(concurrence, mp_context=contexte, initializer=charge_app._prechauffer,
+                                 max_tasks_per_child=1) as executeur:
+            resultats = list(executeur.map(charge_app.session, range(sessions), [modifications] * sessions))
+    duree = time.perf_counter() - debut
+
+    latences = [mesure for resultat in resultats for mesure in resultat["latences"]]
+    par_action = {}
+    for action in ACTIONS:
+        valeurs = [duree_s for nom, duree_s in latences if nom == action]
+        if valeurs:
+            par_action[action] = {p: percentile(valeurs, p) * 1000 for p in (50, 95, 99)} | {"n": len(valeurs)}
+    if mode == "threads":
+        memoire_session = (_memoire_max_octets() - memoire_initiale) / concurrence
+    else:
+        memoire_session = max(resultat["memoire_octets"] for resultat in resultats)
+    toutes = [duree_s for _, duree_s in latences]
+    return {
+        "sessions": sessions,
+        "mode": mode,
+        "executions_serialisees": mode == "threads",
+        "reruns": len(latences),
+        "duree_s": duree,
+        "debit_reruns_s": len(latences) / duree,
+        "p50_ms": percentile(toutes, 50) * 1000,
+        "p95_ms": percentile(toutes, 95) * 1000,
+        "p99_ms": percentile(toutes, 99) * 1000,
+        "par_action": par_action,
+        "memoire_session_mo": memoire_session / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge de l'application Streamlit (AppTest)")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrence", type=int, default=4)
+    parser.add_argument("--mode", default="threads", choices=["threads", "processus"])
+    parser.add_argument("--modifications", type=int, default=3, help="Durées modifiées par session")
+    args = parser.parse_args()
+
+    stats = charger(args.sessions, args.concurrence, args.mode, args.modifications)
+    print(f"{stats['sessions']} sessions ({args.mode}, concurrence {args.concurrence}) : "
+          f"{stats['reruns']} reruns en {stats['duree_s']:.1f} s ({stats['debit_reruns_s']:.1f} reruns/s)")
+    if stats["executions_serialisees"]:
+        print("⚠️ mode threads : une exécution à la fois (verrou AppTest), les latences incluent "
+              "l'attente des autres sessions ; --mode processus pour la latence d'une session seule")
+    print(f"{'action':<10} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for action, valeurs in stats["par_action"].items():
+        print(f"{action:<10} {valeurs['n']:>5} {valeurs[50]:9.1f} {valeurs[95]:9.1f} {valeurs[99]:9.1f}")
+    print(f"{'total':<10} {stats['reruns']:>5} {stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f}")
+    estimation = "estimé" if args.mode == "threads" else "max"
+    print(f"pic de mémoire par session ({estimation}) : {stats['memoire_session_mo']:.1f} Mo")
@@ -0,0 +1,134 @@
+"""
+Analyse de sensibilité de la date de fin aux durées des phases (diagramme en tornade).
+
+    sensibilite = analyse_sensibilite(phases, "2026-01-05", variation=0.2, reels=reels)
+    fig = figure_tornado(sensibilite)
+
+Chaque durée de phase et chaque délai de validation du maître d'ouvrage est
+diminué puis augmenté de `variation` (la durée restant au-dessus du minimum
+de la phase). Tous ces scénarios forment une seule matrice (un scénario par
+ligne, une phase par colonne) dont les dates de fin sont calculées ensemble
+par sommes cumulées, en tenant compte des dates réelles déjà connues (voir
+`avancement`) : une phase terminée ne déplace plus la fin du projet.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+_UNE_SEMAINE = np.timedelta64(7 * 24 * 3600 * 10**9, "ns")
+_UN_JOUR = np.timedelta64(1, "D")
+
+COULEURS_TORNADO = {"baisse": "#2e7d32", "hausse": "#c62828"}
+
+
+def _phases_gantt(phases):
+    return [phase for phase in phases if phase.get("gantt", True)]
+
+
+def evaluer_scenarios(phases, start_date, durees, delais, include_financement=True,
+                      recherche_financement_weeks=6, reels=None):
+    """
+    Dates de fin du projet (datetime64[ns], une par scénario) pour des matrices
+    de durées et de délais MO en semaines (scénarios × phases affichées sur le Gantt).
+
+    `reels` (voir `avancement.dates_reelles`) : la fin part de la dernière phase
+    aux dates réelles connues, comme dans `avancement.reprevoir`.
+    """
+    durees, delais = np.atleast_2d(np.asarray(durees, float)), np.atleast_2d(np.asarray(delais, float))
+    debut = np.datetime64(pd.Timestamp(start_date), "ns")
+    if include_financement:
+        debut = debut + recherche_financement_weeks * _UNE_SEMAINE
+    etapes = durees + delais
+    # Fin du planning théorique : somme de toutes les durées et de tous les délais
+    fins = debut + (etapes.sum(axis=1) * _UNE_SEMAINE).astype("timedelta64[ns]")
+
+    if reels is None or reels.empty:
+        return fins
+    noms = [phase["nom"] for phase in _phases_gantt(phases)]
+    dates = reels.drop_duplicates("Task", keep="last").set_index("Task")
+    connues = [i for i, nom in enumerate(noms) if nom in dates.index]
+    if not connues:
+        return fins
+    j = connues[-1]
+    debut_reel, fin_reelle = dates.loc[noms[j], "Début réel"], dates.loc[noms[j], "Fin réel"]
+    if pd.notna(fin_reelle):
+        fin_j = np.full(len(durees), np.datetime64(pd.Timestamp(fin_reelle), "ns"))
+    else:
+        fin_j = np.datetime64(pd.Timestamp(debut_reel), "ns") + (durees[:, j] * _UNE_SEMAINE).astype("timedelta64[ns]")
+    restant = delais[:, j] + etapes[:, j + 1:].sum(axis=1)
+    return fin_j + (restant * _UNE_SEMAINE).astype("timedelta64[ns]")
+
+
+def analyse_sensibilite(phases, start_date, variation=0.2, include_financement=True,
+                        recherche_financement_weeks=6, reels=None):
+    """
+    Effet sur la date de fin d'une baisse et d'une hausse de `variation` (fraction)
+    de chaque durée de phase et de chaque délai MO non nul.
+
+    Retourne un DataFrame trié par amplitude décroissante : `Phase`, `Paramètre`
+    ("Durée" ou "Délai MO"), valeurs `Actuelle`, `Basse` et `Haute` (semaines),
+    dates `Fin basse` / `Fin haute`, écarts `Écart bas (j)` / `Écart haut (j)`
+    par rapport à la fin actuelle et `Amplitude (j)`. La fin actuelle (ISO 8601)
+    est dans `attrs["fin"]`.
+    """
+    if not 0 < variation < 1:
+        raise ValueError("La variation doit être comprise entre 0 et 1 (exclus)")
+    gantt = _phases_gantt(phases)
+    durees = np.array([phase["duree"] for phase in gantt], float)
+    delais = np.array([phase.get("delai_mo", 0) for phase in gantt], float)
+    minimums = np.array([phase.get("duree_min", 0) for phase in gantt], float)
+
+    # Paramètres perturbés : (phase, colonne de la matrice, valeur basse, valeur haute)
+    parametres = [("Durée", i, max(minimums[i], durees[i] * (1 - variation)), durees[i] * (1 + variation))
+                  for i in range(len(gantt))]
+    parametres += [("Délai MO", i, delais[i] * (1 - variation), delais[i] * (1 + variation))
+                   for i in range(len(gantt)) if delais[i] > 0]
+
+    # Matrice des scénarios : la ligne 0 est le plan actuel, puis une baisse et une hausse par paramètre
+    n = 1 + 2 * len(parametres)
+    matrice_durees, matrice_delais = np.tile(durees, (n, 1)), np.tile(delais, (n, 1))
+    for k, (nature, i, basse, haute) in enumerate(parametres):
+        matrice = matrice_durees if nature == "Durée" else matrice_delais
+        matrice[1 + 2 * k, i], matrice[2 + 2 * k, i] = basse, haute
+    fins = evaluer_scenarios(phases, start_date, matrice_durees, matrice_delais,
+                             include_financement, recherche_financement_weeks, reels)
+
+    ecarts = (fins - fins[0]) / _UN_JOUR
+    sensibilite = pd.DataFrame({
+        "Phase": [gantt[i]["nom"] for _, i, _, _ in parametres],
+        "Paramètre": [nature for nature, _, _, _ in parametres],
+        "Actuelle": [(durees if nature == "Durée" else delais)[i] for nature, i, _, _ in parametres],
+        "Basse": [basse for _, _, basse, _ in parametres],
+        "Haute": [haute for _, _, _, haute in parametres],
+        "Fin basse": fins[1::2],
+        "Fin haute": fins[2::2],
+        "Écart bas (j)": ecarts[1::2],
+        "Écart haut (j)": ecarts[2::2],
+    })
+    sensibilite["Amplitude (j)"] = sensibilite["Écart haut (j)"] - sensibilite["Écart bas (j)"]
+    sensibilite.attrs["fin"] = pd.Timestamp(fins[0]).isoformat()  # fin du plan actuel
+    return sensibilite.sort_values("Amplitude (j)", ascending=False, kind="stable", ignore_index=True)
+
+
+def figure_tornado(sensibilite, nombre=15):
+    """Diagramme en tornade des `nombre` paramètres les plus influents (les plus influents en haut)."""
+    retenus = sensibilite.head(nombre).iloc[::-1]
+    libelles = retenus["Phase"] + " — " + retenus["Paramètre"]
+    fig = go.Figure()
+    for sens, colonne, valeurs in (("baisse", "Écart bas (j)", "Basse"), ("hausse", "Écart haut (j)", "Haute")):
+        fig.add_trace(go.Bar(
+            y=libelles, x=retenus[colonne], orientation="h", name=f"Paramètre en {sens}",
+            marker=dict(color=COULEURS_TORNADO[sens]),
+            customdata=np.column_stack([retenus[valeurs].round(1), retenus["Actuelle"].round(1)]),
+            hovertemplate="%{y}<br>%{customdata[1]} → %{customdata[0]} semaines : %{x:+.0f} j<extra></extra>",
+        ))
+    fin = sensibilite.attrs.get("fin")
+    fig.update_layout(
+        barmode="overlay", template="plotly_white", height=max(300, 32 * len(retenus) + 150),
+        title_text="🌪️ Sensibilité de la date de fin" + (f" ({pd.Timestamp(fin):%d/%m/%Y})" if fin else ""),
+        xaxis_title="Écart sur la date de fin (jours)", yaxis=dict(automargin=True),
+        legend=dict(orientation="h", y=-0.15),
+    )
+    fig.add_vline(x=0, line_width=1, line_color="black")
+    return fig
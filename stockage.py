@@ -0,0 +1,101 @@
+"""
+Stockage des plannings calculés en fichiers Arrow IPC (Feather v2), relus en projection mémoire.
+
+    python stockage.py portefeuille.json portefeuille.arrow
+
+    taches = lire_planning("portefeuille.arrow", colonnes=["Projet", "Task", "Start", "Finish"])
+
+Les fichiers sont écrits sans compression : relus avec une projection en
+mémoire (mmap), les colonnes pointent directement dans les pages du fichier,
+que le cache du système partage entre tous les processus d'un même hôte
+(répliques Streamlit). Seules les pages des colonnes lues sont chargées. Les
+textes (projets, phases, types...) sont encodés par dictionnaire.
+
+Un fichier est remplacé atomiquement : les processus qui lisent l'ancienne
+version la gardent intacte jusqu'à leur prochaine ouverture.
+"""
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+def table_planning(taches):
+    """Table Arrow des tâches, colonnes de texte encodées par dictionnaire, sans index pandas."""
+    colonnes = {}
+    for nom, colonne in taches.items():
+        if colonne.dtype == object or isinstance(colonne.dtype, pd.CategoricalDtype):
+            colonnes[nom] = pa.array(colonne.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+        else:
+            colonnes[nom] = pa.Array.from_pandas(colonne)
+    return pa.table(colonnes)
+
+
+def ecrire_planning(taches, chemin):
+    """Écrit les tâches (DataFrame ou table Arrow) dans le fichier Arrow IPC `chemin`, par remplacement atomique."""
+    tableau = taches if isinstance(taches, pa.Table) else table_planning(taches)
+    temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(tableau, temporaire, compression="uncompressed")
+    os.replace(temporaire, chemin)
+
+
+def ouvrir_planning(chemin, colonnes=None):
+    """
+    Table Arrow d'un planning, en projection mémoire et sans copie.
+
+    `colonnes` restreint la lecture à ces colonnes (toutes si None) ; une
+    colonne absente ou un fichier illisible lève une ValueError.
+    """
+    try:
+        tableau = feather.read_table(chemin, memory_map=True)
+    except (pa.ArrowInvalid, OSError) as exc:
+        raise ValueError(f"Planning Arrow illisible : {exc}") from None
+    if colonnes is None:
+        return tableau
+    absentes = [colonne for colonne in colonnes if colonne not in tableau.column_names]
+    if absentes:
+        raise ValueError(f"{chemin} : colonnes absentes {absentes}")
+    return tableau.select(colonnes)
+
+
+def _type_pandas(type_arrow):
+    # Dictionnaires en Categorical (seuls les codes sont copiés), le reste adossé aux tampons Arrow
+    return None if pa.types.is_dictionary(type_arrow) else pd.ArrowDtype(type_arrow)
+
+
+def lire_planning(chemin, colonnes=None):
+    """
+    DataFrame des tâches d'un planning Arrow, voir `ouvrir_planning`.
+
+    Les dates et les nombres restent dans les pages du fichier (types
+    `ArrowDtype`) ; les textes deviennent des Categorical.
+    """
+    return ouvrir_planning(chemin, colonnes).to_pandas(types_mapper=_type_pandas)
+
+
+def chemin_portefeuille():
+    """Planning Arrow du portefeuille servi par la vue Portefeuille (`GANTT_PORTEFEUILLE_ARROW`), ou None."""
+    chemin = os.environ.get("GANTT_PORTEFEUILLE_ARROW")
+    return Path(chemin) if chemin else None
+
+
+if __name__ == "__main__":
+    from gantt import generer_portefeuille
+
+    parser = argparse.ArgumentParser(description="Calcule les plannings d'un portefeuille et les stocke au format Arrow IPC")
+    parser.add_argument("portefeuille", help="Fichier JSON des projets")
+    parser.add_argument("sortie", help="Fichier Arrow à écrire (.arrow)")
+    args = parser.parse_args()
+
+    with open(args.portefeuille, encoding="utf-8") as fichier:
+        contenu = json.load(fichier)
+    projets = contenu["projets"] if isinstance(contenu, dict) else contenu
+    taches = generer_portefeuille(projets)
+    ecrire_planning(taches, args.sortie)
+    print(f"{len(projets)} projets, {len(taches)} tâches : {args.sortie} ({os.path.getsize(args.sortie) / 1e6:.1f} Mo)")
@@ -0,0 +1,195 @@
+"""
+Tests pour l'API HTTP de calcul des plannings.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from api import Batcheur, ServeurPlanning, calculer_lot, calculer_projet
+from config import ETAT_AUDIT_NON_EFFECTUE, ETAT_EQUIPE_SELECTIONNEE
+
+
+async def _poster(port, chemin, corps):
+    """Envoie une requête POST et retourne (code HTTP, réponse JSON)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    donnees = json.dumps(corps).encode("utf-8")
+    writer.write(
+        f"POST {chemin} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(donnees)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + donnees
+    )
+    await writer.drain()
+    reponse = await reader.read()
+    writer.close()
+    entetes, _, corps_reponse = reponse.partition(b"\r\n\r\n")
+    return int(entetes.split(b" ")[1]), json.loads(corps_reponse)
+
+
+def _avec_serveur(scenario):
+    async def executer():
+        serveur = await ServeurPlanning("127.0.0.1", 0).demarrer()
+        try:
+            return await scenario(serveur.port)
+        finally:
+            await serveur.arreter()
+    return asyncio.run(executer())
+
+
+class TestCalcul:
+    """Tests pour le calcul des projets hors serveur."""
+
+    def test_calculer_projet(self):
+        """Test que les tâches sont sérialisées avec des dates ISO."""
+        resultat = calculer_projet({"nom": "École", "etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05"})
+
+        assert resultat["nom"] == "École"
+        assert resultat["taches"][0]["Start"] == "2026-01-05"
+        assert resultat["fin"] == resultat["taches"][-1]["Finish"]
+        json.dumps(resultat)
+
+    def test_calculer_projet_durees_personnalisees(self):
+        """Test que les durées personnalisées décalent la fin du projet."""
+        base = {"etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05", "include_financement": False}
+        defaut = calculer_projet(base)
+        allonge = calculer_projet(dict(base, durees={"🚧 DET - Direction Exécution Travaux": 10}))
+
+        assert allonge["fin"] > defaut["fin"]
+
+    def test_calculer_projet_dates_reelles(self):
+        """Test que les dates réelles reprévoient la fin et sont sérialisées (null si inconnues)."""
+        base = {"etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05", "include_financement": False}
+        reel = {"📝 DIAG - Diagnostic & Études d’Esquisse": {"debut": "2026-01-05", "fin": "2026-03-30"}}
+        defaut = calculer_projet(base)
+        reprevu = calculer_projet(dict(base, reel=reel))
+
+        assert reprevu["fin"] > defaut["fin"]
+        assert reprevu["taches"][0]["Fin réel"] == "2026-03-30"
+        assert reprevu["taches"][-1]["Début réel"] is None
+        assert reprevu["taches"][-1]["Finish prévu"] == defaut["fin"]
+        json.dumps(reprevu)
+
+    def test_calculer_lot_isole_les_erreurs(self):
+        """Test qu'un projet invalide n'empêche pas le calcul des autres."""
+        resultats = calculer_lot([
+            {"etat": "État inconnu", "start_date": "2026-01-05"},
+            {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+        ])
+
+        assert isinstance(resultats[0], ValueError)
+        assert resultats[1]["taches"]
+
+    @pytest.mark.parametrize("projet", [
+        {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05", "durees": [["x", 1]]},
+        {"etat": ["x"], "start_date": "2026-01-05"},
+        {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": None},
+        {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05", "recherche_financement_weeks": 1e12},
+    ])
+    def test_calculer_lot_isole_les_erreurs_de_type(self, projet):
+        """Test qu'un projet aux champs mal typés lève une erreur propre à lui, sans faire échouer le lot."""
+        resultats = calculer_lot([projet, {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"}])
+
+        assert isinstance(resultats[0], Exception)
+        assert resultats[1]["taches"]
+
+    def test_calculer_lot_isole_les_erreurs_inattendues(self, monkeypatch):
+        """Test qu'une erreur imprévue sur un projet est retournée pour lui seul."""
+        import api
+        original = api.calculer_projet
+
+        def calculer(projet):
+            if projet.get("nom") == "défaillant":
+                raise AttributeError("erreur imprévue")
+            return original(projet)
+
+        monkeypatch.setattr(api, "calculer_projet", calculer)
+        resultats = calculer_lot([
+            {"nom": "défaillant", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+            {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+        ])
+
+        assert isinstance(resultats[0], AttributeError)
+        assert resultats[1]["taches"]
+
+
+class TestBatcheur:
+    """Tests pour le regroupement des calculs en lots."""
+
+    def test_lot_regroupe_les_soumissions(self, monkeypatch):
+        """Test que des soumissions simultanées sont calculées en un seul lot."""
+        appels = []
+
+        async def scenario():
+            batcheur = Batcheur(taille_max=10, delai_max=0.05)
+            batcheur.demarrer()
+            projets = [{"etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05", "nom": str(i)} for i in range(5)]
+            resultats = await asyncio.gather(*(batcheur.soumettre(p) for p in projets))
+            await batcheur.arreter()
+            return resultats
+
+        import api
+        original = api.calculer_lot
+        monkeypatch.setattr(api, "calculer_lot", lambda projets: appels.append(len(projets)) or original(projets))
+        resultats = asyncio.run(scenario())
+
+        assert [r["nom"] for r in resultats] == ["0", "1", "2", "3", "4"]
+        assert appels == [5]
+
+
+class TestServeur:
+    """Tests des points d'entrée HTTP."""
+
+    def test_schedule(self):
+        """Test le calcul d'un projet via POST /schedule."""
+        statut, reponse = _avec_serveur(lambda port: _poster(
+            port, "/schedule", {"etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05"}))
+
+        assert statut == 200
+        assert any("DET" in tache["Task"] for tache in reponse["taches"])
+
+    def test_portfolio(self):
+        """Test le calcul de plusieurs projets via POST /portfolio."""
+        projets = [{"nom": f"Bâtiment {i}", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"}
+                   for i in range(3)]
+        statut, reponse = _avec_serveur(lambda port: _poster(port, "/portfolio", {"projets": projets}))
+
+        assert statut == 200
+        assert [p["nom"] for p in reponse["projets"]] == ["Bâtiment 0", "Bâtiment 1", "Bâtiment 2"]
+
+    @pytest.mark.parametrize("chemin, corps, attendu", [
+        ("/schedule", {"start_date": "2026-01-05"}, 400),
+        ("/schedule", {"etat": "Inconnu", "start_date": "2026-01-05"}, 400),
+        ("/schedule", {"etat": ["x"], "start_date": "2026-01-05"}, 400),
+        ("/schedule", {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": None}, 400),
+        ("/schedule", {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05",
+                       "recherche_financement_weeks": 1e12}, 400),
+        ("/schedule", {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05", "durees": [["x", 1]]}, 400),
+        ("/schedule", ["pas un objet"], 400),
+        ("/portfolio", {"projets": "pas une liste"}, 400),
+        ("/portfolio", {"projets": [{"etat": ["x"], "start_date": "2026-01-05"}]}, 400),
+        ("/inconnu", {}, 404),
+    ])
+    def test_erreurs(self, chemin, corps, attendu):
+        """Test que les requêtes invalides renvoient un code d'erreur et un message."""
+        statut, reponse = _avec_serveur(lambda port: _poster(port, chemin, corps))
+
+        assert statut == attendu
+        assert "erreur" in reponse
+
+    def test_erreur_interne(self, monkeypatch):
+        """Test qu'une erreur imprévue renvoie un 500 avec un corps JSON, sans couper le serveur."""
+        import api
+
+        def calculer(projet):
+            raise RuntimeError("panne")
+
+        monkeypatch.setattr(api, "calculer_projet", calculer)
+        statut, reponse = _avec_serveur(lambda port: _poster(
+            port, "/schedule", {"etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"}))
+
+        assert statut == 500
+        assert "panne" in reponse["erreur"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,476 @@
+"""
+Tests de l'application Streamlit (AppTest).
+"""
+
+import dataclasses
+import gc
+import json
+import runpy
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.runtime.fragment import MemoryFragmentStorage
+from streamlit.runtime.scriptrunner import RerunException, StopException
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+import metriques
+import ui
+from config import ETAT_AUDIT_NON_EFFECTUE, LOGO_PATH, PORTEFEUILLE_EXEMPLE_PATH
+from gantt import generer_portefeuille
+from portefeuille import lire_portefeuille
+from profilage import Profileur, profileur_actif
+from stockage import ecrire_planning
+
+PREFIXES_DUREES = ("audit_", "amo_", "recrut_", "mop_")
+
+
+def lancer_application(etat=ETAT_AUDIT_NON_EFFECTUE):
+    at = AppTest.from_file("../outil_gantt_projet.py", default_timeout=60)
+    at.run()
+    at.selectbox[0].select(etat).run()
+    return at
+
+
+def fin_du_planning(at):
+    spec = json.loads(at.get("plotly_chart")[0].proto.spec)
+    return max(trace["base"][-1] for trace in spec["data"] if trace.get("base"))
+
+
+def bouton(at, libelle, formulaire=None):
+    return next(b for b in at.button if b.label == libelle and (formulaire is None or b.proto.form_id == formulaire))
+
+
+def champs_durees(at):
+    return [champ for champ in at.number_input if champ.key.startswith(PREFIXES_DUREES)]
+
+
+@pytest.fixture
+def relance_fragment(monkeypatch):
+    """
+    AppTest relance tout le script à chaque interaction. Ce coureur garde les
+    fragments d'une exécution à l'autre et, une fois `relance_fragment.fragment_id`
+    renseigné, ne relance que ce fragment, comme le navigateur.
+    """
+    class CoureurFragments(LocalScriptRunner):
+        fragments = MemoryFragmentStorage()
+        fragment_id = None
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._fragment_storage = CoureurFragments.fragments
+
+        def request_rerun(self, rerun_data):
+            if CoureurFragments.fragment_id:
+                rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[CoureurFragments.fragment_id])
+            return super().request_rerun(rerun_data)
+
+    monkeypatch.setattr(app_test, "LocalScriptRunner", CoureurFragments)
+    return CoureurFragments
+
+
+class TestFormulairesDurees:
+    """Tests pour la saisie groupée des durées."""
+
+    def test_durees_dans_des_formulaires(self):
+        """Test qu'aucune saisie de durée de phase ne relance le script à elle seule."""
+        at = lancer_application()
+
+        champs = champs_durees(at)
+        assert len(champs) > 10
+        assert all(champ.proto.form_id for champ in champs)
+
+    def test_un_formulaire_par_categorie(self):
+        """Test qu'une validation suffit par catégorie affichée."""
+        at = lancer_application()
+
+        formulaires = {champ.proto.form_id for champ in champs_durees(at)}
+        boutons = [bouton for bouton in at.button if bouton.label == "✔️ Appliquer les durées"]
+        assert len(formulaires) == len(boutons) == 3
+
+    def test_validation_applique_les_durees(self):
+        """Test que les durées validées sont reportées sur le Gantt."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin_initiale = fin_du_planning(at)
+
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        champ.set_value(champ.value + 10)
+        bouton(at, "✔️ Appliquer les durées", champ.proto.form_id).click().run()
+
+        assert not at.exception
+        assert fin_du_planning(at) > fin_initiale
+
+
+class TestFragmentPlanning:
+    """Tests pour la relance du seul fragment du planning."""
+
+    def test_validation_ne_relance_que_le_fragment(self, relance_fragment):
+        """Test que valider une durée relance le fragment du planning, pas le script complet."""
+        def executions(portee):
+            return metriques.EXECUTIONS.valeur(portee=portee)
+
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin_initiale = fin_du_planning(at)
+        (relance_fragment.fragment_id,) = relance_fragment.fragments._fragments
+        completes, fragments = executions("app"), executions("fragment")
+
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        champ.set_value(champ.value + 10)
+        bouton(at, "✔️ Appliquer les durées", champ.proto.form_id).click().run()
+
+        assert not at.exception
+        assert executions("app") == completes
+        assert executions("fragment") == fragments + 1
+        assert fin_du_planning(at) > fin_initiale
+        assert not at.selectbox  # choix de l'état hors du fragment : pas renvoyé
+
+    def test_relance_reconnue_malgre_un_profileur_actif(self, monkeypatch, relance_fragment):
+        """Test qu'une relance du fragment est comptée comme telle même si un profileur est resté actif sur le thread."""
+        def executions(portee):
+            return metriques.EXECUTIONS.valeur(portee=portee)
+
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        (relance_fragment.fragment_id,) = relance_fragment.fragments._fragments
+        executer = relance_fragment._run_script
+
+        def avec_profileur_oublie(coureur, rerun_data):
+            Profileur().demarrer()  # jamais arrêté, comme après une exécution interrompue
+            executer(coureur, rerun_data)
+
+        monkeypatch.setattr(relance_fragment, "_run_script", avec_profileur_oublie)
+        completes, fragments = executions("app"), executions("fragment")
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        champ.set_value(champ.value + 10)
+        bouton(at, "✔️ Appliquer les durées", champ.proto.form_id).click().run()
+
+        assert not at.exception
+        assert executions("app") == completes
+        assert executions("fragment") == fragments + 1
+
+
+class TestProfilageExecution:
+    """Tests pour l'arrêt du profileur des exécutions interrompues."""
+
+    @pytest.mark.parametrize("exception", [StopException(), RerunException(None), RuntimeError("erreur")])
+    def test_execution_interrompue(self, monkeypatch, exception):
+        """Test qu'une exécution interrompue ne laisse ni profileur actif ni cProfile sur le thread, que Streamlit réutilise."""
+        def interrompre():
+            raise exception
+
+        monkeypatch.setenv("GANTT_DEBUG", "1")
+        monkeypatch.setattr(ui, "logo", interrompre)
+        st.session_state["profilage_cprofile"] = True
+        try:
+            with pytest.raises(type(exception)):
+                # Dans le thread du test, comme le ScriptRunner qui relance le script sur son thread
+                runpy.run_path(str(Path(__file__).resolve().parent.parent / "outil_gantt_projet.py"))
+            actif, profil = profileur_actif(), sys.getprofile()
+        finally:
+            sys.setprofile(None)
+            del st.session_state["profilage_cprofile"]
+
+        assert actif is None
+        assert profil is None
+
+
+class TestHistoriqueDurees:
+    """Tests pour l'annulation et le rétablissement des durées."""
+
+    def test_annuler_puis_retablir(self):
+        """Test qu'annuler revient aux durées précédentes (figure en cache) et que rétablir les réapplique."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin_initiale = fin_du_planning(at)
+        assert at.button(key="historique_annuler").disabled
+
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        duree_initiale = champ.value
+        champ.set_value(duree_initiale + 10)
+        bouton(at, "✔️ Appliquer les durées", champ.proto.form_id).click().run()
+        fin_modifiee = fin_du_planning(at)
+
+        succes = metriques.CACHE_LECTURES.valeur(cache="figures", resultat="succes")
+        at.button(key="historique_annuler").click().run()
+        assert not at.exception
+        assert at.number_input(key=champ.key).value == duree_initiale
+        assert fin_du_planning(at) == fin_initiale
+        assert metriques.CACHE_LECTURES.valeur(cache="figures", resultat="succes") > succes
+
+        at.button(key="historique_retablir").click().run()
+        assert at.number_input(key=champ.key).value == duree_initiale + 10
+        assert fin_du_planning(at) == fin_modifiee
+        assert at.button(key="historique_retablir").disabled
+
+
+class TestEditionNavigateur:
+    """Tests pour l'édition des durées dans le navigateur."""
+
+    def test_composant_affiche(self):
+        """Test que le mode édition instantanée affiche le composant sans erreur."""
+        at = lancer_application()
+        at.toggle(key="edition_navigateur").set_value(True).run()
+
+        assert not at.exception
+
+    def test_durees_enregistrees_reportees(self):
+        """Test que les durées enregistrées depuis le navigateur sont reportées dans les éditeurs et le Gantt."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin_initiale = fin_du_planning(at)
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        nom, duree = champ.key.split("_", 2)[2], champ.value
+
+        at.session_state["durees_navigateur"] = {nom: duree + 5}
+        at.run()
+
+        assert not at.exception
+        assert at.number_input(key=champ.key).value == duree + 5
+        assert fin_du_planning(at) > fin_initiale
+        assert at.button(key="historique_annuler").disabled is False
+
+    def test_enregistrement_relance_le_fragment_profile(self, monkeypatch, relance_fragment):
+        """Test qu'après « Enregistrer les durées », le fragment relancé est profilé comme un fragment."""
+        def executions(portee):
+            return metriques.EXECUTIONS.valeur(portee=portee)
+
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        (relance_fragment.fragment_id,) = relance_fragment.fragments._fragments
+        at.toggle(key="edition_navigateur").set_value(True).run()
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        nom, duree = champ.key.split("_", 2)[2], champ.value
+        envois = [{nom: duree + 5}]  # un seul enregistrement depuis le navigateur
+        monkeypatch.setattr(ui, "planning_navigateur", lambda *args: envois.pop() if envois else None)
+        completes, fragments = executions("app"), executions("fragment")
+
+        at.run()
+
+        assert not at.exception
+        assert at.number_input(key=champ.key).value == duree + 5
+        assert executions("app") == completes
+        assert executions("fragment") == fragments + 1  # la relance par st.rerun, l'exécution interrompue n'est pas comptée
+
+
+class TestAvancement:
+    """Tests pour la saisie de l'avancement réel."""
+
+    def test_editeur_des_dates_reelles(self):
+        """Test que le Gantt généré propose la saisie des dates réelles, sans reprévision tant qu'elle est vide."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+
+        assert not at.exception
+        assert any(expander.label == "📍 Avancement réel" for expander in at.expander)
+        assert not any(metrique.label == "Fin prévisionnelle" for metrique in at.metric)
+
+
+class TestLots:
+    """Tests pour le développement des lots sur le Gantt."""
+
+    def test_developper_det(self):
+        """Test que développer DET ajoute ses lots au Gantt sans changer la fin du projet."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin = fin_du_planning(at)
+        assert "Gros œuvre" not in at.get("plotly_chart")[0].proto.spec
+
+        at.multiselect(key="lots_developpes").select("🚧 DET - Direction Exécution Travaux").run()
+
+        assert not at.exception
+        assert "Gros œuvre" in at.get("plotly_chart")[0].proto.spec
+        assert fin_du_planning(at) == fin
+
+
+class TestGanttDifferentiel:
+    """Tests pour la mise à jour différentielle du Gantt."""
+
+    def test_differences_apres_validation(self):
+        """Test qu'après la première figure complète, une validation n'envoie que des différences."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        at.toggle(key="gantt_differentiel").set_value(True).run()
+        assert not at.exception
+        assert not at.get("plotly_chart")
+        assert at.session_state["gantt_differentiel_figure_envoi"]["version"] == 1
+
+        champ = next(champ for champ in champs_durees(at) if champ.key.startswith("mop_"))
+        champ.set_value(champ.value + 2)
+        bouton(at, "✔️ Appliquer les durées", champ.proto.form_id).click().run()
+
+        assert not at.exception
+        assert at.session_state["gantt_differentiel_figure_envoi"]["version"] == 2
+
+
+class TestSensibilite:
+    """Tests pour l'analyse de sensibilité de la date de fin."""
+
+    def test_tornade_du_plan_affiche(self):
+        """Test que le mode sensibilité ajoute la tornade et le tableau sans modifier le Gantt."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+        fin = fin_du_planning(at)
+        assert len(at.get("plotly_chart")) == 1
+
+        at.toggle(key="sensibilite").set_value(True).run()
+
+        assert not at.exception
+        assert len(at.get("plotly_chart")) == 2
+        assert fin_du_planning(at) == fin
+        tableau = at.dataframe[-1].value
+        assert (tableau["Amplitude (j)"] > 0).all()
+        assert tableau["Amplitude (j)"].is_monotonic_decreasing
+
+
+class TestPlanningReference:
+    """Tests pour l'enregistrement d'un planning de référence."""
+
+    def test_export_reference(self):
+        """Test que le planning généré peut être enregistré comme référence."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+
+        assert any(b.label == "📌 Enregistrer comme référence (.parquet)" for b in at.get("download_button"))
+        assert at.expander[-1].label == "📌 Comparer à un planning de référence"
+
+
+class TestVuePortefeuille:
+    """Tests pour la vue Portefeuille."""
+
+    def test_portefeuille_exemple(self):
+        """Test que la vue affiche les conflits et l'occupation du portefeuille d'exemple."""
+        at = AppTest.from_file("../outil_gantt_projet.py", default_timeout=60)
+        at.run()
+        at.sidebar.radio(key="vue").set_value("🏘️ Portefeuille").run()
+
+        assert not at.exception
+        assert len(at.get("plotly_chart")) == 2
+        assert any(bouton.label.endswith("(.csv)") for bouton in at.get("download_button"))
+
+    def test_conflits_par_equipe(self):
+        """Test que les conflits du portefeuille d'exemple sont signalés par site puis par équipe."""
+        at = AppTest.from_file("../outil_gantt_projet.py", default_timeout=60)
+        at.run()
+        at.sidebar.radio(key="vue").set_value("🏘️ Portefeuille").run()
+        assert at.warning[0].value.startswith("2 chevauchement")
+
+        at.radio(key="conflits_cle").set_value("Equipe").run()
+        assert not at.exception
+        assert at.warning[0].value.startswith("2 chevauchement")
+
+        at.multiselect(key="conflits_phases").set_value(["📝 Signature des marchés"]).run()
+        assert at.success[0].value == "Aucun chevauchement."
+
+    def test_planning_stocke(self, tmp_path, monkeypatch):
+        """Test que la vue sert le planning Arrow désigné par GANTT_PORTEFEUILLE_ARROW."""
+        chemin = tmp_path / "portefeuille.arrow"
+        projets = lire_portefeuille(PORTEFEUILLE_EXEMPLE_PATH.read_bytes())
+        ecrire_planning(generer_portefeuille(projets[:3]), chemin)
+        monkeypatch.setenv("GANTT_PORTEFEUILLE_ARROW", str(chemin))
+
+        at = AppTest.from_file("../outil_gantt_projet.py", default_timeout=60)
+        at.run()
+        at.sidebar.radio(key="vue").set_value("🏘️ Portefeuille").run()
+
+        assert not at.exception
+        assert any(legende.value.startswith("3 projets") for legende in at.caption)
+
+
+class TestCachesBornes:
+    """Tests pour les caches bornés des plannings et des figures."""
+
+    def test_figure_reutilisee_entre_sessions(self):
+        """Test qu'une seconde session aux mêmes paramètres reçoit la figure en cache."""
+        def succes():
+            return metriques.CACHE_LECTURES.valeur(cache="figures", resultat="succes")
+
+        premiere = lancer_application()
+        bouton(premiere, "Générer le diagramme de Gantt").click().run()
+        avant = succes()
+
+        seconde = lancer_application()
+        bouton(seconde, "Générer le diagramme de Gantt").click().run()
+
+        assert not seconde.exception
+        assert succes() > avant
+        assert premiere.get("plotly_chart")[0].proto.spec == seconde.get("plotly_chart")[0].proto.spec
+
+
+def page_ressources(partagees):
+    """Page minimale d'une session qui garde le gabarit, le glossaire et le logo."""
+    import streamlit as st
+
+    import ui
+    from config import LOGO_PATH
+    from gantt import gabarit_gantt, generer_glossaire_html
+
+    if partagees:
+        ressources = (ui.gabarit_partage(), ui.glossaire_html(), ui.logo())
+    else:
+        ressources = (gabarit_gantt(), generer_glossaire_html(), LOGO_PATH.read_bytes())
+    st.session_state["ressources"] = ressources
+    st.text(" ".join(str(id(ressource)) for ressource in ressources))
+
+
+def memoire_par_session(partagees, sessions=6):
+    """Ouvre des sessions qui restent actives ; retourne les sessions et la mémoire retenue par chacune (octets)."""
+    AppTest.from_function(page_ressources, args=(partagees,)).run()  # imports hors mesure
+    for ressource in (ui.gabarit_partage, ui.glossaire_html, ui.logo):
+        ressource.clear()
+    ouvertes, hausses = [], []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        precedente = tracemalloc.get_traced_memory()[0]
+        for _ in range(sessions):
+            at = AppTest.from_function(page_ressources, args=(partagees,))
+            at.run()
+            ouvertes.append(at)
+            gc.collect()
+            actuelle = tracemalloc.get_traced_memory()[0]
+            hausses.append(actuelle - precedente)
+            precedente = actuelle
+    finally:
+        tracemalloc.stop()
+    return ouvertes, hausses
+
+
+class TestRessourcesPartagees:
+    """Tests pour les ressources immuables partagées entre les sessions."""
+
+    def test_figure_avec_gabarit_partage(self):
+        """Test que le Gantt n'embarque plus le gabarit par défaut de Plotly."""
+        at = lancer_application()
+        bouton(at, "Générer le diagramme de Gantt").click().run()
+
+        gabarit = json.loads(at.get("plotly_chart")[0].proto.spec)["layout"]["template"]
+        assert not at.exception
+        assert set(gabarit["data"]) == {"bar"}
+        assert gabarit["layout"]["plot_bgcolor"] == "white"
+
+    def test_memes_objets_pour_toutes_les_sessions(self):
+        """Test que les ressources sont construites une fois et servies telles quelles à chaque session."""
+        sessions, _ = memoire_par_session(partagees=True, sessions=3)
+
+        assert not any(at.exception for at in sessions)
+        assert len({at.text[0].value for at in sessions}) == 1
+        assert sessions[0].session_state["ressources"][2] == LOGO_PATH.read_bytes()
+
+    def test_memoire_par_session_decroit(self):
+        """Test que seule la première session paie la mémoire des ressources partagées."""
+        _, partagees = memoire_par_session(partagees=True)
+        _, copies = memoire_par_session(partagees=False)
+
+        # Logo, glossaire et gabarit : ~170 Ko par session s'ils sont copiés
+        assert min(copies) > 100_000
+        assert partagees[0] > 100_000
+        assert max(partagees[1:]) < min(copies) / 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
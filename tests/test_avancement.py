@@ -0,0 +1,127 @@
+"""
+Tests pour le suivi de l'avancement et la reprévision des plannings.
+"""
+
+import pandas as pd
+import pytest
+
+from avancement import ajouter_avancement, dates_reelles, glissement_fin, reprevoir
+from config import ETAT_EQUIPE_SELECTIONNEE
+from gantt import generer_figure_gantt, generer_portefeuille, generer_taches_projet
+
+DIAG = "📝 DIAG - Diagnostic & Études d’Esquisse"
+APS = "📝 APS - Avant-Projet Sommaire"
+APD = "📝 APD - Avant-Projet Définitif"
+PROJET = {"etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05", "include_financement": False}
+
+
+def taches_prevues():
+    return generer_taches_projet(PROJET)
+
+
+def ligne(taches, nom, type_tache="Phase"):
+    return taches[(taches["Task"] == nom) & (taches["Type"] == type_tache)].iloc[0]
+
+
+class TestDatesReelles:
+    """Tests pour la lecture des dates réelles."""
+
+    def test_dates(self):
+        """Test que les dates sont converties et qu'une date manquante vaut NaT."""
+        reels = dates_reelles({DIAG: {"debut": "2026-01-05", "fin": "2026-03-02"}, APS: {"debut": "2026-03-16"}})
+
+        assert reels["Fin réel"].iloc[0] == pd.Timestamp("2026-03-02")
+        assert pd.isna(reels["Fin réel"].iloc[1])
+
+    @pytest.mark.parametrize("reel", [
+        {DIAG: {"debut": "2026-03-02", "fin": "2026-01-05"}},
+        {DIAG: {"debut": "pas une date"}},
+        {DIAG: {}},
+        [DIAG],
+    ])
+    def test_dates_invalides(self, reel):
+        """Test qu'une saisie incohérente lève une ValueError."""
+        with pytest.raises(ValueError):
+            dates_reelles(reel)
+
+    def test_phase_inconnue(self):
+        """Test qu'une date réelle d'une phase absente du planning lève une ValueError."""
+        with pytest.raises(ValueError, match="inconnues"):
+            reprevoir(taches_prevues(), dates_reelles({"Phase inventée": {"fin": "2026-03-02"}}))
+
+
+class TestReprevoir:
+    """Tests pour la reprévision de la suite du planning."""
+
+    def test_sans_dates_reelles(self):
+        """Test que sans date réelle la prévision est le planning théorique."""
+        prevu = taches_prevues()
+        reprevu = reprevoir(prevu, dates_reelles({}))
+
+        assert reprevu["Start"].equals(prevu["Start"])
+        assert (reprevu["Glissement (j)"] == 0).all()
+        assert "Start prévu" not in prevu
+
+    def test_phase_terminee_en_retard(self):
+        """Test qu'un retard décale toutes les tâches suivantes, pas les précédentes."""
+        prevu = taches_prevues()
+        fin_prevue = ligne(prevu, DIAG)["Finish"]
+        reprevu = reprevoir(prevu, dates_reelles({DIAG: {"debut": "2026-01-05", "fin": fin_prevue + pd.Timedelta(days=21)}}))
+
+        assert ligne(reprevu, DIAG)["Glissement (j)"] == 21
+        assert ligne(reprevu, DIAG, "Délai MO")["Start"] == ligne(reprevu, DIAG)["Finish"]
+        assert (reprevu["Finish"] - reprevu["Finish prévu"]).iloc[1:].eq(pd.Timedelta(days=21)).all()
+        assert glissement_fin(reprevu) == 21
+
+    def test_phase_en_cours(self):
+        """Test qu'une phase commencée finit à son début réel plus sa durée prévue."""
+        prevu = taches_prevues()
+        aps = ligne(prevu, APS)
+        debut = aps["Start"] + pd.Timedelta(days=10)
+        reprevu = reprevoir(prevu, dates_reelles({APS: {"debut": debut}}))
+
+        assert ligne(reprevu, APS)["Finish"] == debut + (aps["Finish"] - aps["Start"])
+        assert ligne(reprevu, DIAG)["Glissement (j)"] == 0
+        assert glissement_fin(reprevu) == 10
+
+    def test_derniere_date_reelle_prevaut(self):
+        """Test que le glissement repart de la dernière phase aux dates réelles."""
+        prevu = taches_prevues()
+        apd = ligne(prevu, APD)
+        reprevu = reprevoir(prevu, dates_reelles({
+            DIAG: {"fin": ligne(prevu, DIAG)["Finish"] + pd.Timedelta(days=30)},
+            APD: {"debut": apd["Start"] + pd.Timedelta(days=14), "fin": apd["Finish"] + pd.Timedelta(days=7)},
+        }))
+
+        assert ligne(reprevu, APS)["Glissement (j)"] == 30
+        assert ligne(reprevu, APD)["Glissement (j)"] == 7
+        assert glissement_fin(reprevu) == 7
+
+    def test_portefeuille_vectoriel(self):
+        """Test que la reprévision d'un portefeuille traite chaque projet comme s'il était seul."""
+        reel = {DIAG: {"debut": "2026-01-05", "fin": "2026-04-06"}}
+        projets = [dict(PROJET, nom="A", reel=reel), dict(PROJET, nom="B"), dict(PROJET, nom="C", reel=reel)]
+        taches = generer_portefeuille(projets)
+        seul = generer_taches_projet(dict(PROJET, reel=reel))
+
+        assert taches.loc[taches["Projet"] == "A", "Finish"].tolist() == seul["Finish"].tolist()
+        assert (taches.loc[taches["Projet"] == "B", "Glissement (j)"] == 0).all()
+        assert glissement_fin(taches).to_dict() == {"A": glissement_fin(seul), "B": 0, "C": glissement_fin(seul)}
+
+
+class TestFigure:
+    """Tests pour l'affichage de l'avancement sur le Gantt."""
+
+    def test_barres_et_glissement(self):
+        """Test que le Gantt montre le prévu initial, les périodes réelles et le glissement."""
+        reprevu = generer_taches_projet(dict(PROJET, reel={DIAG: {"debut": "2026-01-05", "fin": "2026-04-06"}}))
+        fig = ajouter_avancement(generer_figure_gantt(reprevu), reprevu)
+
+        noms = [trace.name for trace in fig.data]
+        assert noms[0] == "Prévu initial"
+        assert "Réel" in noms
+        assert any("Glissement de la fin : +" in (annotation.text or "") for annotation in fig.layout.annotations)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+"""
+Tests pour la suite de benchmarks.
+"""
+
+import pytest
+
+from benchmarks.suite import ETAPES, comparer, executer, projets_synthetiques
+
+
+class TestProjetsSynthetiques:
+    """Tests pour la charge synthétique des benchmarks."""
+
+    @pytest.mark.parametrize("nb_taches", [1, 2, 100, 1000])
+    def test_nombre_exact_de_taches(self, nb_taches):
+        """Test que la charge produit exactement le nombre de tâches demandé."""
+        projets = projets_synthetiques(nb_taches)
+
+        nb = sum(1 + (phase["delai_mo"] > 0) for phases in projets for phase in phases)
+        assert nb == nb_taches
+
+    def test_noms_uniques_par_projet(self):
+        """Test que chaque projet a ses propres lignes dans le Gantt."""
+        projets = projets_synthetiques(200)
+
+        noms = [phase["nom"] for phases in projets for phase in phases]
+        assert len(projets) > 1
+        assert len(noms) == len(set(noms))
+
+
+class TestComparaison:
+    """Tests pour la détection des régressions."""
+
+    def test_regression_detectee(self):
+        """Test qu'un ralentissement au-delà du seuil est signalé."""
+        reference = {"timeline[100]": {"min_s": 0.100, "median_s": 0.110}}
+        resultats = {"timeline[100]": {"min_s": 0.140, "median_s": 0.150}}
+
+        regressions = comparer(resultats, reference, seuil=0.25)
+
+        assert [r[0] for r in regressions] == ["timeline[100]"]
+        assert regressions[0][3] == pytest.approx(1.4)
+
+    def test_sous_le_seuil(self):
+        """Test qu'un ralentissement sous le seuil n'est pas signalé."""
+        reference = {"timeline[100]": {"min_s": 0.100, "median_s": 0.100}}
+        resultats = {"timeline[100]": {"min_s": 0.120, "median_s": 0.120}}
+
+        assert comparer(resultats, reference, seuil=0.25) == []
+
+    def test_bruit_ignore(self):
+        """Test que les écarts de l'ordre du bruit de mesure sont ignorés."""
+        reference = {"glossaire[1]": {"min_s": 0.00001, "median_s": 0.00001}}
+        resultats = {"glossaire[1]": {"min_s": 0.00005, "median_s": 0.00005}}
+
+        assert comparer(resultats, reference) == []
+
+    def test_cles_absentes_ignorees(self):
+        """Test que seules les mesures communes sont comparées."""
+        assert comparer({"rerun[1]": {"min_s": 1.0, "median_s": 1.0}}, {}) == []
+
+
+class TestExecution:
+    """Tests d'exécution rapide de toutes les étapes."""
+
+    def test_toutes_les_etapes(self):
+        """Test que chaque étape s'exécute sur un petit planning."""
+        resultats = executer(tailles=[5], budget=0, afficher=lambda _: None)
+
+        assert set(resultats) == {f"{etape}[5]" for etape in ETAPES}
+        assert all(mesure["repetitions"] == 1 for mesure in resultats.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
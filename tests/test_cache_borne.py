@@ -0,0 +1,142 @@
+"""
+Tests pour le cache borné des plannings et des figures.
+"""
+
+import pandas as pd
+import pytest
+
+import metriques
+from cache_borne import CacheBorne, estimer_taille
+from config import ETAT_AUDIT_NON_EFFECTUE
+from gantt import generer_figure_gantt, generer_phases, generer_taches
+
+
+class Horloge:
+    """Horloge manuelle pour les tests d'expiration."""
+
+    def __init__(self):
+        self.instant = 0.0
+
+    def __call__(self):
+        return self.instant
+
+
+class TestLimites:
+    """Tests pour les limites en entrées, en âge et en octets."""
+
+    def test_lru_evince_la_moins_recemment_lue(self):
+        """Test qu'au-delà de max_entrees l'entrée la moins récemment lue est évincée."""
+        cache = CacheBorne("test_lru", max_entrees=2, taille=lambda valeur: 1)
+        cache.ecrire("a", 1)
+        cache.ecrire("b", 2)
+        assert cache.lire("a") == 1  # "b" devient la moins récente
+        cache.ecrire("c", 3)
+
+        assert cache.lire("b") is None
+        assert (cache.lire("a"), cache.lire("c")) == (1, 3)
+        assert len(cache) == 2
+
+    def test_ttl(self):
+        """Test qu'une entrée plus ancienne que ttl_s est recalculée."""
+        horloge = Horloge()
+        cache = CacheBorne("test_ttl", ttl_s=10, taille=lambda valeur: 1, horloge=horloge)
+        appels = []
+
+        def calculer():
+            appels.append(1)
+            return len(appels)
+
+        assert cache.obtenir("cle", calculer) == 1
+        horloge.instant = 5
+        assert cache.obtenir("cle", calculer) == 1
+        horloge.instant = 11
+        assert cache.obtenir("cle", calculer) == 2
+        assert cache.statistiques == {"succes": 1, "echecs": 2, "evictions": 1}
+
+    def test_budget_octets(self):
+        """Test que la taille totale reste sous le budget, par éviction des moins récentes."""
+        cache = CacheBorne("test_octets", budget_octets=100, taille=len)
+        for cle in "abcd":
+            cache.ecrire(cle, "x" * 30)
+        assert cache.octets == 90
+
+        cache.ecrire("e", "x" * 50)
+
+        assert cache.octets == 80
+        assert [cache.lire(cle) is not None for cle in "abcde"] == [False, False, False, True, True]
+
+    def test_valeur_plus_grande_que_le_budget(self):
+        """Test qu'une valeur plus grande que le budget n'est pas gardée et n'évince rien."""
+        cache = CacheBorne("test_trop_grand", budget_octets=100, taille=len)
+        cache.ecrire("a", "x" * 10)
+        cache.ecrire("b", "x" * 200)
+
+        assert cache.lire("b") is None
+        assert cache.lire("a") is not None
+        assert cache.octets == 10
+
+    def test_remplacement(self):
+        """Test qu'écrire une clé existante remplace sa valeur et sa taille."""
+        cache = CacheBorne("test_remplacement", taille=len)
+        cache.ecrire("a", "xx")
+        cache.ecrire("a", "xxxxx")
+
+        assert cache.lire("a") == "xxxxx"
+        assert (len(cache), cache.octets) == (1, 5)
+
+    def test_none_non_garde(self):
+        """Test qu'un calcul retournant None n'est pas gardé : il est refait et compté comme un échec."""
+        cache = CacheBorne("test_none_non_garde")
+        appels = []
+
+        assert cache.obtenir("a", lambda: appels.append(1)) is None
+        assert cache.obtenir("a", lambda: appels.append(1)) is None
+        assert len(appels) == 2
+        assert len(cache) == 0
+        assert cache.statistiques["succes"] == 0
+        assert metriques.CACHE_LECTURES.valeur(cache="test_none_non_garde", resultat="succes") == 0
+
+    def test_lire_distingue_absence_et_none(self):
+        """Test que `lire` retourne `defaut` pour une clé absente, et None pour un None écrit."""
+        cache = CacheBorne("test_lire_defaut")
+        cache.ecrire("a", None)
+        absente = object()
+
+        assert cache.lire("a", absente) is None
+        assert cache.lire("b", absente) is absente
+        assert cache.lire("b") is None
+
+
+class TestMetriques:
+    """Tests pour les compteurs exposés dans metriques."""
+
+    def test_compteurs(self):
+        """Test que lectures, évictions et taille sont reportées par cache."""
+        cache = CacheBorne("test_metriques", max_entrees=1, taille=lambda valeur: 7)
+        cache.obtenir("a", lambda: 1)
+        cache.obtenir("a", lambda: 1)
+        cache.obtenir("b", lambda: 2)
+
+        assert metriques.CACHE_LECTURES.valeur(cache="test_metriques", resultat="succes") == 1
+        assert metriques.CACHE_LECTURES.valeur(cache="test_metriques", resultat="echec") == 2
+        assert metriques.CACHE_EVICTIONS.valeur(cache="test_metriques", cause="lru") == 1
+        texte = metriques.REGISTRE.exposition()
+        assert 'gantt_cache_octets{cache="test_metriques"} 7' in texte
+        assert 'gantt_cache_entrees{cache="test_metriques"} 1' in texte
+
+
+class TestEstimerTaille:
+    """Tests pour l'estimation de la taille des valeurs."""
+
+    def test_dataframe_et_figure(self):
+        """Test que la taille d'un planning et de sa figure croît avec le nombre de tâches."""
+        df = generer_taches(generer_phases(ETAT_AUDIT_NON_EFFECTUE), "2026-01-05")
+        double = pd.concat([df, df], ignore_index=True)
+
+        assert estimer_taille(double) > estimer_taille(df) > 0
+        assert estimer_taille(generer_figure_gantt(double)) > estimer_taille(generer_figure_gantt(df)) > 1000
+        assert estimer_taille(b"abc") == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
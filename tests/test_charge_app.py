@@ -0,0 +1,34 @@
+"""
+Tests pour le test de charge de l'application Streamlit (scripts/charge_app.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from charge_app import ACTIONS, charger  # noqa: E402
+
+
+class TestCharger:
+    """Tests pour la campagne de charge."""
+
+    def test_rapport(self):
+        """Test qu'une session déroule toutes les actions et que le rapport est complet."""
+        stats = charger(sessions=1, concurrence=1, modifications=1)
+
+        assert stats["sessions"] == 1
+        assert stats["mode"] == "threads"
+        assert stats["executions_serialisees"] is True
+        assert stats["reruns"] == len(ACTIONS)
+        assert set(stats["par_action"]) == set(ACTIONS)
+        assert all(valeurs["n"] == 1 for valeurs in stats["par_action"].values())
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["debit_reruns_s"] > 0
+        assert stats["memoire_session_mo"] >= 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
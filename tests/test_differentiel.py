@@ -0,0 +1,142 @@
+"""
+Tests pour la mise à jour différentielle des figures.
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from config import ETAT_AUDIT_NON_EFFECTUE
+from differentiel import DOSSIER_COMPOSANT, DOSSIER_PLOTLY_JS, appliquer, difference, message_figure
+from gantt import generer_figure_gantt, generer_phases, generer_taches
+from lots import developper_lots
+
+DEBUT = "2026-01-05"
+DET = "🚧 DET - Direction Exécution Travaux"
+
+# Application JavaScript du composant, exécutée par Node : {document, operations} sur l'entrée standard
+SCRIPT_NODE = """
+const {appliquer} = require(process.argv[1]);
+let entree = "";
+process.stdin.on("data", (morceau) => entree += morceau);
+process.stdin.on("end", () => {
+  const {document, operations} = JSON.parse(entree);
+  process.stdout.write(JSON.stringify(appliquer(document, operations)));
+});
+"""
+
+
+def figure_json(phases, developpes=()):
+    taches = developper_lots(generer_taches(phases, DEBUT), phases, developpes)
+    return json.loads(generer_figure_gantt(taches).to_json())
+
+
+def copie(document):
+    return json.loads(json.dumps(document))
+
+
+@pytest.fixture
+def phases():
+    return generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+
+
+@pytest.fixture
+def deux_figures(phases):
+    avant = figure_json(phases)
+    next(phase for phase in phases if phase["modifiable"])["duree"] += 3
+    return avant, figure_json(phases)
+
+
+class TestDifference:
+    """Tests pour le calcul et l'application des différences."""
+
+    def test_aller_retour(self, deux_figures):
+        """Test que les opérations reconstruisent exactement la nouvelle figure."""
+        avant, apres = deux_figures
+
+        assert appliquer(copie(avant), difference(avant, apres)) == apres
+        assert difference(apres, apres) == []
+
+    def test_changement_de_lignes(self, phases):
+        """Test que développer des lots (tableaux de tailles différentes) reste reconstructible."""
+        avant, apres = figure_json(phases), figure_json(phases, [DET])
+
+        assert appliquer(copie(avant), difference(avant, apres)) == apres
+        assert appliquer(copie(apres), difference(apres, avant)) == avant
+
+    def test_suppression_et_racine(self):
+        """Test des suppressions de clés et du remplacement de la racine."""
+        avant, apres = {"a": 1, "b": {"c": [1, 2, 3]}}, {"b": {"c": [1, 5, 3]}, "d": None}
+
+        operations = difference(avant, apres)
+
+        assert operations == [[["a"]], [["b", "c", 1], 5], [["d"], None]]
+        assert appliquer(copie(avant), operations) == apres
+        assert appliquer([1], difference([1], {"x": 1})) == {"x": 1}
+
+    def test_seulement_les_modifications(self, deux_figures):
+        """Test qu'une durée modifiée n'envoie qu'une petite partie de la figure, sans gabarit ni survols."""
+        avant, apres = deux_figures
+
+        operations = json.dumps(difference(avant, apres))
+
+        assert len(operations) < len(json.dumps(apres)) / 4
+        assert "template" not in operations and "hovertemplate" not in operations
+
+    def test_uirevision_stable(self, deux_figures):
+        """Test que le uirevision ne change pas d'un planning à l'autre (zoom conservé)."""
+        avant, apres = deux_figures
+
+        assert avant["layout"]["uirevision"] == apres["layout"]["uirevision"] == "gantt"
+
+
+class TestMessageFigure:
+    """Tests pour les messages envoyés au composant."""
+
+    def test_protocole(self, deux_figures):
+        """Test : figure complète d'abord, puis différences, rien si inchangée, complète sur demande."""
+        avant, apres = deux_figures
+
+        message, envoi = message_figure(avant, None, None)
+        assert message["version"] == 1 and message["figure"] == avant
+
+        message, envoi = message_figure(apres, envoi, None)
+        assert (message["version"], message["base"]) == (2, 1)
+        assert appliquer(copie(avant), message["operations"]) == apres
+
+        message, envoi = message_figure(apres, envoi, None)
+        assert (message["version"], message["base"], message["operations"]) == (2, 2, [])
+
+        message, envoi = message_figure(apres, envoi, 1234)
+        assert message["version"] == 3 and message["figure"] == apres
+        assert "figure" not in message_figure(apres, envoi, 1234)[0]
+
+    def test_fichiers_du_composant(self):
+        """Test que le composant et plotly.js servis existent."""
+        assert (DOSSIER_COMPOSANT / "index.html").is_file()
+        assert (DOSSIER_PLOTLY_JS / "plotly.min.js").is_file()
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js absent")
+class TestParite:
+    """Tests que le navigateur applique les opérations comme Python."""
+
+    def test_meme_figure(self, phases):
+        """Test que le JavaScript du composant reconstruit la même figure."""
+        avant, apres = figure_json(phases), figure_json(phases, [DET])
+        phases[-1]["duree"] += 2
+        operations = difference(avant, apres) + difference(apres, figure_json(phases, [DET]))
+
+        sortie = subprocess.run(
+            ["node", "-e", SCRIPT_NODE, str(DOSSIER_COMPOSANT / "differentiel.js")],
+            input=json.dumps({"document": avant, "operations": operations}),
+            capture_output=True, text=True, check=True,
+        )
+
+        assert json.loads(sortie.stdout) == figure_json(phases, [DET])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
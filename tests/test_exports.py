@@ -0,0 +1,173 @@
+"""
+Tests pour les exports du tableau des tâches.
+"""
+
+import io
+import itertools
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+import pytest
+
+import exports
+from config import ETAT_AUDIT_NON_EFFECTUE, ETAT_EQUIPE_SELECTIONNEE
+from exports import _plier_ics, ecrire_xlsx, iter_ics, iter_mspdi
+from gantt import generer_phases, generer_portefeuille, generer_taches
+
+NS_XLSX = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+NS_MSPDI = {"p": "http://schemas.microsoft.com/project"}
+
+
+@pytest.fixture
+def taches():
+    phases = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+    return generer_taches(phases, datetime(2026, 1, 5), include_financement=True)
+
+
+class TestExportIcs:
+    """Tests pour l'export iCalendar."""
+
+    def test_structure_calendrier(self, taches):
+        """Test que le calendrier contient un VEVENT par tâche."""
+        lignes = list(iter_ics(taches))
+
+        assert lignes[0] == "BEGIN:VCALENDAR\r\n"
+        assert lignes[-1] == "END:VCALENDAR\r\n"
+        assert lignes.count("BEGIN:VEVENT\r\n") == len(taches)
+        assert all(ligne.endswith("\r\n") for ligne in lignes)
+
+    def test_delais_mo_identifies(self, taches):
+        """Test que les fenêtres Délai MO sont intitulées comme telles."""
+        contenu = "".join(iter_ics(taches))
+
+        nb_delais = (taches["Type"] == "Délai MO").sum()
+        assert contenu.count("SUMMARY:⏳ Délai MO — ") == nb_delais
+
+    def test_filtre_types(self, taches):
+        """Test que seuls les types demandés sont exportés."""
+        contenu = "".join(iter_ics(taches, types=("Délai MO",)))
+
+        assert contenu.count("BEGIN:VEVENT") == (taches["Type"] == "Délai MO").sum()
+
+    def test_dates_journee_entiere(self, taches):
+        """Test que les dates sont exportées en journée entière, fin exclusive."""
+        horodatage = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        contenu = "".join(iter_ics(taches.head(1), horodatage=horodatage))
+
+        assert "DTSTART;VALUE=DATE:20260105\r\n" in contenu
+        assert "DTEND;VALUE=DATE:20260216\r\n" in contenu
+        assert "DTSTAMP:20260101T000000Z\r\n" in contenu
+
+    def test_pliage_lignes_longues(self):
+        """Test que les lignes sont repliées à 75 octets sans couper un caractère."""
+        ligne = "DESCRIPTION:" + "é" * 200
+        pliee = _plier_ics(ligne)
+
+        morceaux = pliee.rstrip("\r\n").split("\r\n")
+        assert all(len(m.encode("utf-8")) <= 75 for m in morceaux)
+        assert "".join(m[1:] if i else m for i, m in enumerate(morceaux)) == ligne
+
+    def test_flux_paresseux(self, taches):
+        """Test que l'export consomme les morceaux à la demande."""
+        morceaux = itertools.repeat(taches)  # portefeuille infini
+
+        debut = list(itertools.islice(iter_ics(morceaux), 50))
+
+        assert debut[0] == "BEGIN:VCALENDAR\r\n"
+        assert "BEGIN:VEVENT\r\n" in debut
+
+
+@pytest.fixture
+def portefeuille():
+    return generer_portefeuille([
+        {"nom": "École", "etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-01-05"},
+        {"nom": "Mairie", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-03-02"},
+    ])
+
+
+def _lignes_xlsx(taches):
+    tampon = io.BytesIO()
+    ecrire_xlsx(taches, tampon)
+    with zipfile.ZipFile(tampon) as archive:
+        assert "xl/workbook.xml" in archive.namelist()
+        feuille = ET.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    lignes = []
+    for row in feuille.iterfind(".//x:row", NS_XLSX):
+        lignes.append([c.findtext(".//x:t", namespaces=NS_XLSX) or c.findtext("x:v", namespaces=NS_XLSX)
+                       for c in row.iterfind("x:c", NS_XLSX)])
+    return lignes
+
+
+class TestExportXlsx:
+    """Tests pour l'export Excel."""
+
+    def test_une_ligne_par_tache(self, portefeuille):
+        """Test que la feuille contient l'en-tête puis une ligne par tâche."""
+        lignes = _lignes_xlsx(portefeuille)
+
+        assert lignes[0][:3] == ["ID", "Projet", "Tâche"]
+        assert len(lignes) == len(portefeuille) + 1
+
+    def test_dates_en_numeros_de_serie(self, taches):
+        """Test que les dates sont écrites en numéros de série Excel."""
+        lignes = _lignes_xlsx(taches)
+
+        assert lignes[1][3] == "46027"  # 05/01/2026
+
+    def test_predecesseurs_par_projet(self, portefeuille):
+        """Test que l'enchaînement repart à zéro à chaque projet."""
+        lignes = _lignes_xlsx(portefeuille)[1:]
+        predecesseurs = [ligne[-1] for ligne in lignes]
+        debut_mairie = next(i for i, ligne in enumerate(lignes) if ligne[1] == "Mairie")
+
+        assert predecesseurs[0] is None
+        assert predecesseurs[1] == "1"
+        assert predecesseurs[debut_mairie] is None
+        assert predecesseurs[debut_mairie + 1] == str(debut_mairie + 1)
+
+    def test_morceaux_multiples(self, portefeuille, monkeypatch):
+        """Test que l'enchaînement est conservé d'un morceau à l'autre."""
+        monkeypatch.setattr(exports, "TAILLE_MORCEAU", 3)
+
+        assert _lignes_xlsx(portefeuille) == _lignes_xlsx([portefeuille.iloc[:5], portefeuille.iloc[5:]])
+        assert _lignes_xlsx(portefeuille)[4][-1] == "3"
+
+
+class TestExportMsProject:
+    """Tests pour l'export MS Project XML."""
+
+    def test_xml_valide(self, portefeuille):
+        """Test que le document est un XML MSPDI avec une récapitulative par projet."""
+        racine = ET.fromstring("".join(iter_mspdi(portefeuille)))
+        taches = racine.findall("p:Tasks/p:Task", NS_MSPDI)
+        recapitulatives = [t for t in taches if t.findtext("p:Summary", namespaces=NS_MSPDI) == "1"]
+
+        assert len(taches) == len(portefeuille) + 2
+        assert [t.findtext("p:Name", namespaces=NS_MSPDI) for t in recapitulatives] == ["École", "Mairie"]
+
+    def test_liens_fin_debut(self, taches):
+        """Test que chaque tâche, sauf la première, est liée à la précédente."""
+        racine = ET.fromstring("".join(iter_mspdi(taches)))
+        taches_xml = racine.findall("p:Tasks/p:Task", NS_MSPDI)
+
+        assert taches_xml[0].find("p:PredecessorLink", NS_MSPDI) is None
+        for precedente, tache in zip(taches_xml, taches_xml[1:]):
+            lien = tache.find("p:PredecessorLink", NS_MSPDI)
+            assert lien.findtext("p:PredecessorUID", namespaces=NS_MSPDI) == precedente.findtext("p:UID", namespaces=NS_MSPDI)
+            assert lien.findtext("p:Type", namespaces=NS_MSPDI) == "1"
+
+    def test_jalons_et_durees(self, taches):
+        """Test que les phases sans durée sont des jalons et que les durées sont en heures ouvrées."""
+        racine = ET.fromstring("".join(iter_mspdi(taches)))
+        par_nom = {t.findtext("p:Name", namespaces=NS_MSPDI): t for t in racine.findall("p:Tasks/p:Task", NS_MSPDI)}
+
+        decision = par_nom["📝 Prise de décision des élus"]
+        assert decision.findtext("p:Milestone", namespaces=NS_MSPDI) == "1"
+        financement = par_nom["💶 Recherche de financement"]
+        assert financement.findtext("p:Duration", namespaces=NS_MSPDI) == "PT240H0M0S"
+        assert financement.findtext("p:Finish", namespaces=NS_MSPDI) == "2026-02-13T17:00:00"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
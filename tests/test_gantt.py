@@ -5,7 +5,7 @@ Tests pour la génération du diagramme de Gantt.
 import pytest
 import pandas as pd
 from datetime import datetime, timedelta
-from gantt import generer_taches, generer_figure_gantt
+from gantt import gabarit_gantt, generer_taches, generer_figure_gantt
 
 
 class TestGenererFigureGantt:
@@ -134,6 +134,19 @@ class TestGenererFigureGantt:
         assert fig.layout.yaxis.title.text == "Phases"
         assert fig.layout.yaxis.autorange == "reversed"
 
+    def test_figure_gabarit_partage(self):
+        """Test qu'un gabarit fourni est appliqué sans être modifié par la figure."""
+        df = generer_taches([], datetime(2023, 1, 1))
+        gabarit = gabarit_gantt()
+        avant = gabarit.to_plotly_json()
+
+        fig = generer_figure_gantt(df, gabarit)
+        fig.update_layout(template_layout_plot_bgcolor="black")
+
+        assert fig.layout.template.layout.xaxis.gridcolor == "lightgrey"
+        assert set(fig.layout.template.data.to_plotly_json()) == {"bar"}
+        assert gabarit.to_plotly_json() == avant
+
 
 class TestIntegration:
     """Tests d'intégration pour le Gantt complet."""
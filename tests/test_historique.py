@@ -0,0 +1,104 @@
+"""
+Tests pour l'historique des durées en versions persistantes.
+"""
+
+import random
+
+import pytest
+
+from historique import BRANCHES, Historique, VecteurPersistant
+
+
+class TestVecteurPersistant:
+    """Tests pour le vecteur persistant."""
+
+    @pytest.mark.parametrize("taille", [0, 1, BRANCHES, BRANCHES + 1, BRANCHES ** 2 + 3])
+    def test_lecture_et_remplacement(self, taille):
+        """Test que le vecteur se lit comme une liste et qu'un remplacement ne modifie pas l'original."""
+        valeurs = list(range(taille))
+        vecteur = VecteurPersistant.depuis(valeurs)
+        assert list(vecteur) == valeurs
+        assert len(vecteur) == taille
+
+        hasard = random.Random(taille)
+        version = vecteur
+        for _ in range(30 if taille else 0):
+            index = hasard.randrange(taille)
+            valeurs[index] = hasard.randint(0, 100)
+            version = version.remplacer(index, valeurs[index])
+
+        assert [version[index] for index in range(taille)] == valeurs
+        assert list(vecteur) == list(range(taille))
+
+    def test_indice_hors_du_vecteur(self):
+        """Test qu'un indice hors du vecteur lève une IndexError."""
+        vecteur = VecteurPersistant.depuis([1, 2])
+        with pytest.raises(IndexError):
+            vecteur[2]
+        with pytest.raises(IndexError):
+            vecteur.remplacer(2, 0)
+        assert vecteur[-1] == 2
+
+    def test_partage_des_noeuds(self):
+        """Test qu'une modification ne recopie que le chemin vers la valeur modifiée."""
+        vecteur = VecteurPersistant.depuis(list(range(BRANCHES ** 2)))
+        version = vecteur.remplacer(5, -1)
+
+        communs = {id(noeud) for noeud in vecteur.noeuds()} & {id(noeud) for noeud in version.noeuds()}
+        assert len(communs) == len(list(vecteur.noeuds())) - 2  # racine et feuille recopiées
+
+
+class TestHistorique:
+    """Tests pour l'annulation et le rétablissement."""
+
+    def test_annuler_retablir(self):
+        """Test le parcours des versions et l'abandon des versions rétablissables."""
+        historique = Historique([3, 6, 8])
+        assert not historique.enregistrer([3, 6, 8])
+        assert historique.enregistrer([3, 7, 8])
+        assert historique.enregistrer([4, 7, 8])
+
+        assert list(historique.annuler()) == [3, 7, 8]
+        assert list(historique.annuler()) == [3, 6, 8]
+        assert not historique.peut_annuler
+        assert list(historique.retablir()) == [3, 7, 8]
+
+        historique.enregistrer([3, 7, 9])
+        assert not historique.peut_retablir
+        assert len(historique.versions) == 3
+        with pytest.raises(IndexError):
+            historique.retablir()
+
+    def test_nombre_de_valeurs(self):
+        """Test qu'une version d'une autre taille lève une ValueError."""
+        with pytest.raises(ValueError):
+            Historique([1, 2]).enregistrer([1, 2, 3])
+
+    def test_max_versions(self):
+        """Test que les versions les plus anciennes sont oubliées au-delà de max_versions."""
+        historique = Historique([0], max_versions=5)
+        for duree in range(1, 10):
+            historique.enregistrer([duree])
+
+        assert [version[0] for version in historique.versions] == [5, 6, 7, 8, 9]
+        assert historique.position == 4
+
+    def test_memoire_proportionnelle_aux_modifications(self):
+        """Test que des centaines de versions ne coûtent que les nœuds modifiés, pas des copies complètes."""
+        phases = 40
+        historique = Historique([4] * phases)
+        hasard = random.Random(0)
+        durees = [4] * phases
+        for _ in range(300):
+            durees[hasard.randrange(phases)] += 1
+            historique.enregistrer(durees)
+
+        noeuds = {id(noeud): noeud for version in historique.versions for noeud in version.noeuds()}
+        valeurs_stockees = sum(len(noeud) for noeud in noeuds.values())
+        profondeur = 2  # 40 phases : racine et feuilles
+        assert valeurs_stockees <= phases + 300 * profondeur * BRANCHES
+        assert valeurs_stockees < 301 * phases / 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""
+Tests pour la décomposition des phases en lots.
+"""
+
+import pandas as pd
+import pytest
+
+from avancement import dates_reelles
+from config import CODES_ETATS, ETAT_AUDIT_NON_EFFECTUE
+from gantt import appliquer_avancement, generer_figure_gantt, generer_phases, generer_taches
+from lots import arborescence, cle_lots, developper_lots, enchainer_lots, libelle_lot
+from modeles_phases import compiler_modele
+
+DEBUT = "2026-01-05"
+DET = "🚧 DET - Direction Exécution Travaux"
+
+
+def modele_avec_lots(lots, duree=6):
+    phases = [
+        {"nom": "📝 Études", "groupe": "MOE", "duree": 4, "duree_min": 1, "modifiable": True,
+         "delai_mo": 1, "etats": list(CODES_ETATS)},
+        {"nom": DET, "groupe": "MOE", "duree": duree, "duree_min": 1, "modifiable": True,
+         "delai_mo": 0, "etats": list(CODES_ETATS), "lots": lots},
+    ]
+    return compiler_modele({"phases": phases})
+
+
+LOTS = [
+    {"nom": "Gros œuvre", "duree": 2},
+    {"nom": "CVC", "duree": 3, "apres": ["Gros œuvre"],
+     "lots": [{"nom": "Chaufferie", "duree": 2}, {"nom": "Ventilation", "duree": 1, "apres": ["Chaufferie"]}]},
+    {"nom": "Menuiseries", "duree": 1, "apres": ["Gros œuvre"], "decalage": 1},
+    {"nom": "Finitions", "duree": 2, "apres": ["CVC", "Menuiseries"]},
+]
+
+
+@pytest.fixture
+def phases():
+    return modele_avec_lots(LOTS).phases_etat(ETAT_AUDIT_NON_EFFECTUE)
+
+
+class TestEnchainement:
+    """Tests pour les dates des lots."""
+
+    def test_apres_et_decalage(self, phases):
+        """Test qu'un lot suit la fin la plus tardive de ses prédécesseurs, plus son décalage."""
+        debut = pd.Timestamp(DEBUT)
+        dates = {lot["nom"]: (depart, fin) for lot, depart, fin in enchainer_lots(phases[1]["lots"], debut)}
+
+        semaine = pd.Timedelta(weeks=1)
+        assert dates["Gros œuvre"] == (debut, debut + 2 * semaine)
+        assert dates["CVC"] == (debut + 2 * semaine, debut + 5 * semaine)
+        assert dates["Menuiseries"] == (debut + 3 * semaine, debut + 4 * semaine)
+        assert dates["Finitions"] == (debut + 5 * semaine, debut + 7 * semaine)
+
+
+class TestDevelopperLots:
+    """Tests pour le développement des lots sous leur phase."""
+
+    def test_replie_inchange(self, phases):
+        """Test que sans ligne développée les tâches sont retournées telles quelles."""
+        taches = generer_taches(phases, DEBUT)
+
+        assert developper_lots(taches, phases, ()) is taches
+        assert developper_lots(taches, phases, ["📝 Études"]) is taches
+
+    def test_lots_sous_leur_phase(self, phases):
+        """Test que les lots d'une phase développée sont insérés juste après elle, sous-lots repliés."""
+        taches = generer_taches(phases, DEBUT)
+
+        developpees = developper_lots(taches, phases, [DET])
+
+        assert len(developpees) == len(taches) + 4
+        position = developpees.index[developpees["Task"] == DET][0]
+        assert developpees["Task"][position + 1:position + 5].tolist() == [
+            libelle_lot(nom, 1) for nom in ["Gros œuvre", "CVC", "Menuiseries", "Finitions"]]
+        assert (developpees.loc[position + 1:position + 4, "Type"] == "Lot").all()
+        assert developpees.loc[position + 1, "Start"] == developpees.loc[position, "Start"]
+        assert "Finit après son parent" in developpees.loc[position + 4, "Definition"]
+        assert developpees.loc[position + 1, "Duration_weeks"] == 2
+
+    def test_sous_lots(self, phases):
+        """Test qu'un lot développé montre ses sous-lots, seulement si sa phase est développée."""
+        taches = generer_taches(phases, DEBUT)
+
+        assert developper_lots(taches, phases, ["CVC"]) is taches
+        developpees = developper_lots(taches, phases, [DET, "CVC"])
+
+        taches_lots = developpees["Task"].tolist()
+        position = taches_lots.index(libelle_lot("CVC", 1))
+        assert taches_lots[position + 1:position + 3] == [libelle_lot("Chaufferie", 2), libelle_lot("Ventilation", 2)]
+        assert developpees["Start"][position + 1] == developpees["Start"][position]
+
+    def test_lots_reprevus(self, phases):
+        """Test que les lots d'une phase reprévue suivent son début, avec leur prévu initial."""
+        reels = dates_reelles({"📝 Études": {"debut": "2026-03-02", "fin": "2026-04-06"}})
+        taches = appliquer_avancement(generer_taches(phases, DEBUT), reels)
+
+        developpees = developper_lots(taches, phases, [DET])
+
+        lot = developpees[developpees["Task"] == libelle_lot("Gros œuvre", 1)].iloc[0]
+        phase = developpees[developpees["Task"] == DET].iloc[0]
+        assert lot["Start"] == phase["Start"]
+        assert lot["Start prévu"] == phase["Start prévu"]
+        assert lot["Glissement (j)"] == (phase["Start"] - phase["Start prévu"]).days
+
+    def test_charge_utile_repliee(self):
+        """Test que la figure repliée n'embarque rien des lots du modèle par défaut."""
+        phases = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+        taches = generer_taches(phases, DEBUT)
+
+        replie = generer_figure_gantt(developper_lots(taches, phases, ())).to_json()
+        developpe = generer_figure_gantt(developper_lots(taches, phases, [DET])).to_json()
+
+        assert "Gros œuvre" not in replie
+        assert "Gros œuvre" in developpe
+        assert len(replie) < len(developpe)
+
+
+class TestArborescence:
+    """Tests pour la liste des lignes développables."""
+
+    def test_phases_et_lots_decomposables(self, phases):
+        """Test que seules les phases et les lots ayant des sous-tâches sont proposés, avec leur profondeur."""
+        assert arborescence(phases) == [(DET, 0, 4), ("CVC", 1, 2)]
+
+    def test_cle_lots(self, phases):
+        """Test que la clé des lots change avec les lignes développées et la définition des lots."""
+        autres = modele_avec_lots(LOTS[:2]).phases_etat(ETAT_AUDIT_NON_EFFECTUE)
+
+        assert cle_lots(phases, [DET, "CVC"]) == cle_lots(phases, ["CVC", DET])
+        assert cle_lots(phases, [DET]) != cle_lots(autres, [DET])
+        hash(cle_lots(phases, [DET]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""
+Tests pour les métriques Prometheus de l'application.
+"""
+
+import urllib.request
+
+import pytest
+
+from metriques import DUREE_ETAPES, EXECUTIONS, Registre, enregistrer_execution
+from profilage import Profileur, etape
+
+
+class TestFormat:
+    """Tests pour le format d'exposition Prometheus."""
+
+    def test_compteur_avec_etiquettes(self):
+        """Test qu'un compteur expose une série par valeur d'étiquette."""
+        registre = Registre()
+        clics = registre.compteur("clics_total", "Clics", ("bouton",))
+        clics.inc(bouton="generer")
+        clics.inc(2, bouton="generer")
+        clics.inc(bouton="export_ics")
+
+        texte = registre.exposition()
+
+        assert "# TYPE clics_total counter" in texte
+        assert 'clics_total{bouton="generer"} 3' in texte
+        assert 'clics_total{bouton="export_ics"} 1' in texte
+
+    def test_histogramme_cumule(self):
+        """Test que les seuils d'un histogramme sont cumulés, avec somme et nombre."""
+        registre = Registre()
+        duree = registre.histogramme("duree_secondes", "Durée", seuils=(0.1, 1.0))
+        for valeur in (0.05, 0.5, 0.5, 3.0):
+            duree.observe(valeur)
+
+        lignes = registre.exposition().splitlines()
+
+        assert 'duree_secondes_bucket{le="0.1"} 1' in lignes
+        assert 'duree_secondes_bucket{le="1.0"} 3' in lignes
+        assert 'duree_secondes_bucket{le="+Inf"} 4' in lignes
+        assert "duree_secondes_sum 4.05" in lignes
+        assert "duree_secondes_count 4" in lignes
+
+    def test_echappement_etiquettes(self):
+        """Test que les guillemets et antislashs des étiquettes sont échappés."""
+        registre = Registre()
+        registre.compteur("c_total", "C", ("etape",)).inc(etape='a"b\\c')
+
+        assert r'c_total{etape="a\"b\\c"} 1' in registre.exposition()
+
+    def test_etiquettes_incorrectes(self):
+        """Test qu'une observation sans les étiquettes déclarées est refusée."""
+        compteur = Registre().compteur("c_total", "C", ("bouton",))
+        with pytest.raises(ValueError):
+            compteur.inc()
+
+    def test_compteur_decroissant_refuse(self):
+        """Test qu'un compteur ne peut pas décroître."""
+        with pytest.raises(ValueError):
+            Registre().compteur("c_total", "C").inc(-1)
+
+    def test_nom_duplique(self):
+        """Test qu'une métrique ne peut être déclarée deux fois."""
+        registre = Registre()
+        registre.compteur("c_total", "C")
+        with pytest.raises(ValueError):
+            registre.jauge("c_total", "C")
+
+    def test_jauge_calculee(self):
+        """Test qu'une jauge calculée est évaluée à l'exposition."""
+        registre = Registre()
+        registre.jauge("memoire_octets", "Mémoire", fonction=lambda: 42)
+
+        assert "memoire_octets 42" in registre.exposition()
+
+
+class TestExposition:
+    """Tests pour l'exposition par fichier et par port."""
+
+    def test_fichier(self, tmp_path):
+        """Test que l'exposition est écrite dans le fichier demandé."""
+        registre = Registre()
+        registre.compteur("c_total", "C").inc()
+        chemin = tmp_path / "gantt.prom"
+
+        registre.ecrire_fichier(chemin)
+
+        assert "c_total 1" in chemin.read_text(encoding="utf-8")
+        assert list(tmp_path.iterdir()) == [chemin]
+
+    def test_port(self):
+        """Test que /metrics est servi sur un port local."""
+        registre = Registre()
+        registre.compteur("c_total", "C").inc(5)
+        serveur = registre.exposer_sur_port(0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{serveur.server_port}/metrics") as reponse:
+                assert reponse.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert "c_total 5" in reponse.read().decode("utf-8")
+        finally:
+            serveur.shutdown()
+            serveur.server_close()
+
+
+class TestEnregistrementExecution:
+    """Tests pour le report des exécutions profilées."""
+
+    def test_execution_profilee(self):
+        """Test qu'une exécution incrémente le compteur et observe ses étapes."""
+        avant = EXECUTIONS.valeur(portee="app")
+        with Profileur() as profileur:
+            with etape("taches"):
+                pass
+
+        enregistrer_execution(profileur, nb_taches=12)
+
+        assert EXECUTIONS.valeur(portee="app") == avant + 1
+        assert ("taches",) in DUREE_ETAPES._series
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
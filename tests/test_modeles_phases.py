@@ -0,0 +1,188 @@
+"""
+Tests pour les modèles de phases déclaratifs.
+"""
+
+import json
+import os
+
+import pytest
+
+from config import (
+    CODES_ETATS,
+    ETAT_AUDIT_EFFECTUE,
+    ETAT_EQUIPE_SELECTIONNEE,
+    ETATS,
+    GLOSSAIRE,
+    MODELE_PHASES_PATH,
+)
+from gantt import generer_phases
+from modeles_phases import charger_modele, compiler_modele, lire_modele
+
+
+def phase(**champs):
+    return {"nom": "📝 Phase", "groupe": "MOE", "duree": 4, "duree_min": 1, "modifiable": True,
+            "delai_mo": 0, "etats": list(CODES_ETATS), **champs}
+
+
+def ecrire_modele(chemin, phases):
+    chemin.write_text(json.dumps({"version": 1, "phases": phases}, ensure_ascii=False), encoding="utf-8")
+    return chemin
+
+
+class TestModeleParDefaut:
+    """Tests pour le modèle livré avec l'application."""
+
+    def test_modele_valide(self):
+        """Test que le modèle par défaut se compile."""
+        modele = charger_modele(MODELE_PHASES_PATH)
+
+        assert set(modele.par_etat) == set(ETATS)
+        assert all(modele.par_etat[etat] for etat in ETATS)
+
+    @pytest.mark.parametrize("etat", ETATS)
+    def test_phases_dans_l_ordre_des_groupes(self, etat):
+        """Test que les phases de chaque état sont dans l'ordre chronologique des catégories."""
+        ordre = ["Études préalables", "AMO", "Sélection MOE", "MOE"]
+        groupes = [ordre.index(p["groupe"]) for p in generer_phases(etat)]
+
+        assert groupes == sorted(groupes)
+
+    def test_copies_independantes(self):
+        """Test que modifier les phases retournées n'altère pas le modèle compilé."""
+        phases = generer_phases(ETAT_EQUIPE_SELECTIONNEE)
+        phases[0]["duree"] = 99
+
+        assert generer_phases(ETAT_EQUIPE_SELECTIONNEE)[0]["duree"] != 99
+
+    def test_definitions_resolues(self):
+        """Test que les définitions du glossaire sont résolues à la compilation."""
+        modele = compiler_modele({"phases": [phase(code="APS"), phase(nom="📝 Sans code")]})
+
+        aps, sans_code = modele.phases_etat(ETAT_AUDIT_EFFECTUE)
+        assert aps["definition"] == GLOSSAIRE["APS"]
+        assert sans_code["definition"] == ""
+
+    def test_etat_inconnu(self):
+        """Test qu'un état inconnu lève une ValueError."""
+        with pytest.raises(ValueError):
+            generer_phases("État inconnu")
+
+
+class TestValidation:
+    """Tests pour la validation des modèles."""
+
+    @pytest.mark.parametrize("champs, message", [
+        ({"groupe": "Chantier"}, "groupe inconnu"),
+        ({"etats": ["audit_fait"]}, "etats"),
+        ({"etats": []}, "etats"),
+        ({"duree": 1, "duree_min": 3}, "minimum"),
+        ({"duree": True}, "type invalide"),
+        ({"delai_mo": -1}, "positif"),
+        ({"couleur": "red"}, "champs inconnus"),
+    ])
+    def test_phase_invalide(self, champs, message):
+        """Test qu'une phase invalide est signalée avec sa position."""
+        with pytest.raises(ValueError, match=message) as erreur:
+            compiler_modele({"phases": [phase(nom="📝 A"), phase(nom="📝 B", **champs)]})
+        assert "phase n°2" in str(erreur.value)
+
+    def test_champ_manquant(self):
+        """Test qu'un champ obligatoire manquant est signalé."""
+        incomplete = phase()
+        del incomplete["duree_min"]
+        with pytest.raises(ValueError, match="manquants"):
+            compiler_modele({"phases": [incomplete]})
+
+    def test_noms_en_double(self):
+        """Test que deux phases ne peuvent porter le même nom."""
+        with pytest.raises(ValueError, match="double"):
+            compiler_modele({"phases": [phase(), phase()]})
+
+    def test_etat_sans_phase(self):
+        """Test que chaque état doit avoir au moins une phase."""
+        with pytest.raises(ValueError, match="audit_effectue"):
+            compiler_modele({"phases": [phase(etats=["audit_non_effectue"])]})
+
+    @pytest.mark.parametrize("lots, message", [
+        ([{"nom": "A", "duree": 2, "apres": ["B"]}, {"nom": "B", "duree": 1}], "déclarés avant"),
+        ([{"nom": "A", "duree": -1}], "positifs"),
+        ([{"nom": "A"}], "manquants"),
+        ([{"nom": "A", "duree": 1, "couleur": "red"}], "champs inconnus"),
+        ([{"nom": "A", "duree": 1, "lots": [{"nom": "B", "duree": "2"}]}], "lot n°1 .*lot n°1"),
+        ([{"nom": "A", "duree": 1}, {"nom": "📝 A", "duree": 1}], "lots en double"),
+    ])
+    def test_lots_invalides(self, lots, message):
+        """Test que les lots sont validés, sous-lots compris."""
+        with pytest.raises(ValueError, match=message):
+            compiler_modele({"phases": [phase(nom="📝 A"), phase(nom="📝 B", lots=lots)]})
+
+    def test_lots_compiles_en_lecture_seule(self):
+        """Test que les lots compilés sont partagés en lecture seule par les copies des phases."""
+        modele = compiler_modele({"phases": [phase(lots=[{"nom": "Gros œuvre", "duree": 2}])]})
+
+        lot = modele.phases_etat(ETAT_AUDIT_EFFECTUE)[0]["lots"][0]
+        assert lot["apres"] == () and lot["decalage"] == 0 and lot["lots"] == ()
+        with pytest.raises(TypeError):
+            lot["duree"] = 3
+
+    def test_code_absent_du_glossaire(self):
+        """Test qu'un code de phase doit exister dans le glossaire."""
+        with pytest.raises(ValueError, match="glossaire"):
+            compiler_modele({"phases": [phase(code="XYZ")]})
+
+    def test_version_inconnue(self):
+        """Test qu'une version de modèle inconnue est refusée."""
+        with pytest.raises(ValueError, match="version"):
+            compiler_modele({"version": 2, "phases": [phase()]})
+
+    def test_format_non_pris_en_charge(self, tmp_path):
+        """Test qu'une extension inconnue est refusée."""
+        chemin = tmp_path / "modele.toml"
+        chemin.write_text("", encoding="utf-8")
+        with pytest.raises(ValueError, match="format"):
+            lire_modele(chemin)
+
+
+class TestChargement:
+    """Tests pour le chargement et le cache des modèles."""
+
+    def test_cache(self, tmp_path):
+        """Test qu'un fichier inchangé n'est compilé qu'une fois."""
+        chemin = ecrire_modele(tmp_path / "modele.json", [phase()])
+
+        assert charger_modele(chemin) is charger_modele(chemin)
+
+    def test_invalidation_par_date_de_modification(self, tmp_path):
+        """Test qu'un fichier modifié est recompilé."""
+        chemin = ecrire_modele(tmp_path / "modele.json", [phase(duree=4)])
+        premier = charger_modele(chemin)
+
+        ecrire_modele(chemin, [phase(duree=5)])
+        statut = os.stat(chemin)
+        os.utime(chemin, ns=(statut.st_atime_ns, statut.st_mtime_ns + 1_000_000_000))
+        second = charger_modele(chemin)
+
+        assert second is not premier
+        assert second.phases[0]["duree"] == 5
+
+    def test_modele_yaml(self, tmp_path):
+        """Test qu'un modèle YAML est chargé comme un modèle JSON."""
+        yaml = pytest.importorskip("yaml")
+        chemin = tmp_path / "modele.yaml"
+        chemin.write_text(yaml.safe_dump({"phases": [phase(nom="📝 Travaux")]}, allow_unicode=True), encoding="utf-8")
+
+        assert [p["nom"] for p in charger_modele(chemin).phases_etat(ETAT_AUDIT_EFFECTUE)] == ["📝 Travaux"]
+
+    def test_modele_d_organisation(self, tmp_path, monkeypatch):
+        """Test que GANTT_MODELE_PHASES remplace le modèle par défaut."""
+        chemin = ecrire_modele(tmp_path / "organisation.json", [phase(nom="📝 Travaux", code="EXE")])
+        monkeypatch.setenv("GANTT_MODELE_PHASES", str(chemin))
+
+        phases = generer_phases(ETAT_AUDIT_EFFECTUE)
+
+        assert [p["nom"] for p in phases] == ["📝 Travaux"]
+        assert phases[0]["code"] == "EXE"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
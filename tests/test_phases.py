@@ -188,8 +188,7 @@ class TestGenererTaches:
         
         # Vérifier que les tâches ESQ ne sont pas présentes
         taches = df["Task"].tolist()
-        # Filtrer les tâches qui commencent par ESQ (pas juste qui contiennent ESQ)
-        taches_esq = [tache for tache in taches if tache.startswith("ESQ")]
+        taches_esq = [tache for tache in taches if "ESQ - " in tache]
         assert len(taches_esq) == 0
         
     def test_delais_mo_dans_taches(self):
@@ -303,6 +302,19 @@ class TestFormatGantt:
         # Vérifier que les hover_def contiennent les durées
         assert all("semaines" in str(definition) for definition in df["hover_def"])
 
+    def test_definitions_des_phases_moe(self):
+        """Test que chaque phase MOE du Gantt porte sa définition du glossaire."""
+        etat = "Nous venons de sélectionner notre équipe de maitrise d'oeuvre"
+        phases = generer_phases(etat)
+        start_date = datetime(2023, 1, 1)
+
+        df = generer_taches(phases, start_date)
+
+        moe = df[(df["Groupe"] == "MOE") & (df["Type"] == "Phase")]
+        assert (moe["Definition"] != "").all()
+        apd = moe[moe["Task"].str.contains("APD - ")].iloc[0]
+        assert apd["hover_def"].startswith("Déterminer surfaces détaillées")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
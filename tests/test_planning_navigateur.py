@@ -0,0 +1,87 @@
+"""
+Tests pour le composant de recalcul du planning dans le navigateur.
+"""
+
+import json
+import random
+import shutil
+import subprocess
+
+import pandas as pd
+import pytest
+
+from config import ETAT_AUDIT_NON_EFFECTUE, ETAT_EQUIPE_SELECTIONNEE
+from gantt import generer_phases, generer_taches
+from planning_navigateur import DOSSIER_COMPOSANT, durees_modifiees, gabarit_navigateur
+
+DEBUT = "2026-01-05"
+
+# Enchaînement JavaScript du composant, exécuté par Node : {gabarit, durees} sur l'entrée standard
+SCRIPT_NODE = """
+const {enchainer} = require(process.argv[1]);
+let entree = "";
+process.stdin.on("data", (morceau) => entree += morceau);
+process.stdin.on("end", () => {
+  const {gabarit, durees} = JSON.parse(entree);
+  process.stdout.write(JSON.stringify(enchainer(gabarit, durees)));
+});
+"""
+
+
+def enchainer_navigateur(gabarit, durees):
+    sortie = subprocess.run(
+        ["node", "-e", SCRIPT_NODE, str(DOSSIER_COMPOSANT / "planning.js")],
+        input=json.dumps({"gabarit": gabarit, "durees": durees}), capture_output=True, text=True, check=True,
+    )
+    return json.loads(sortie.stdout)
+
+
+class TestGabarit:
+    """Tests pour le gabarit envoyé au composant."""
+
+    def test_json(self):
+        """Test que le gabarit est sérialisable et ne garde que les champs de l'enchaînement."""
+        phases = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+        gabarit = json.loads(json.dumps(gabarit_navigateur(phases, DEBUT)))
+
+        assert pd.Timestamp(gabarit["debut"], unit="ms") == pd.Timestamp(DEBUT)
+        assert len(gabarit["phases"]) == len(phases)
+        assert set(gabarit["phases"][0]) == {"nom", "groupe", "duree", "duree_min", "modifiable", "delai_mo", "gantt"}
+        assert gabarit_navigateur(phases, DEBUT, include_financement=False)["financement"] is None
+
+    def test_durees_modifiees(self):
+        """Test que seules les durées modifiées de phases connues sont retenues."""
+        phases = generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+        durees = {phase["nom"]: phase["duree"] for phase in phases}
+        durees[phases[0]["nom"]] += 3
+        durees["Phase inconnue"] = 4
+
+        assert durees_modifiees({"durees": durees}, phases) == {phases[0]["nom"]: phases[0]["duree"] + 3}
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js absent")
+class TestParite:
+    """Tests que le navigateur enchaîne les phases comme le serveur."""
+
+    @pytest.mark.parametrize("etat, include_financement", [
+        (ETAT_AUDIT_NON_EFFECTUE, True), (ETAT_EQUIPE_SELECTIONNEE, False),
+    ])
+    def test_memes_dates(self, etat, include_financement):
+        """Test que des durées quelconques donnent les mêmes tâches et les mêmes dates des deux côtés."""
+        phases = generer_phases(etat)
+        hasard = random.Random(0)
+        durees = {phase["nom"]: phase["duree_min"] + hasard.randint(0, 12) for phase in phases if phase["modifiable"]}
+
+        taches = enchainer_navigateur(gabarit_navigateur(phases, DEBUT, include_financement, 9), durees)
+
+        for phase in phases:
+            phase["duree"] = durees.get(phase["nom"], phase["duree"])
+        attendues = generer_taches(phases, DEBUT, include_financement, 9)
+        assert [tache["tache"] for tache in taches] == attendues["Task"].tolist()
+        assert [tache["type"] for tache in taches] == attendues["Type"].tolist()
+        assert [pd.Timestamp(tache["debut"], unit="ms") for tache in taches] == attendues["Start"].tolist()
+        assert [pd.Timestamp(tache["fin"], unit="ms") for tache in taches] == attendues["Finish"].tolist()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
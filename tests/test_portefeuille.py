@@ -0,0 +1,287 @@
+"""
+Tests pour les analyses de portefeuille.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import PORTEFEUILLE_EXEMPLE_PATH
+from gantt import generer_portefeuille
+from portefeuille import (
+    IndexIntervalles,
+    detecter_conflits,
+    figure_conflits,
+    figure_occupation,
+    lire_portefeuille,
+    occupation_hebdomadaire,
+)
+
+DET = "🚧 DET - Direction Exécution Travaux"
+
+
+def taches(*lignes, type_="Phase"):
+    """Table de tâches minimale : (tâche, début, fin)."""
+    return pd.DataFrame({
+        "Task": [tache for tache, _, _ in lignes],
+        "Type": type_,
+        "Start": pd.to_datetime([debut for _, debut, _ in lignes]),
+        "Finish": pd.to_datetime([fin for _, _, fin in lignes]),
+    })
+
+
+@pytest.fixture(scope="module")
+def portefeuille_exemple():
+    return generer_portefeuille(lire_portefeuille(PORTEFEUILLE_EXEMPLE_PATH.read_bytes()))
+
+
+class TestLecturePortefeuille:
+    """Tests pour la lecture des portefeuilles JSON."""
+
+    def test_liste_ou_objet(self):
+        """Test que les deux formats de l'API sont acceptés."""
+        projet = {"nom": "A", "etat": "x", "start_date": "2026-01-05"}
+        assert lire_portefeuille(b'[{"nom": "A", "etat": "x", "start_date": "2026-01-05"}]') == [projet]
+        assert lire_portefeuille('{"projets": [{"nom": "A", "etat": "x", "start_date": "2026-01-05"}]}') == [projet]
+
+    @pytest.mark.parametrize("contenu", ['{"batiments": []}', '[1, 2]', '"texte"', "{"])
+    def test_format_invalide(self, contenu):
+        """Test qu'un contenu qui n'est pas une liste de projets lève une ValueError."""
+        with pytest.raises(ValueError):
+            lire_portefeuille(contenu)
+
+
+class TestOccupationHebdomadaire:
+    """Tests pour le comptage hebdomadaire par tableau de différences."""
+
+    def test_semaines_recouvertes(self):
+        """Test qu'une tâche compte dans chaque semaine qu'elle recouvre, fin exclue."""
+        occupation = occupation_hebdomadaire(taches(
+            ("DET", "2026-01-07", "2026-01-20"),  # mercredi -> mardi deux semaines plus tard
+            ("DET", "2026-01-12", "2026-01-19"),  # exactement la semaine du 12
+        ))
+
+        assert list(occupation.index.strftime("%Y-%m-%d")) == ["2026-01-05", "2026-01-12", "2026-01-19"]
+        assert occupation["DET"].tolist() == [1, 2, 1]
+
+    def test_duree_nulle_ignoree(self):
+        """Test que les tâches de durée nulle ne comptent pas."""
+        occupation = occupation_hebdomadaire(taches(
+            ("DET", "2026-01-05", "2026-01-12"),
+            ("Décision", "2026-01-12", "2026-01-12"),
+        ))
+
+        assert list(occupation.columns) == ["DET"]
+
+    def test_types_filtres(self):
+        """Test que seules les tâches des types demandés comptent."""
+        df = pd.concat([
+            taches(("DET", "2026-01-05", "2026-01-12")),
+            taches(("DET", "2026-01-05", "2026-01-12"), type_="Délai MO"),
+        ])
+
+        assert occupation_hebdomadaire(df)["DET"].tolist() == [1]
+        assert occupation_hebdomadaire(df, types=("Phase", "Délai MO"))["DET"].tolist() == [2]
+
+    def test_periode(self):
+        """Test que la période retient les semaines qui la recouvrent."""
+        occupation = occupation_hebdomadaire(
+            taches(("DET", "2026-01-05", "2026-03-02")), debut="2026-01-14", fin="2026-01-26",
+        )
+
+        assert list(occupation.index.strftime("%Y-%m-%d")) == ["2026-01-12", "2026-01-19", "2026-01-26"]
+
+    def test_vide(self):
+        """Test qu'une table sans tâche donne une occupation vide."""
+        assert occupation_hebdomadaire(taches()).empty
+
+    def test_conforme_au_comptage_direct(self, portefeuille_exemple):
+        """Test que le résultat égale un comptage semaine par semaine."""
+        occupation = occupation_hebdomadaire(portefeuille_exemple)
+        phases = portefeuille_exemple[
+            (portefeuille_exemple["Type"] == "Phase")
+            & (portefeuille_exemple["Finish"] > portefeuille_exemple["Start"])
+        ]
+
+        for lundi, ligne in occupation.iterrows():
+            en_cours = phases[(phases["Start"] < lundi + pd.Timedelta(days=7)) & (phases["Finish"] > lundi)]
+            attendu = en_cours.groupby("Task").size().reindex(occupation.columns, fill_value=0)
+            assert ligne.tolist() == attendu.tolist()
+
+    def test_figure(self, portefeuille_exemple):
+        """Test que le graphique empile une trace par phase."""
+        occupation = occupation_hebdomadaire(portefeuille_exemple)
+
+        fig = figure_occupation(occupation)
+
+        assert len(fig.data) == len(occupation.columns)
+
+
+class TestIndexIntervalles:
+    """Tests pour l'index d'intervalles."""
+
+    @pytest.mark.parametrize(
+        "nb_taches",
+        [*range(300), 511, 512, 513, 1000, *np.random.default_rng(0).integers(300, 5000, 10).tolist()],
+    )
+    def test_conforme_au_filtrage_direct(self, nb_taches):
+        """Test que les requêtes retournent exactement les tâches qui recoupent l'intervalle."""
+        rng = np.random.default_rng(nb_taches)
+        jours = rng.integers(0, 1000, nb_taches)
+        df = pd.DataFrame({
+            "Start": pd.to_datetime(jours, unit="D"),
+            "Finish": pd.to_datetime(jours + rng.integers(0, 60, nb_taches), unit="D"),
+        })
+        index = IndexIntervalles(df)
+
+        for _ in range(100):
+            debut = pd.Timestamp("1970-01-01") + pd.Timedelta(days=int(rng.integers(-10, 1070)))
+            fin = debut + pd.Timedelta(days=int(rng.integers(1, 90)))
+            attendu = df[(df["Start"] < fin) & (df["Finish"] > debut)]
+            pd.testing.assert_frame_equal(index.requete(debut, fin), attendu)
+
+    def test_sous_arbre_droit_hors_tableau(self):
+        """Test d'une tâche longue en fin de tableau, sous un nœud dont le sous-arbre droit dépasse n."""
+        jours = np.arange(42)
+        fins = jours + 1
+        fins[41] = 100  # la dernière tâche (dans l'ordre des débuts) est la seule encore en cours
+        df = pd.DataFrame({"Start": pd.to_datetime(jours, unit="D"), "Finish": pd.to_datetime(fins, unit="D")})
+        index = IndexIntervalles(df)
+
+        assert index.requete(pd.Timestamp("1970-03-01")).index.tolist() == [41]
+
+    def test_instant(self):
+        """Test qu'une requête sans fin retourne les tâches en cours à cet instant, fin exclue."""
+        df = taches(
+            ("APS", "2026-01-05", "2026-02-02"),
+            ("APD", "2026-02-02", "2026-03-30"),
+        )
+        index = IndexIntervalles(df)
+
+        assert index.requete("2026-02-02")["Task"].tolist() == ["APD"]
+        assert index.requete("2026-02-01")["Task"].tolist() == ["APS"]
+        assert index.requete("2027-01-01").empty
+
+    def test_portefeuille(self, portefeuille_exemple):
+        """Test de la question « qui est en ACT en septembre 2027 »."""
+        index = IndexIntervalles(portefeuille_exemple)
+
+        resultat = index.requete("2027-09-01", "2027-10-01")
+        act = resultat[resultat["Task"].str.contains("ACT - ") & (resultat["Type"] == "Phase")]
+
+        assert sorted(act["Projet"]) == ["Crèche des Tilleuls", "Médiathèque"]
+
+
+def chantiers(*lignes):
+    """Table de phases DET par projet : (projet, site, début, fin)."""
+    return pd.DataFrame({
+        "Projet": [projet for projet, _, _, _ in lignes],
+        "Site": [site for _, site, _, _ in lignes],
+        "Task": DET,
+        "Type": "Phase",
+        "Start": pd.to_datetime([debut for _, _, debut, _ in lignes]),
+        "Finish": pd.to_datetime([fin for _, _, _, fin in lignes]),
+    })
+
+
+class TestDetectionConflits:
+    """Tests pour la détection des chevauchements entre projets."""
+
+    def test_chevauchement_sur_un_site(self):
+        """Test qu'un conflit est signalé avec sa période de chevauchement, fin exclue."""
+        df = chantiers(
+            ("A", "Campus", "2027-01-04", "2027-03-01"),
+            ("B", "Campus", "2027-02-01", "2027-04-05"),
+            ("C", "Campus", "2027-03-01", "2027-05-03"),  # commence quand A finit
+            ("D", "Mairie", "2027-01-04", "2027-06-07"),
+            ("E", None, "2027-01-04", "2027-06-07"),
+        )
+        conflits = detecter_conflits(df)
+
+        assert conflits[["Site", "Projet A", "Projet B"]].values.tolist() == [
+            ["Campus", "A", "B"], ["Campus", "B", "C"],
+        ]
+        assert conflits["Début"].tolist() == [pd.Timestamp("2027-02-01"), pd.Timestamp("2027-03-01")]
+        assert conflits["Fin"].tolist() == [pd.Timestamp("2027-03-01"), pd.Timestamp("2027-04-05")]
+        assert conflits["Semaines"].tolist() == [4.0, 5.0]
+
+    def test_phases_et_types_filtres(self):
+        """Test que seules les phases surveillées de type Phase sont comparées."""
+        df = chantiers(
+            ("A", "Campus", "2027-01-04", "2027-03-01"),
+            ("B", "Campus", "2027-02-01", "2027-04-05"),
+        )
+        df.loc[1, "Task"] = "📝 PRO - Études de Projet"
+        assert detecter_conflits(df).empty
+        assert len(detecter_conflits(df, phases=None)) == 1
+        df.loc[1, "Type"] = "Délai MO"
+        assert detecter_conflits(df, phases=None).empty
+
+    def test_meme_projet_ignore(self):
+        """Test qu'un projet n'est pas en conflit avec lui-même."""
+        df = chantiers(
+            ("A", "Campus", "2027-01-04", "2027-03-01"),
+            ("A", "Campus", "2027-02-01", "2027-04-05"),
+        )
+        assert detecter_conflits(df).empty
+
+    @pytest.mark.parametrize("nb_projets", [0, 1, 5, 50, 300])
+    def test_conforme_a_la_comparaison_par_paires(self, nb_projets):
+        """Test que le balayage trouve exactement les paires qui se chevauchent."""
+        rng = np.random.default_rng(nb_projets)
+        debuts = rng.integers(0, 500, nb_projets)
+        df = chantiers(*(
+            (f"P{i}", f"S{rng.integers(0, 8)}", pd.Timestamp("2027-01-04") + pd.Timedelta(days=int(debut)),
+             pd.Timestamp("2027-01-04") + pd.Timedelta(days=int(debut + rng.integers(1, 80))))
+            for i, debut in enumerate(debuts)
+        ))
+        attendu = {
+            frozenset((a.Projet, b.Projet))
+            for a, b in itertools.combinations(df.itertuples(), 2)
+            if a.Site == b.Site and a.Start < b.Finish and b.Start < a.Finish
+        }
+        conflits = detecter_conflits(df)
+
+        assert len(conflits) == len(attendu)
+        assert {frozenset(paire) for paire in zip(conflits["Projet A"], conflits["Projet B"])} == attendu
+
+    def test_portefeuille(self, portefeuille_exemple):
+        """Test des conflits du portefeuille d'exemple, par site et par équipe."""
+        par_site = detecter_conflits(portefeuille_exemple, cle="Site")
+        par_equipe = detecter_conflits(portefeuille_exemple, cle="Equipe")
+
+        assert par_site[["Site", "Projet A", "Projet B"]].values.tolist() == [
+            ["Campus Jules Ferry", "École Jules Ferry - bâtiment A", "École Jules Ferry - bâtiment B"],
+            ["Centre-bourg", "Mairie", "Médiathèque"],
+        ]
+        assert par_equipe["Equipe"].tolist() == ["Atelier Lumen", "Atelier Nord"]
+
+    def test_figure(self, portefeuille_exemple):
+        """Test que chaque projet en conflit est surligné une fois par période de chevauchement."""
+        df = chantiers(
+            ("A", "Campus", "2027-01-04", "2027-03-01"),
+            ("B", "Campus", "2027-02-01", "2027-04-05"),
+            ("C", "Campus", "2027-02-15", "2027-03-15"),
+            ("D", "Mairie", "2027-01-04", "2027-06-07"),
+        )
+        conflits = detecter_conflits(df)
+        fig = figure_conflits(df, conflits)
+
+        assert len(conflits) == 3
+        assert list(fig.layout.yaxis.categoryarray) == ["D", "C", "B", "A"]  # A en haut
+        assert len(fig.layout.shapes) == 3  # A, B et C : une période fusionnée chacun
+        assert all(shape.fillcolor == "red" for shape in fig.layout.shapes)
+        # rectangle de A sur sa ligne, de son premier chevauchement (B) à sa fin
+        rectangle_a = fig.layout.shapes[0]
+        assert (rectangle_a.y0, rectangle_a.y1) == (3 - 0.45, 3 + 0.45)
+        assert (pd.Timestamp(rectangle_a.x0), pd.Timestamp(rectangle_a.x1)) == (
+            pd.Timestamp("2027-02-01"), pd.Timestamp("2027-03-01"))
+
+        conflits = detecter_conflits(portefeuille_exemple, cle="Equipe")
+        assert len(figure_conflits(portefeuille_exemple, conflits, cle="Equipe").layout.shapes) == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
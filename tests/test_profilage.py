@@ -0,0 +1,95 @@
+"""
+Tests pour l'instrumentation des étapes de génération.
+"""
+
+import json
+from datetime import date
+
+import pytest
+
+from config import ETAT_AUDIT_EFFECTUE, ETAT_AUDIT_NON_EFFECTUE
+from gantt import generer_figure_gantt, generer_phases, generer_taches
+from profilage import Profileur, etape, profileur_actif
+
+
+class TestProfileur:
+    """Tests pour le chronométrage des étapes."""
+
+    def test_etapes_imbriquees(self):
+        """Test que les étapes imbriquées sont nommées par leur chemin."""
+        with Profileur() as profileur:
+            with etape("figure"):
+                with etape("px.timeline"):
+                    pass
+
+        assert list(profileur.resume()) == ["figure/px.timeline", "figure"]
+        assert profileur.duree_totale_s >= 0
+
+    def test_cumul_des_etapes_repetees(self):
+        """Test qu'une étape répétée est cumulée sous un seul chemin."""
+        with Profileur() as profileur:
+            for _ in range(3):
+                with etape("boucle"):
+                    pass
+
+        assert len(profileur.mesures) == 3
+        assert list(profileur.resume()) == ["boucle"]
+
+    def test_sans_profileur_actif(self):
+        """Test que `etape` ne fait rien sans profileur actif."""
+        assert profileur_actif() is None
+        with etape("rien"):
+            pass
+        assert profileur_actif() is None
+
+    def test_profileur_desactive_a_la_sortie(self):
+        """Test que le profileur n'est plus actif après l'exécution."""
+        with Profileur() as profileur:
+            assert profileur_actif() is profileur
+        assert profileur_actif() is None
+
+    def test_generation_instrumentee(self):
+        """Test que le chemin de génération du Gantt publie ses étapes."""
+        with Profileur() as profileur:
+            df = generer_taches(generer_phases(ETAT_AUDIT_NON_EFFECTUE), date(2025, 1, 6))
+            generer_figure_gantt(df)
+
+        resume = profileur.resume()
+        for chemin in ("enchainement", "dataframe", "px.timeline", "bandeaux"):
+            assert chemin in resume
+
+
+class TestSorties:
+    """Tests pour les rapports du profileur."""
+
+    def test_journal_jsonl(self, tmp_path):
+        """Test qu'une ligne JSON est ajoutée par exécution."""
+        chemin = tmp_path / "profilage.jsonl"
+        for _ in range(2):
+            with Profileur() as profileur:
+                with etape("taches"):
+                    pass
+            profileur.ecrire_jsonl(chemin, etat=ETAT_AUDIT_EFFECTUE)
+
+        lignes = [json.loads(ligne) for ligne in chemin.read_text(encoding="utf-8").splitlines()]
+        assert len(lignes) == 2
+        assert lignes[0]["etat"] == ETAT_AUDIT_EFFECTUE
+        assert set(lignes[0]["etapes"]) == {"taches"}
+        assert lignes[0]["total_ms"] >= lignes[0]["etapes"]["taches"]
+
+    def test_statistiques_cprofile(self):
+        """Test que le rapport cProfile cite les fonctions exécutées."""
+        with Profileur(cprofile=True) as profileur:
+            generer_phases(ETAT_AUDIT_EFFECTUE)
+
+        assert "generer_phases" in profileur.statistiques_cprofile()
+
+    def test_sans_cprofile(self):
+        """Test qu'aucun rapport n'est produit sans cProfile."""
+        with Profileur() as profileur:
+            pass
+        assert profileur.statistiques_cprofile() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+"""
+Tests pour la génération des rapports PDF / PNG.
+"""
+
+import pytest
+
+from config import ETAT_AUDIT_NON_EFFECTUE, ETAT_EQUIPE_SELECTIONNEE, GLOSSAIRE_COMPLET
+from gantt import generer_taches_projet
+from rapports import generer_figure_rapport, generer_rapport, generer_rapports, nom_fichier
+
+PROJETS = [
+    {"nom": "École Jules Ferry", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+    {"nom": "Mairie", "etat": ETAT_EQUIPE_SELECTIONNEE, "start_date": "2026-03-02"},
+]
+
+
+class TestFigureRapport:
+    """Tests pour la figure imprimable."""
+
+    def test_glossaire_complet(self):
+        """Test que la figure contient le tableau du glossaire complet."""
+        fig = generer_figure_rapport(generer_taches_projet(PROJETS[0]), "École")
+
+        tables = [trace for trace in fig.data if trace.type == "table"]
+        assert len(tables) == 1
+        assert list(tables[0].cells.values[0]) == list(GLOSSAIRE_COMPLET)
+
+    def test_bandeaux_et_ligne_euro(self):
+        """Test que les bandeaux des catégories et la ligne € sont conservés."""
+        fig = generer_figure_rapport(generer_taches_projet(PROJETS[0]), "École")
+
+        bandeaux = [shape for shape in fig.layout.shapes if shape.type == "rect"]
+        assert len(bandeaux) == 4  # Financement, Études préalables, Sélection MOE, MOE
+        assert any(shape.type == "line" for shape in fig.layout.shapes)
+        assert any(annotation.text == "€" for annotation in fig.layout.annotations)
+
+    def test_pictogrammes_retires(self):
+        """Test que les noms des phases sont imprimés sans pictogrammes."""
+        fig = generer_figure_rapport(generer_taches_projet(PROJETS[1]), "Mairie")
+
+        noms = {nom for trace in fig.data if trace.type == "bar" for nom in trace.y}
+        assert "DET - Direction Exécution Travaux" in noms
+        assert "AOR - Assistance aux opérations de réception" in noms
+
+
+class TestNomFichier:
+    """Tests pour les noms de fichiers des rapports."""
+
+    def test_nom_fichier(self):
+        """Test que les caractères spéciaux sont remplacés."""
+        assert nom_fichier("École Jules Ferry") == "École_Jules_Ferry"
+        assert nom_fichier("Bât. A/B") == "Bât_A_B"
+        assert nom_fichier("***") == "projet"
+
+    def test_noms_en_double(self, tmp_path):
+        """Test que deux projets ne peuvent pas écrire le même fichier."""
+        with pytest.raises(ValueError, match="distincts"):
+            generer_rapports([PROJETS[1], dict(PROJETS[1])], tmp_path)
+
+    def test_format_inconnu(self, tmp_path):
+        """Test qu'un format non pris en charge est refusé."""
+        with pytest.raises(ValueError, match="Formats non pris en charge"):
+            generer_rapport(PROJETS[1], tmp_path, formats=("docx",))
+
+
+class TestRendu:
+    """Tests du rendu statique (nécessitent kaleido)."""
+
+    def test_rendu_parallele(self, tmp_path):
+        """Test que chaque projet produit son PDF et son PNG."""
+        pytest.importorskip("kaleido")
+
+        resultats = generer_rapports(PROJETS, tmp_path, formats=("pdf", "png"), processus=2)
+
+        assert list(resultats) == ["École Jules Ferry", "Mairie"]
+        for chemins in resultats.values():
+            assert [chemin.suffix for chemin in chemins] == [".pdf", ".png"]
+            assert all(chemin.stat().st_size > 0 for chemin in chemins)
+        assert resultats["Mairie"][0].read_bytes().startswith(b"%PDF")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+"""
+Tests pour les plannings de référence (instantanés Parquet, écarts, barres fantômes).
+"""
+
+import io
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from config import ETAT_AUDIT_NON_EFFECTUE
+from gantt import appliquer_durees, generer_figure_gantt, generer_phases, generer_portefeuille, generer_taches
+from references import ajouter_barres_reference, comparer_plannings, ecrire_reference, lire_reference
+
+DET = "🚧 DET - Direction Exécution Travaux"
+VISA = "📝 VISA - Visa Etudes d’Exécution"
+
+
+def planning(start_date="2026-01-05", durees=None, sans=()):
+    phases = appliquer_durees(generer_phases(ETAT_AUDIT_NON_EFFECTUE), durees)
+    return generer_taches([phase for phase in phases if phase["nom"] not in sans], start_date)
+
+
+def aller_retour(taches, **kwargs):
+    fichier = io.BytesIO()
+    ecrire_reference(taches, fichier, **kwargs)
+    fichier.seek(0)
+    return lire_reference(fichier)
+
+
+class TestInstantanes:
+    """Tests pour l'écriture et la relecture des instantanés."""
+
+    def test_aller_retour(self):
+        """Test que l'instantané restitue les tâches et ses métadonnées."""
+        df = planning()
+        horodatage = datetime(2026, 3, 12, 18, 30, tzinfo=timezone.utc)
+        reference = aller_retour(df, libelle="Délibération du 12 mars", horodatage=horodatage)
+
+        pd.testing.assert_frame_equal(reference, df[["Task", "Type", "Groupe", "Start", "Finish"]])
+        assert reference.attrs["reference"] == {
+            "version": 1, "libelle": "Délibération du 12 mars", "horodatage": "2026-03-12T18:30:00+00:00",
+        }
+
+    def test_colonnes_encodees_par_dictionnaire(self, tmp_path):
+        """Test que les colonnes de texte d'un portefeuille sont stockées encodées par dictionnaire."""
+        df = generer_portefeuille([
+            {"nom": "Mairie", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+            {"nom": "École", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-03-02"},
+        ])
+        chemin = tmp_path / "reference.parquet"
+        ecrire_reference(df, chemin)
+
+        schema = pq.read_schema(chemin)
+        assert schema.names == ["Projet", "Task", "Type", "Groupe", "Start", "Finish"]
+        for colonne in ("Projet", "Task", "Type", "Groupe"):
+            assert pa.types.is_dictionary(schema.field(colonne).type)
+        colonne_tache = pq.ParquetFile(chemin).metadata.row_group(0).column(1)
+        assert "RLE_DICTIONARY" in colonne_tache.encodings
+        assert lire_reference(chemin)["Projet"].tolist() == df["Projet"].tolist()
+
+    def test_fichier_qui_n_est_pas_une_reference(self):
+        """Test qu'un Parquet quelconque ou un fichier illisible lève une ValueError."""
+        fichier = io.BytesIO()
+        pq.write_table(pa.table({"a": [1]}), fichier)
+        fichier.seek(0)
+        with pytest.raises(ValueError, match="pas un planning de référence"):
+            lire_reference(fichier)
+        with pytest.raises(ValueError, match="illisible"):
+            lire_reference(io.BytesIO(b"pas du parquet"))
+
+
+class TestEcarts:
+    """Tests pour la comparaison d'un planning à sa référence."""
+
+    def test_planning_inchange(self):
+        """Test qu'un planning identique à sa référence n'a aucun écart."""
+        df = planning()
+        ecarts = comparer_plannings(aller_retour(df), df)
+
+        assert (ecarts["Statut"] == "inchangée").all()
+        assert (ecarts["Glissement fin (j)"] == 0).all()
+        assert ecarts["Task"].tolist() == df["Task"].tolist()
+
+    def test_glissement_et_duree(self):
+        """Test des glissements en jours et des écarts de durée en semaines."""
+        reference = aller_retour(planning())
+        ecarts = comparer_plannings(reference, planning("2026-01-19", durees={DET: 12}))
+        par_phase = ecarts[ecarts["Type"] == "Phase"].set_index("Task")
+
+        assert par_phase.loc[VISA, "Statut"] == "décalée"
+        assert par_phase.loc[VISA, "Glissement début (j)"] == 14
+        assert par_phase.loc[DET, "Statut"] == "durée modifiée"
+        assert par_phase.loc[DET, "Écart durée (sem.)"] == 4
+        assert par_phase.loc[DET, "Glissement fin (j)"] == 14 + 28
+
+    def test_taches_ajoutees_et_supprimees(self):
+        """Test qu'une phase retirée est signalée supprimée, en fin de tableau."""
+        ecarts = comparer_plannings(aller_retour(planning()), planning(sans=(VISA,)))
+
+        assert ecarts.iloc[-1][["Task", "Statut"]].tolist() == [VISA, "supprimée"]
+        assert ecarts.iloc[-1]["Groupe"] == "MOE"
+        assert pd.isna(ecarts.iloc[-1]["Glissement début (j)"])
+
+        ecarts = comparer_plannings(aller_retour(planning(sans=(VISA,))), planning())
+        assert ecarts.loc[ecarts["Task"] == VISA, "Statut"].tolist() == ["ajoutée"]
+
+    def test_portefeuille(self):
+        """Test que les tâches sont appariées projet par projet."""
+        projets = [
+            {"nom": "Mairie", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-01-05"},
+            {"nom": "École", "etat": ETAT_AUDIT_NON_EFFECTUE, "start_date": "2026-03-02"},
+        ]
+        reference = aller_retour(generer_portefeuille(projets))
+        projets[1]["start_date"] = "2026-03-09"
+        ecarts = comparer_plannings(reference, generer_portefeuille(projets))
+
+        assert set(ecarts.loc[ecarts["Projet"] == "Mairie", "Statut"]) == {"inchangée"}
+        assert set(ecarts.loc[ecarts["Projet"] == "École", "Glissement début (j)"]) == {7}
+
+
+class TestBarresReference:
+    """Tests pour les barres fantômes de la référence sur le Gantt."""
+
+    def test_barres_derriere_le_planning(self):
+        """Test que la référence est la première trace et garde l'ordre des lignes du planning actuel."""
+        reference = aller_retour(planning())
+        df = planning("2026-02-02", sans=(VISA,))
+        fig = ajouter_barres_reference(generer_figure_gantt(df), reference, libelle="Conseil de mars")
+
+        fantome = fig.data[0]
+        assert fantome.name == "Conseil de mars"
+        assert len(fantome.y) == (reference["Finish"] > reference["Start"]).sum()
+        assert list(fig.layout.yaxis.categoryarray) == list(dict.fromkeys(df["Task"])) + [VISA]
+        assert fig.layout.barmode == "overlay"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,117 @@
+"""
+Tests pour l'analyse de sensibilité de la date de fin.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from avancement import dates_reelles
+from config import ETAT_AUDIT_NON_EFFECTUE
+from gantt import appliquer_avancement, appliquer_durees, generer_phases, generer_taches
+from sensibilite import analyse_sensibilite, evaluer_scenarios, figure_tornado
+
+DEBUT = "2026-01-05"
+
+
+@pytest.fixture
+def phases():
+    return generer_phases(ETAT_AUDIT_NON_EFFECTUE)
+
+
+def phases_gantt(phases):
+    return [phase for phase in phases if phase.get("gantt", True)]
+
+
+class TestEvaluerScenarios:
+    """Tests pour l'évaluation groupée des scénarios."""
+
+    def test_identique_au_planning(self, phases):
+        """Test que chaque ligne de la matrice donne la fin du planning calculé tâche par tâche."""
+        gantt = phases_gantt(phases)
+        hasard = np.random.default_rng(0)
+        durees = np.array([[phase["duree"] for phase in gantt]] * 5) + hasard.integers(0, 4, (5, len(gantt)))
+        delais = np.array([[phase.get("delai_mo", 0) for phase in gantt]] * 5)
+
+        fins = evaluer_scenarios(phases, DEBUT, durees, delais)
+
+        for ligne, fin in zip(durees, fins):
+            modifiees = [dict(phase, duree=int(duree)) for phase, duree in zip(gantt, ligne)]
+            assert generer_taches(modifiees, DEBUT)["Finish"].max() == fin
+
+    @pytest.mark.parametrize("fin_connue", [True, False])
+    def test_identique_a_la_reprevision(self, phases, fin_connue):
+        """Test que les dates réelles sont prises en compte comme par `avancement.reprevoir`."""
+        gantt = phases_gantt(phases)
+        reels = dates_reelles({
+            gantt[2]["nom"]: {"debut": "2026-05-01", "fin": "2026-09-01"},
+            gantt[4]["nom"]: {"debut": "2026-12-01", "fin": "2027-02-15" if fin_connue else None},
+        })
+        durees = [[phase["duree"] for phase in gantt]]
+        delais = [[phase.get("delai_mo", 0) for phase in gantt]]
+
+        fin = evaluer_scenarios(phases, DEBUT, durees, delais, reels=reels)[0]
+
+        assert appliquer_avancement(generer_taches(phases, DEBUT), reels)["Finish"].max() == fin
+
+
+class TestAnalyseSensibilite:
+    """Tests pour le tableau de sensibilité."""
+
+    def test_ecarts_et_tri(self, phases):
+        """Test que les écarts suivent la variation des durées et que le tableau est trié par amplitude."""
+        sensibilite = analyse_sensibilite(phases, DEBUT, variation=0.25)
+        gantt = phases_gantt(phases)
+
+        assert len(sensibilite) == len(gantt) + sum(phase.get("delai_mo", 0) > 0 for phase in gantt)
+        assert sensibilite["Amplitude (j)"].is_monotonic_decreasing
+        assert pd.Timestamp(sensibilite.attrs["fin"]) == generer_taches(phases, DEBUT)["Finish"].max()
+        hausse = sensibilite["Haute"] - sensibilite["Actuelle"]
+        np.testing.assert_allclose(sensibilite["Écart haut (j)"], hausse * 7)
+
+    def test_duree_minimum(self, phases):
+        """Test que la baisse d'une durée s'arrête au minimum de la phase."""
+        phase = next(phase for phase in phases if phase["modifiable"] and phase["duree_min"] > 0)
+        appliquer_durees(phases, {phase["nom"]: phase["duree_min"]})
+
+        sensibilite = analyse_sensibilite(phases, DEBUT, variation=0.5)
+
+        ligne = sensibilite[(sensibilite["Phase"] == phase["nom"]) & (sensibilite["Paramètre"] == "Durée")].iloc[0]
+        assert ligne["Basse"] == phase["duree_min"]
+        assert ligne["Écart bas (j)"] == 0
+
+    def test_phases_terminees_sans_effet(self, phases):
+        """Test que les phases avant la dernière phase terminée ne déplacent plus la fin."""
+        gantt = phases_gantt(phases)
+        reels = dates_reelles({gantt[5]["nom"]: {"debut": "2026-09-01", "fin": "2026-11-02"}})
+
+        sensibilite = analyse_sensibilite(phases, DEBUT, reels=reels).set_index(["Phase", "Paramètre"])
+
+        for phase in gantt[:6]:
+            assert sensibilite.loc[(phase["nom"], "Durée"), "Amplitude (j)"] == 0
+        assert sensibilite.loc[(gantt[6]["nom"], "Durée"), "Amplitude (j)"] > 0
+
+    @pytest.mark.parametrize("variation", [0, 1, -0.1])
+    def test_variation_invalide(self, phases, variation):
+        """Test qu'une variation hors de ]0, 1[ lève une ValueError."""
+        with pytest.raises(ValueError):
+            analyse_sensibilite(phases, DEBUT, variation=variation)
+
+
+class TestFigureTornado:
+    """Tests pour le diagramme en tornade."""
+
+    def test_barres(self, phases):
+        """Test que la tornade montre baisse et hausse, le paramètre le plus influent en haut."""
+        sensibilite = analyse_sensibilite(phases, DEBUT)
+        fig = figure_tornado(sensibilite, nombre=5)
+
+        assert [trace.name for trace in fig.data] == ["Paramètre en baisse", "Paramètre en hausse"]
+        assert len(fig.data[0].y) == 5
+        assert fig.data[1].y[-1] == f"{sensibilite['Phase'][0]} — {sensibilite['Paramètre'][0]}"
+        assert all(x <= 0 for x in fig.data[0].x) and all(x >= 0 for x in fig.data[1].x)
+        assert pd.Timestamp(sensibilite.attrs["fin"]).strftime("%d/%m/%Y") in fig.layout.title.text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
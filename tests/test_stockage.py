@@ -0,0 +1,104 @@
+"""
+Tests pour le stockage des plannings au format Arrow IPC.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from config import PORTEFEUILLE_EXEMPLE_PATH
+from gantt import generer_portefeuille
+from portefeuille import COLONNES_ANALYSES, detecter_conflits, lire_portefeuille, occupation_hebdomadaire
+from stockage import ecrire_planning, lire_planning, ouvrir_planning
+
+
+@pytest.fixture(scope="module")
+def portefeuille_exemple():
+    return generer_portefeuille(lire_portefeuille(PORTEFEUILLE_EXEMPLE_PATH.read_bytes()))
+
+
+@pytest.fixture
+def fichier_exemple(tmp_path, portefeuille_exemple):
+    chemin = tmp_path / "portefeuille.arrow"
+    ecrire_planning(portefeuille_exemple, chemin)
+    return chemin
+
+
+class TestEcriture:
+    """Tests pour l'écriture des plannings."""
+
+    def test_textes_encodes_par_dictionnaire(self, fichier_exemple):
+        """Test que les colonnes de texte sont encodées par dictionnaire, sans compression."""
+        tableau = ouvrir_planning(fichier_exemple)
+
+        for colonne in ("Projet", "Site", "Equipe", "Task", "Type", "Groupe", "Definition"):
+            assert pa.types.is_dictionary(tableau.schema.field(colonne).type)
+        assert pa.types.is_timestamp(tableau.schema.field("Start").type)
+        with pa.ipc.open_file(pa.memory_map(str(fichier_exemple))) as lecteur:
+            assert lecteur.get_batch(0).num_rows == tableau.num_rows
+
+    def test_remplacement_atomique(self, fichier_exemple, portefeuille_exemple):
+        """Test qu'un planning ouvert reste lisible quand le fichier est remplacé."""
+        ancien = ouvrir_planning(fichier_exemple, ["Projet"])
+        ecrire_planning(portefeuille_exemple.head(3), fichier_exemple)
+
+        assert ancien.num_rows == len(portefeuille_exemple)
+        assert ouvrir_planning(fichier_exemple).num_rows == 3
+        assert [chemin.name for chemin in fichier_exemple.parent.iterdir()] == ["portefeuille.arrow"]
+
+
+class TestLecture:
+    """Tests pour la relecture en projection mémoire."""
+
+    def test_aller_retour(self, fichier_exemple, portefeuille_exemple):
+        """Test que la relecture restitue les tâches, textes en Categorical."""
+        df = lire_planning(fichier_exemple)
+
+        assert list(df.columns) == list(portefeuille_exemple.columns)
+        assert isinstance(df["Task"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["Start"].dtype, pd.ArrowDtype)
+        for colonne in ("Projet", "Site", "Equipe", "Task", "Type", "Groupe", "Definition", "hover_def"):
+            valeurs = df[colonne].astype(object)
+            assert valeurs.where(valeurs.notna(), None).tolist() == portefeuille_exemple[colonne].tolist()
+        for colonne in ("Start", "Finish"):
+            assert df[colonne].astype("datetime64[ns]").tolist() == portefeuille_exemple[colonne].tolist()
+        assert df["Duration_weeks"].tolist() == portefeuille_exemple["Duration_weeks"].tolist()
+
+    def test_sans_copie(self, fichier_exemple):
+        """Test que la table ouverte ne fait aucune allocation : ses tampons sont ceux du fichier."""
+        avant = pa.total_allocated_bytes()
+        tableau = ouvrir_planning(fichier_exemple, ["Start", "Finish", "Duration_weeks"])
+        df = lire_planning(fichier_exemple, ["Start", "Finish"])
+
+        assert pa.total_allocated_bytes() == avant
+        assert tableau.num_rows == len(df)
+
+    def test_projection(self, fichier_exemple):
+        """Test que seules les colonnes demandées sont lues, dans l'ordre demandé."""
+        df = lire_planning(fichier_exemple, ["Task", "Projet"])
+
+        assert list(df.columns) == ["Task", "Projet"]
+        with pytest.raises(ValueError, match="colonnes absentes"):
+            lire_planning(fichier_exemple, ["Task", "Inconnue"])
+
+    def test_fichier_illisible(self, tmp_path):
+        """Test qu'un fichier qui n'est pas un planning Arrow lève une ValueError."""
+        chemin = tmp_path / "planning.arrow"
+        chemin.write_bytes(b"pas un fichier arrow")
+        with pytest.raises(ValueError, match="illisible"):
+            lire_planning(chemin)
+
+    def test_analyses(self, fichier_exemple, portefeuille_exemple):
+        """Test que les analyses de portefeuille donnent les mêmes résultats sur le planning stocké."""
+        df = lire_planning(fichier_exemple, COLONNES_ANALYSES)
+
+        occupation = occupation_hebdomadaire(df)
+        attendu = occupation_hebdomadaire(portefeuille_exemple)
+        assert occupation.values.tolist() == attendu.values.tolist()
+        assert list(occupation.columns) == list(attendu.columns)
+        conflits = detecter_conflits(df, cle="Equipe")
+        pd.testing.assert_frame_equal(conflits.astype(str), detecter_conflits(portefeuille_exemple, cle="Equipe").astype(str))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
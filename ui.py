@@ -0,0 +1,475 @@
+"""
+Éléments d'interface Streamlit partagés par l'application.
+"""
+
+import hashlib
+import io
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+import metriques
+from avancement import dates_reelles
+from cache_borne import CacheBorne
+from config import LIMITES_CACHE_FIGURES, LIMITES_CACHE_PLANNINGS, LOGO_PATH, PORTEFEUILLE_EXEMPLE_PATH
+from gantt import appliquer_durees, gabarit_gantt, generer_glossaire_html, generer_portefeuille
+from lots import arborescence
+from planning_navigateur import planning_navigateur
+from portefeuille import (
+    COLONNES_ANALYSES,
+    PHASES_EXCLUSIVES,
+    IndexIntervalles,
+    detecter_conflits,
+    figure_conflits,
+    figure_occupation,
+    lire_portefeuille,
+    occupation_hebdomadaire,
+)
+from references import lire_reference
+from sensibilite import analyse_sensibilite, figure_tornado
+from stockage import chemin_portefeuille, lire_planning
+
+
+# --------------------
+# Ressources partagées : objets immuables construits une fois par processus et
+# servis tels quels à toutes les sessions (ni copie ni reconstruction par rerun).
+# Ils ne doivent pas être modifiés par les appelants.
+@st.cache_resource(show_spinner=False)
+def gabarit_partage():
+    """Gabarit Plotly du Gantt (`gantt.gabarit_gantt`)."""
+    return gabarit_gantt()
+
+
+@st.cache_resource(show_spinner=False)
+def glossaire_html():
+    """Tableau HTML du glossaire des phases."""
+    return generer_glossaire_html()
+
+
+@st.cache_resource(show_spinner=False)
+def logo():
+    """Octets de l'image du logo."""
+    return LOGO_PATH.read_bytes()
+
+
+# Plannings et figures calculés : bornés en entrées, en âge et en octets pour tout
+# le processus, quel que soit le nombre de sessions. Les objets servis sont
+# partagés : ne pas les modifier.
+@st.cache_resource(show_spinner=False)
+def cache_plannings():
+    """Cache borné des DataFrames de tâches."""
+    return CacheBorne("plannings", **LIMITES_CACHE_PLANNINGS)
+
+
+@st.cache_resource(show_spinner=False)
+def cache_figures():
+    """Cache borné des figures Plotly."""
+    return CacheBorne("figures", **LIMITES_CACHE_FIGURES)
+
+
+def afficher_panneau_profilage(profileur):
+    """Panneau repliable de débogage : durée de chaque étape de l'exécution et profil cProfile."""
+    with st.expander("🛠️ Profilage de l'exécution (debug)", expanded=False):
+        resume = profileur.resume()
+        st.caption(f"Durée totale de l'exécution : {profileur.duree_totale_s * 1000:.1f} ms")
+        st.dataframe(
+            pd.DataFrame({"Étape": list(resume), "Durée (ms)": [round(v, 2) for v in resume.values()]}),
+            hide_index=True, use_container_width=True,
+        )
+        st.checkbox("Activer cProfile pour la prochaine exécution", key="profilage_cprofile")
+        statistiques = profileur.statistiques_cprofile()
+        if statistiques:
+            st.code(statistiques, language="text")
+
+
+def cle_duree(prefixe, idx, phase):
+    """Clé du widget de durée d'une phase (`idx` : rang dans sa catégorie)."""
+    return f"{prefixe}_{idx}_{phase['nom']}"
+
+
+def formulaire_durees(groupe, titre, prefixe, phases_groupe):
+    """
+    Éditeur des durées d'une catégorie, regroupé dans un formulaire.
+
+    Les modifications ne relancent pas le script : elles sont appliquées ensemble
+    à la validation du formulaire. Les durées validées sont reportées dans
+    `phases_groupe` ; retourne True si le formulaire vient d'être validé. La
+    valeur de chaque widget est dans `st.session_state` (voir `barre_historique`).
+    """
+    with st.expander(titre, expanded=True), st.form(f"durees_{prefixe}", border=False):
+        for idx, phase in enumerate(phases_groupe):
+            # Seule la MOE affiche aussi les phases non modifiables, avec leur définition
+            if not phase["modifiable"] and groupe != "MOE":
+                continue
+            col1, col2 = st.columns([3,1])
+            with col1:
+                st.write(phase["nom"])
+                if groupe == "MOE" and phase.get("definition"):
+                    st.caption(phase["definition"])
+            with col2:
+                if phase["modifiable"]:
+                    cle = cle_duree(prefixe, idx, phase)
+                    st.session_state.setdefault(cle, phase["duree"])
+                    phase["duree"] = st.number_input("semaines", min_value=phase["duree_min"], key=cle)
+        return st.form_submit_button("✔️ Appliquer les durées")
+
+
+def _changer_version(historique, cles, retablir):
+    vecteur = historique.retablir() if retablir else historique.annuler()
+    for cle, duree in zip(cles, vecteur):
+        if cle is not None:
+            st.session_state[cle] = duree
+    metriques.CLICS.inc(bouton="retablir" if retablir else "annuler")
+
+
+def barre_historique(historique, cles):
+    """
+    Boutons annuler / rétablir des durées validées.
+
+    `cles` donne, pour chaque phase de l'historique, la clé de son widget de
+    durée (None si elle n'est pas modifiable) : changer de version réécrit ces
+    widgets avant l'exécution suivante.
+    """
+    col_annuler, col_retablir, col_version = st.columns([1,1,4])
+    with col_annuler:
+        st.button("↩️ Annuler", key="historique_annuler", disabled=not historique.peut_annuler,
+                  on_click=_changer_version, args=(historique, cles, False))
+    with col_retablir:
+        st.button("↪️ Rétablir", key="historique_retablir", disabled=not historique.peut_retablir,
+                  on_click=_changer_version, args=(historique, cles, True))
+    with col_version:
+        st.caption(f"Version {historique.position + 1} / {len(historique.versions)} des durées")
+
+
+# --------------------
+# Édition dans le navigateur
+def edition_navigateur(phases, start_date, include_financement, recherche_financement_weeks):
+    """
+    Édition instantanée des durées, recalculées dans le navigateur (voir `planning_navigateur`).
+
+    Les durées enregistrées sont validées, mises en attente pour les widgets de
+    durée et le fragment est relancé (voir `appliquer_durees_en_attente`).
+    """
+    if not st.toggle("⚡ Édition instantanée dans le navigateur", key="edition_navigateur",
+                     help="Les barres sont recalculées à chaque saisie, sans attendre le serveur ; "
+                          "« Enregistrer les durées » les reporte dans les éditeurs ci-dessus."):
+        return
+    durees = planning_navigateur(phases, start_date, include_financement, recherche_financement_weeks)
+    if not durees:
+        return
+    try:
+        appliquer_durees([dict(phase) for phase in phases], durees)
+    except ValueError as exc:
+        st.error(str(exc))
+        return
+    st.session_state["durees_navigateur"] = durees
+    metriques.CLICS.inc(bouton="enregistrer_navigateur")
+    st.rerun(scope="fragment")
+
+
+def appliquer_durees_en_attente(phases, cles):
+    """Reporte dans les widgets de durée (`cles`, avant leur création) les durées enregistrées depuis le navigateur."""
+    durees = st.session_state.pop("durees_navigateur", None) or {}
+    for phase, cle in zip(phases, cles):
+        if cle is not None and phase["nom"] in durees:
+            st.session_state[cle] = durees[phase["nom"]]
+
+
+# --------------------
+# Lots
+def choisir_lots(phases):
+    """
+    Choix des phases et des lots à développer en sous-tâches sur le Gantt.
+
+    Retourne les noms choisis (tuple trié, vide si aucune phase n'a de lots).
+    """
+    noeuds = {nom: (niveau, nombre) for nom, niveau, nombre in arborescence(phases)}
+    if not noeuds:
+        return ()
+
+    def libelle(nom):
+        niveau, nombre = noeuds[nom]
+        return f"{'↳ ' * niveau}{nom} ({nombre} lots)"
+
+    choix = st.multiselect(
+        "🧱 Détailler les lots", list(noeuds), key="lots_developpes", format_func=libelle,
+        placeholder="Phases et lots à développer",
+        help="Les sous-tâches ne sont calculées et affichées que pour les lignes développées.",
+    )
+    return tuple(sorted(choix))
+
+
+# --------------------
+# Avancement réel
+def saisir_avancement(taches, cle):
+    """
+    Éditeur des dates réelles des phases de `taches` (planning théorique).
+
+    Retourne les dates saisies (voir `avancement.dates_reelles`), ou None si
+    aucune date n'est saisie ou si la saisie est incohérente (message d'erreur).
+    """
+    noms = list(dict.fromkeys(taches.loc[taches["Type"] == "Phase", "Task"]))
+    vides = pd.Series(pd.NaT, index=range(len(noms)), dtype="datetime64[ns]")
+    with st.expander("📍 Avancement réel", expanded=False):
+        st.caption("Dates réelles des phases engagées : la suite du planning est reprévue à partir de la dernière saisie.")
+        saisie = st.data_editor(
+            pd.DataFrame({"Phase": noms, "Début réel": vides, "Fin réel": vides}),
+            key=cle, hide_index=True, use_container_width=True, disabled=["Phase"],
+            column_config={"Début réel": st.column_config.DateColumn("Début réel", format="DD/MM/YYYY"),
+                           "Fin réel": st.column_config.DateColumn("Fin réel", format="DD/MM/YYYY")},
+        )
+    saisie = saisie[saisie["Début réel"].notna() | saisie["Fin réel"].notna()]
+    if saisie.empty:
+        return None
+    reel = {
+        ligne["Phase"]: {"debut": ligne["Début réel"], "fin": ligne["Fin réel"]}
+        for ligne in saisie.to_dict("records")
+    }
+    try:
+        return dates_reelles(reel)
+    except ValueError as exc:
+        st.error(str(exc))
+        return None
+
+
+def afficher_glissement(taches):
+    """Fin prévisionnelle du projet reprévu et son glissement par rapport au planning théorique."""
+    fin, fin_prevue = taches["Finish"].max(), taches["Finish prévu"].max()
+    jours = (fin - fin_prevue) / pd.Timedelta(days=1)
+    st.metric("Fin prévisionnelle", f"{fin:%d/%m/%Y}", delta=f"{jours:+.0f} j", delta_color="inverse",
+              help=f"Fin du planning théorique : {fin_prevue:%d/%m/%Y}")
+
+
+# --------------------
+# Sensibilité
+def section_sensibilite(phases, start_date, include_financement, recherche_financement_weeks, reels, source):
+    """
+    Tornade et tableau de la sensibilité de la date de fin aux durées et délais MO
+    du plan affiché (`source` : clé de ce plan, pour le cache des figures).
+    """
+    if not st.toggle("🌪️ Analyse de sensibilité de la date de fin", key="sensibilite"):
+        return
+    variation = st.slider("Variation des durées et délais (%)", 5, 50, 20, step=5, key="sensibilite_variation")
+    sensibilite = analyse_sensibilite(phases, start_date, variation / 100, include_financement,
+                                      recherche_financement_weeks, reels)
+    fig = cache_figures().obtenir(("sensibilite", source, variation), lambda: figure_tornado(sensibilite))
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(
+        sensibilite[sensibilite["Amplitude (j)"] > 0],
+        hide_index=True, use_container_width=True,
+        column_config={
+            "Actuelle": st.column_config.NumberColumn("Actuelle (sem.)", format="%.1f"),
+            "Basse": st.column_config.NumberColumn("Basse (sem.)", format="%.1f"),
+            "Haute": st.column_config.NumberColumn("Haute (sem.)", format="%.1f"),
+            "Fin basse": st.column_config.DateColumn("Fin basse", format="DD/MM/YYYY"),
+            "Fin haute": st.column_config.DateColumn("Fin haute", format="DD/MM/YYYY"),
+            "Écart bas (j)": st.column_config.NumberColumn(format="%+.0f"),
+            "Écart haut (j)": st.column_config.NumberColumn(format="%+.0f"),
+            "Amplitude (j)": st.column_config.NumberColumn(format="%.0f"),
+        },
+    )
+
+
+# --------------------
+# Planning de référence
+@st.cache_data(max_entries=4, show_spinner=False)
+def _lire_reference(contenu):
+    return lire_reference(io.BytesIO(contenu))
+
+
+def choisir_reference():
+    """
+    Chargement d'un planning de référence (.parquet enregistré depuis les exports).
+
+    Retourne le DataFrame de la référence et son libellé, ou (None, None).
+    """
+    with st.expander("📌 Comparer à un planning de référence", expanded=False):
+        fichier = st.file_uploader(
+            "Planning de référence (.parquet), enregistré avec « Enregistrer comme référence »",
+            type="parquet", key="reference_fichier",
+        )
+        if fichier is None:
+            return None, None
+        try:
+            reference = _lire_reference(fichier.getvalue())
+        except ValueError as exc:
+            st.error(f"Planning de référence invalide : {exc}")
+            return None, None
+    metadonnees = reference.attrs["reference"]
+    libelle = metadonnees["libelle"] or f"Référence du {metadonnees['horodatage'][:10]}"
+    return reference, libelle
+
+
+def afficher_ecarts(ecarts, libelle):
+    """Glissement de la fin du projet et tableau des tâches modifiées depuis la référence."""
+    st.subheader(f"📌 Écarts depuis « {libelle} »")
+    glissement = (ecarts["Finish"].max() - ecarts["Finish référence"].max()).days
+    modifiees = ecarts[ecarts["Statut"] != "inchangée"]
+    col_fin, col_taches = st.columns(2)
+    col_fin.metric("Glissement de la fin du projet", f"{glissement:+d} jours")
+    col_taches.metric("Tâches modifiées", f"{len(modifiees)} / {len(ecarts)}")
+    if modifiees.empty:
+        return
+    st.dataframe(
+        modifiees[["Task", "Type", "Statut", "Start référence", "Start", "Glissement début (j)",
+                   "Glissement fin (j)", "Durée référence (sem.)", "Durée (sem.)", "Écart durée (sem.)"]],
+        hide_index=True, use_container_width=True,
+        column_config={"Task": "Phase",
+                       "Start référence": st.column_config.DateColumn("Début référence"),
+                       "Start": st.column_config.DateColumn("Début")},
+    )
+
+
+# --------------------
+# Vue portefeuille
+@st.cache_data(max_entries=8, show_spinner=False)
+def _taches_portefeuille(contenu):
+    return generer_portefeuille(lire_portefeuille(contenu))
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _index_portefeuille(contenu):
+    return IndexIntervalles(_taches_portefeuille(contenu))
+
+
+# Plannings Arrow en projection mémoire : cache_resource garde la table adossée au
+# fichier (cache_data en ferait une copie par session). `signature` invalide le
+# cache quand le fichier est remplacé.
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _planning_stocke(chemin, signature):
+    return lire_planning(chemin, colonnes=COLONNES_ANALYSES)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _index_planning_stocke(chemin, signature):
+    return IndexIntervalles(_planning_stocke(chemin, signature))
+
+
+def section_conflits(taches, source):
+    """
+    Chevauchements des phases surveillées entre projets d'un même site ou d'une même équipe.
+
+    `source` identifie le portefeuille affiché (clé des figures en cache).
+    """
+    st.subheader("⚠️ Conflits entre projets")
+    cles = [cle for cle in ("Site", "Equipe") if taches[cle].notna().any()]
+    if not cles:
+        st.info("Renseignez `site` ou `equipe` dans les projets pour détecter les conflits.")
+        return
+    col_cle, col_phases = st.columns([1,3])
+    with col_cle:
+        cle = st.radio("Regrouper par", cles, format_func={"Site": "Site", "Equipe": "Équipe"}.get,
+                       horizontal=True, key="conflits_cle")
+    with col_phases:
+        noms = list(taches.loc[taches["Type"] == "Phase", "Task"].unique())
+        phases = st.multiselect("Phases surveillées", noms, default=[nom for nom in PHASES_EXCLUSIVES if nom in noms],
+                                key="conflits_phases")
+    if not phases:
+        return
+    conflits = detecter_conflits(taches, cle=cle, phases=phases)
+    if conflits.empty:
+        st.success("Aucun chevauchement.")
+        return
+    st.warning(f"{len(conflits)} chevauchement(s) entre projets.")
+    st.dataframe(conflits, hide_index=True, use_container_width=True,
+                 column_config={"Début": st.column_config.DateColumn("Début"),
+                                "Fin": st.column_config.DateColumn("Fin"),
+                                "Semaines": st.column_config.NumberColumn("Semaines", format="%.1f")})
+    fig = cache_figures().obtenir(
+        (source, "conflits", cle, tuple(phases)), lambda: figure_conflits(taches, conflits, cle=cle, phases=phases)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def section_occupation(taches, source):
+    """Nombre de bâtiments dans chaque phase, semaine par semaine, et son export CSV (voir `section_conflits`)."""
+    st.subheader("📈 Bâtiments par phase et par semaine")
+    debut, fin = taches["Start"].min().date(), taches["Finish"].max().date()
+    periode = st.date_input("Période", value=(debut, fin), min_value=debut, max_value=fin, key="occupation_periode")
+    if len(periode) != 2:
+        st.info("Choisissez la fin de la période.")
+        return
+    occupation = occupation_hebdomadaire(taches, debut=periode[0], fin=periode[1])
+    phases = st.multiselect("Phases", list(occupation.columns), default=list(occupation.columns),
+                            key="occupation_phases")
+    if not phases or occupation.empty:
+        st.info("Aucune phase en cours sur la période.")
+        return
+    occupation = occupation[phases]
+    fig = cache_figures().obtenir(
+        (source, "occupation", tuple(periode), tuple(phases)), lambda: figure_occupation(occupation)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.download_button(
+        "📥 Exporter l'occupation (.csv)",
+        data=occupation.to_csv(date_format="%Y-%m-%d").encode("utf-8-sig"),
+        file_name="occupation_hebdomadaire.csv",
+        mime="text/csv",
+    )
+
+
+def section_requetes(index):
+    """Tâches en cours à une date ou sur une période, filtrées par phase et par type."""
+    st.subheader("🔎 Qui est où ?")
+    col_periode, col_phases, col_types = st.columns([1,2,1])
+    with col_periode:
+        periode = st.date_input("Date ou période", value=(date.today(), date.today()), key="requete_periode")
+    with col_phases:
+        phases = st.multiselect("Phases (toutes si vide)", list(index.taches["Task"].unique()), key="requete_phases")
+    with col_types:
+        types = st.multiselect("Types", ["Phase", "Délai MO", "Financement"], default=["Phase", "Délai MO"],
+                               key="requete_types")
+    if not periode:
+        return
+    # Journées entières : de la première date incluse au lendemain de la dernière
+    resultat = index.requete(periode[0], periode[-1] + timedelta(days=1))
+    if phases:
+        resultat = resultat[resultat["Task"].isin(phases)]
+    resultat = resultat[resultat["Type"].isin(types)]
+    st.caption(f"{resultat['Projet'].nunique()} projets, {len(resultat)} tâches.")
+    st.dataframe(resultat[["Projet", "Task", "Type", "Start", "Finish"]], hide_index=True, use_container_width=True,
+                 column_config={"Start": st.column_config.DateColumn("Début"),
+                                "Finish": st.column_config.DateColumn("Fin"),
+                                "Task": "Phase"})
+
+
+def page_portefeuille():
+    """Vue Portefeuille : analyses sur les plannings de plusieurs bâtiments."""
+    st.title("🏘️ Analyse de portefeuille")
+    st.markdown(
+        "Chargez un portefeuille de projets au format JSON, le même que pour l'API et les rapports : "
+        "une liste de projets, ou `{\"projets\": [...]}`, chacun avec `nom`, `etat` et `start_date`, "
+        "et éventuellement `site` et `equipe` pour la détection des conflits."
+    )
+    fichier = st.file_uploader("Portefeuille (.json)", type="json")
+    stocke = chemin_portefeuille()
+    try:
+        if fichier is not None:
+            contenu = fichier.getvalue()
+            source = hashlib.blake2b(contenu, digest_size=16).hexdigest()
+            taches, index = _taches_portefeuille(contenu), _index_portefeuille(contenu)
+        elif stocke is not None:
+            statut = stocke.stat()
+            signature = (statut.st_mtime_ns, statut.st_size)
+            source = (str(stocke), signature)
+            st.caption(f"Aucun fichier chargé : affichage du planning calculé `{stocke.name}`.")
+            taches, index = _planning_stocke(str(stocke), signature), _index_planning_stocke(str(stocke), signature)
+        else:
+            st.caption("Aucun fichier chargé : affichage du portefeuille d'exemple.")
+            contenu = PORTEFEUILLE_EXEMPLE_PATH.read_bytes()
+            source = hashlib.blake2b(contenu, digest_size=16).hexdigest()
+            taches, index = _taches_portefeuille(contenu), _index_portefeuille(contenu)
+    except (ValueError, TypeError, KeyError, OSError) as exc:
+        st.error(f"Portefeuille invalide : {exc}")
+        return
+    if taches.empty:
+        st.info("Le portefeuille ne contient aucun projet.")
+        return
+    st.caption(f"{taches['Projet'].nunique()} projets, {len(taches)} tâches.")
+    st.divider()
+    section_conflits(taches, source)
+    st.divider()
+    section_requetes(index)
+    st.divider()
+    section_occupation(taches, source)